@@ -1,117 +1,408 @@
 from http.server import BaseHTTPRequestHandler
-import re
 import os
-import threading
 import json
 import requests
 import time
 import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# 공용 모듈(ytcore)을 불러오기 위해 프로젝트 루트를 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 
-# 동시 처리 제한을 위한 세마포어
-semaphore = threading.Semaphore(5)
+from ytcore import breaker, clients, metrics, preflight, providers, token_budget, tracing
+from ytcore.admission import AdmissionController, QueueFull
+from ytcore.apify_runs import match_items_to_videos, run_actor, set_run_index, wait_for_items
+from ytcore.cache import MISSING, PreflightCache, RedisBackend, RunIndex, SummaryCache, TranscriptCache, create_backend
+from ytcore.chunking import estimate_tokens, map_reduce
+from ytcore.jobs import CallbackNotAllowed, JobRunner, JobStore, parse_callback_hosts
+from ytcore.probe import probe_languages_batch
+from ytcore.prompt_cache import PromptCache, record_usage
+from ytcore.singleflight import SingleFlight
+from ytcore.streaming import SectionSplitter, format_sse
+from ytcore.transcript_clean import clean_transcript
+from ytcore.youtube_url import extract_video_id, extract_video_ids, watch_url
+
+# 로깅 설정 (로그 줄마다 요청 ID 표시)
+tracing.configure_logging()
+
+# 동시 처리 제한 (슬롯이 없으면 방별 공정 대기열에서 기다리고, 가득 차면 Retry-After와 함께 429)
+admission = AdmissionController(
+    concurrency=int(os.environ.get('MAX_CONCURRENT_REQUESTS', 5)),
+    max_queue=int(os.environ.get('MAX_QUEUED_REQUESTS', 20)),
+    max_wait=float(os.environ.get('MAX_QUEUE_WAIT', 30)),
+)
+
+# 스트리밍 모드에서 첫 단락(개요)이 완성되기까지 걸린 시간
+stream_first_section = metrics.histogram(
+    "stream_first_section_seconds",
+    "스트리밍 요청 시작부터 첫 요약 단락을 보내기까지 걸린 시간",
+)
+
+# 같은 영상을 동시에 요청하면 처리 하나에 합류 (Apify/Gemini 중복 호출 방지)
+inflight = SingleFlight()
+
+# 자막 추출 설정
+ACTOR_ID = "dB9f4B02ocpTICIEY"  # YouTube Transcript Scraper
+BACKUP_ACTOR_ID = "drobnikj/youtube-transcript-extractor"  # 언어 지정 없는 백업 Actor
+LANGUAGES = ['Korean', 'English', 'Default']  # 언어 시도 순서 (우선순위)
+# sequential: 한 언어씩 차례로 시도 / parallel: 모든 언어를 동시에 실행하고 나머지는 중단
+TRANSCRIPT_PROBE_MODE = os.environ.get('TRANSCRIPT_PROBE_MODE', 'sequential')
+# 메시지 하나에서 처리할 최대 영상 수와 동시 요약 수
+MAX_VIDEOS_PER_MESSAGE = int(os.environ.get('MAX_VIDEOS_PER_MESSAGE', 5))
+SUMMARY_WORKERS = int(os.environ.get('SUMMARY_WORKERS', 4))
+
+# 요약 설정 (프롬프트를 바꾸면 PROMPT_VERSION도 올려서 기존 캐시를 무효화)
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash')
+PROMPT_VERSION = 'v2'
+SUMMARY_LANGUAGE = 'ko'
+# 요약 요청 하나의 입력 예산: 자막 글자 수(MAX_TRANSCRIPT_LENGTH, 0이면 끔)와 입력 토큰 수(SUMMARY_MAX_INPUT_TOKENS)
+# 조금 넘으면 앞/뒤만 남기고(head_tail), 더 넘으면 고르게 뽑고(sample), 훨씬 길면 청크로 나눠 요약(map-reduce)
+MAX_TRANSCRIPT_LENGTH = int(os.environ.get('MAX_TRANSCRIPT_LENGTH', 10000))
+SUMMARY_MAX_INPUT_TOKENS = int(os.environ.get('SUMMARY_MAX_INPUT_TOKENS', token_budget.DEFAULT_MAX_INPUT_TOKENS))
+SUMMARY_HEAD_TAIL_RATIO = float(os.environ.get('SUMMARY_HEAD_TAIL_RATIO', 1.2))
+SUMMARY_SAMPLE_RATIO = float(os.environ.get('SUMMARY_SAMPLE_RATIO', 2.0))
+SUMMARY_CHUNK_TOKENS = int(os.environ.get('SUMMARY_CHUNK_TOKENS', 4000))
+SUMMARY_MAX_CHUNKS = int(os.environ.get('SUMMARY_MAX_CHUNKS', 16))
+SUMMARY_MAP_WORKERS = int(os.environ.get('SUMMARY_MAP_WORKERS', 4))
+# 요약 전 자막 정리 (비음성 표시/롤링 자막 중복/추임새 제거), 맞장구 문장 제거는 선택
+TRANSCRIPT_CLEAN = os.environ.get('TRANSCRIPT_CLEAN', '1') != '0'
+TRANSCRIPT_DROP_LOW_INFO = os.environ.get('TRANSCRIPT_DROP_LOW_INFO', '0') == '1'
+
+# 요약 지시문 (모든 요청에서 같으므로 system instruction으로 따로 보내고, 요청마다 영상 제목/자막만 보냄)
+REPORT_INSTRUCTION = """
+주어지는 YouTube 영상의 정보를 바탕으로 가독성 있는 한 페이지의 보고서 형태로 요약하세요. 최종 결과는 한국어로 작성하고, 마크다운 문법은 사용하지 마세요.
+
+요약 구조:
+• 개요
+• 내용
+• 결론
+
+주의사항:
+- 마크다운 문법 사용 금지 (**, ##, ```, - 등)
+- 일반 텍스트로만 작성
+- 불릿 포인트는 • 사용
+- 줄바꿈은 자연스럽게
+"""
+CHUNK_INSTRUCTION = """
+긴 YouTube 영상 자막의 한 부분이 주어집니다.
+이 부분에서 다루는 핵심 내용과 중요한 사실, 수치, 예시를 빠짐없이 한국어로 정리하세요.
+마크다운 문법은 사용하지 말고, 불릿 포인트는 • 를 사용하세요.
+"""
+
+# 지시문을 모델별 Gemini 캐시(cachedContents)로 한 번 만들어 모든 요청이 참조 (입력 토큰 할인)
+# 지시문이 최소 캐시 크기(GEMINI_PROMPT_CACHE_MIN_TOKENS)보다 짧으면 만들지 않고 system instruction으로 보냄
+prompt_cache = PromptCache(
+    ttl=int(os.environ.get('GEMINI_PROMPT_CACHE_TTL', 3600)),
+    min_tokens=int(os.environ.get('GEMINI_PROMPT_CACHE_MIN_TOKENS', 1024)),
+) if os.environ.get('GEMINI_PROMPT_CACHE', '1') != '0' else None
+
+# 요약 결과 캐시 (같은 영상 재요청 시 Apify/Gemini 호출 생략)
+cache_backend = create_backend()
+summary_cache = SummaryCache(
+    cache_backend,
+    ttl=int(os.environ.get('SUMMARY_CACHE_TTL', 7 * 24 * 3600)),
+    max_entries=int(os.environ.get('SUMMARY_CACHE_MAX_ENTRIES', 1000)),
+)
+
+# 자막 캐시 (프롬프트/모델이 바뀌어도 재추출하지 않고, 자막 없는 언어는 바로 건너뜀)
+transcript_cache = TranscriptCache(
+    cache_backend,
+    ttl=int(os.environ.get('TRANSCRIPT_CACHE_TTL', 30 * 24 * 3600)),
+    negative_ttl=int(os.environ.get('TRANSCRIPT_CACHE_NEGATIVE_TTL', 6 * 3600)),
+    max_entries=int(os.environ.get('TRANSCRIPT_CACHE_MAX_ENTRIES', 2000)),
+)
+
+# 같은 (영상, 언어) Apify 실행이 끝났거나 진행 중이면 새로 실행하지 않고 그 실행/데이터셋을 다시 사용
+# (Redis 캐시를 쓰면 다른 인스턴스가 시작한 실행에도 합류)
+if os.environ.get('APIFY_RUN_REUSE', '1') != '0':
+    set_run_index(RunIndex(
+        cache_backend,
+        ttl=int(os.environ.get('APIFY_RUN_REUSE_TTL', 24 * 3600)),
+        max_entries=int(os.environ.get('APIFY_RUN_REUSE_MAX_ENTRIES', 5000)),
+    ))
+
+# Apify 실행 전 영상 사전 점검 (라이브/재생 불가/너무 긴/자막 없는 영상은 바로 거절, 있는 자막 언어만 시도)
+PREFLIGHT = os.environ.get('PREFLIGHT', '1') != '0'
+video_preflight = preflight.Preflight(
+    cache=PreflightCache(
+        cache_backend,
+        ttl=int(os.environ.get('PREFLIGHT_CACHE_TTL', 6 * 3600)),
+        max_entries=int(os.environ.get('PREFLIGHT_CACHE_MAX_ENTRIES', 2000)),
+    ),
+    base_url=os.environ.get('YOUTUBE_BASE_URL'),
+    timeout=float(os.environ.get('PREFLIGHT_TIMEOUT', 3)),
+    max_duration=int(os.environ.get('PREFLIGHT_MAX_DURATION', 4 * 3600)),
+)
+
+def record_missing_transcript(video_id, languages):
+    """공급자가 자막이 없다고 확인한 언어를 자막 캐시에 "자막 없음"으로 기록합니다."""
+    for language in languages:
+        logging.warning(f"❌ [{video_id}] '{language}' 언어로 자막을 찾을 수 없습니다.")
+        transcript_cache.set_missing(video_id, language)
+
+# 자막 공급자 체인 (TRANSCRIPT_PROVIDERS 순서로 시작해 지연 시간/성공률에 따라 순서 조정)
+def _build_transcript_chain():
+    available = {
+        "apify": providers.CallableProvider("apify", lambda requests_by_video, cancel_event: fetch_with_apify(requests_by_video, cancel_event)),
+        "apify_backup": providers.ApifyBackupProvider(
+            lambda: clients.get_apify_client(os.environ.get('APIFY_API_TOKEN')),
+            actor_id=BACKUP_ACTOR_ID,
+            # 백업 Actor가 계속 실패하거나 느리면 BREAKER_COOLDOWN초 동안 건너뜀 (PC 서버와 같은 설정)
+            actor_breaker=breaker.get(
+                BACKUP_ACTOR_ID,
+                window=int(os.environ.get('BREAKER_WINDOW', 20)),
+                min_calls=int(os.environ.get('BREAKER_MIN_CALLS', 5)),
+                failure_rate=float(os.environ.get('BREAKER_FAILURE_RATE', 0.5)),
+                slow_seconds=float(os.environ.get('BREAKER_SLOW_SECONDS', 120)) or None,
+                cooldown=float(os.environ.get('BREAKER_COOLDOWN', 60)),
+            ),
+            on_missing=record_missing_transcript,
+        ),
+        "timedtext": providers.TimedTextProvider(
+            os.environ.get('YOUTUBE_BASE_URL'),
+            timeout=float(os.environ.get('TIMEDTEXT_TIMEOUT', 5)),
+            on_missing=record_missing_transcript,
+        ),
+    }
+    return providers.build_chain(
+        os.environ.get('TRANSCRIPT_PROVIDERS', 'apify,apify_backup,timedtext'),
+        available,
+        explore_every=int(os.environ.get('TRANSCRIPT_PROVIDER_EXPLORE_EVERY', 10)),
+    )
+
+transcript_chain = _build_transcript_chain()
+
+# 외부 API 클라이언트를 컨테이너당 한 번만 준비하고 모든 요청이 재사용
+clients.warm_up(
+    apify_token=os.environ.get('APIFY_API_TOKEN'),
+    gemini_key=os.environ.get('GEMINI_API_KEY'),
+    gemini_models=[
+        (GEMINI_MODEL, 2048, 0.7, {"system_instruction": REPORT_INSTRUCTION}),
+        (GEMINI_MODEL, 1024, 0.7, {"system_instruction": CHUNK_INSTRUCTION}),
+    ],
+)
+
+# 비동기 작업 (POST에 "async": true 를 넣으면 202 + 작업 ID로 바로 응답)
+# 작업은 이 프로세스의 스레드에서 돌므로 응답 뒤에도 계속 도는 서버에서만 켬 (JOB_ASYNC, 서버리스에서는 기본 꺼짐)
+# 서버리스에서 켜려면 작업 상태를 인스턴스 사이에서 공유하도록 Redis 캐시(CACHE_URL)가 있어야 함
+# 콜백은 JOB_CALLBACK_HOSTS(쉼표로 구분)에 있는 호스트로만 보냄 (비우면 콜백 사용 안 함)
+SERVERLESS = bool(os.environ.get('VERCEL') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+JOB_ASYNC = os.environ.get('JOB_ASYNC', '0' if SERVERLESS else '1') != '0'
+
+def async_jobs_unavailable():
+    """작업 모드를 쓸 수 없으면 그 이유를, 쓸 수 있으면 None을 반환합니다."""
+    if not JOB_ASYNC:
+        if SERVERLESS:
+            return "Async mode is disabled on serverless deployments (the instance may be frozen after the response)"
+        return "Async mode is disabled (JOB_ASYNC=0)"
+    if SERVERLESS and not isinstance(cache_backend, RedisBackend):
+        return "Async mode on serverless deployments requires a shared Redis cache (CACHE_URL=redis://...)"
+    return None
+
+job_store = JobStore(cache_backend, ttl=int(os.environ.get('JOB_TTL', 24 * 3600)))
+job_runner = JobRunner(
+    job_store,
+    max_workers=int(os.environ.get('JOB_WORKERS', 2)),
+    callback_hosts=parse_callback_hosts(os.environ.get('JOB_CALLBACK_HOSTS', '')),
+)
+if async_jobs_unavailable():
+    logging.info("ℹ️ 작업 모드 꺼짐 (\"async\" 요청은 501로 거절)")
 
 def normalize_url(url):
     """다양한 형태의 YouTube URL을 표준 watch?v=ID 형태로 정규화합니다."""
-    # youtu.be/ID 형태
-    match = re.search(r"youtu\.be/([a-zA-Z0-9_-]+)", url)
-    if match:
-        return f"https://www.youtube.com/watch?v={match.group(1)}"
-    
-    # youtube.com/watch?v=ID 형태 (다른 파라미터 포함 가능)
-    match = re.search(r"youtube\.com/watch\?v=([a-zA-Z0-9_-]+)", url)
-    if match:
-        return f"https://www.youtube.com/watch?v={match.group(1)}"
-    
-    # youtube.com/live/ID 형태 (라이브 스트림)
-    match = re.search(r"youtube\.com/live/([a-zA-Z0-9_-]+)", url)
-    if match:
-        return f"https://www.youtube.com/watch?v={match.group(1)}"
-    
-    # youtube.com/shorts/ID 형태 (쇼츠)
-    match = re.search(r"youtube\.com/shorts/([a-zA-Z0-9_-]+)", url)
-    if match:
-        return f"https://www.youtube.com/watch?v={match.group(1)}"
-    
-    return None
+    video_id = extract_video_id(url)
+    return watch_url(video_id) if video_id else None
 
 def get_video_id(url):
     """정규화된 URL에서 비디오 ID를 추출합니다."""
-    match = re.search(r"watch\?v=([a-zA-Z0-9_-]+)", url)
-    return match.group(1) if match else None
+    return extract_video_id(url)
 
 def get_youtube_transcript(youtube_url):
     """Apify를 사용하여 YouTube 자막을 추출합니다."""
-    from apify_client import ApifyClient
+    video_id = get_video_id(youtube_url)
+    if not video_id:
+        return None, None, None
+    
+    result = get_youtube_transcripts([video_id]).get(video_id)
+    return result if result else (None, None, None)
+
+def get_youtube_transcripts(video_ids, languages_by_video=None):
+    """
+    여러 영상의 자막을 공급자 체인(기본 Apify Actor, 백업 Actor, timedtext)으로 함께 추출합니다.
+    languages_by_video({video_id: [언어]})가 있으면 영상마다 그 언어만 시도합니다. (사전 점검 결과)
+    반환값은 {video_id: (자막, 언어, 제목)} 이며 실패한 영상은 빠집니다.
+    """
+    languages_by_video = languages_by_video or {}
+    results, fallbacks, pending = lookup_cached_transcripts(video_ids, languages_by_video)
+    found = transcript_chain.fetch(pending) if pending else {}
+    
+    for video_id, (transcript, language, video_title, _) in found.items():
+        transcript_cache.set(video_id, language, transcript, video_title)
+        results[video_id] = (transcript, language, video_title)
+    for video_id in video_ids:
+        if video_id in results:
+            continue
+        if video_id in fallbacks:
+            results[video_id] = fallbacks[video_id]
+        else:
+            logging.error(f"❌ 모든 자막 공급자에서 자막 추출 실패: {video_id}")
     
+    return results
+
+def lookup_cached_transcripts(video_ids, languages_by_video):
+    """
+    자막 캐시를 언어 우선순위대로 확인합니다. (어느 공급자가 가져온 자막이든 같은 캐시 사용)
+    반환값은 (캐시 적중 {video_id: (자막, 언어, 제목)}, 체인이 실패하면 쓸 낮은 순위 캐시 자막, 체인에 넘길 {video_id: [언어]}) 입니다.
+    - "자막 없음"으로 기록된 언어는 건너뜀
+    - 더 높은 순위 언어의 결과를 아직 모르면 그 언어만 체인으로 시도하고, 찾지 못하면 캐시된 낮은 순위 자막 사용
+    - 모든 언어와 백업 Actor 결과가 "자막 없음"이면 체인을 부르지 않음
+    """
+    hits, fallbacks, pending = {}, {}, {}
+    for video_id in video_ids:
+        unknown, cached_result = [], None
+        for language in list(languages_by_video.get(video_id, LANGUAGES)) + [providers.BACKUP_LANGUAGE]:
+            cached = transcript_cache.get(video_id, language)
+            if cached == MISSING:
+                logging.info(f"⏭️ [{video_id}] '{language}' 언어는 자막 없음으로 기록되어 있어 건너뜁니다.")
+            elif cached:
+                cached_result = (cached['transcript'], language, cached['video_title'])
+                break
+            elif language != providers.BACKUP_LANGUAGE:
+                unknown.append(language)
+            else:
+                # 백업 Actor 결과를 모르면 (언어 없이) 체인에 맡김
+                pending[video_id] = unknown
+        if cached_result is not None and not unknown:
+            logging.info(f"⚡ [{video_id}] '{cached_result[1]}' 언어 자막 캐시 적중 (길이: {len(cached_result[0])} 문자)")
+            hits[video_id] = cached_result
+            continue
+        if cached_result is not None:
+            fallbacks[video_id] = cached_result
+        if unknown:
+            pending[video_id] = unknown
+    return hits, fallbacks, pending
+
+def fetch_with_apify(requests_by_video, cancel_event=None):
+    """
+    기본 Apify Actor로 자막을 추출합니다. (공급자 체인의 'apify' 공급자)
+    언어마다 Actor를 한 번만 실행하고 그 언어를 시도할 영상 전체를 startUrls로 넘깁니다.
+    반환값은 {video_id: (자막, 언어, 제목)} 입니다.
+    """
+    video_ids = list(requests_by_video)
+    
+    def wants(video_id, language):
+        return language in requests_by_video[video_id]
+
     # 환경변수에서 API 토큰 가져오기
     api_token = os.environ.get('APIFY_API_TOKEN')
     if not api_token:
         logging.error("APIFY_API_TOKEN 환경변수가 설정되지 않았습니다.")
-        return None, None, None
+        return {}
     
-    client = ApifyClient(api_token)
-    actor_id = "dB9f4B02ocpTICIEY"  # YouTube Transcript Scraper
+    client = clients.get_apify_client(api_token)
     
-    # 언어 시도 순서
-    languages = ['Korean', 'English', 'Default']
+    if TRANSCRIPT_PROBE_MODE == 'parallel':
+        # 모든 언어를 동시에 실행하고 영상마다 우선순위가 가장 높은 성공 결과 사용
+        logging.info(f"🔀 {LANGUAGES} 언어를 동시에 시도합니다.")
+        found = probe_languages_batch(
+            LANGUAGES,
+            tracing.propagate(
+                lambda language, cancel_event: fetch_transcripts_for_language(
+                    client, [video_id for video_id in video_ids if wants(video_id, language)], language, cancel_event
+                )
+            ),
+            video_ids,
+        )
+    else:
+        # 한국어 → 영어 → 기본값 순서로, 아직 자막을 못 찾은 영상만 다시 시도
+        found = {}
+        for language in LANGUAGES:
+            pending = [video_id for video_id in video_ids if video_id not in found and wants(video_id, language)]
+            if not pending:
+                continue
+            for video_id, result in fetch_transcripts_for_language(client, pending, language, cancel_event).items():
+                found[video_id] = (language, result)
     
-    for language in languages:
-        try:
-            logging.info(f"➡️ '{language}' 언어로 추출 시도...")
-            
-            run_input = {
-                "startUrls": [youtube_url],
-                "language": language,
-                "includeTimestamps": "No"
-            }
-            
-            logging.info(f"🔍 Apify 요청 데이터: {run_input}")
-            
-            # Actor 실행
-            run = client.actor(actor_id).call(run_input=run_input)
+    return {
+        video_id: (transcript, language, video_title)
+        for video_id, (language, (transcript, video_title)) in found.items()
+    }
+
+def fetch_transcripts_for_language(client, video_ids, language, cancel_event=None):
+    """
+    한 언어로 여러 영상의 자막을 가져옵니다. 반환값은 {video_id: (자막, 제목)} 입니다.
+    (자막 캐시는 get_youtube_transcripts에서 공급자 체인 바깥에서 확인/저장)
+    """
+    if not video_ids:
+        return {}
+    
+    with tracing.span("transcript", language=language):
+        return fetch_uncached_transcripts(client, video_ids, language, cancel_event)
+
+def fetch_uncached_transcripts(client, to_fetch, language, cancel_event=None):
+    """
+    캐시에 없는 영상들의 자막을 Apify로 한 번에 추출해 {video_id: (자막, 제목)}으로 반환합니다.
+    (자막이 없는 언어는 캐시에 기록)
+    """
+    results = {}
+    try:
+        logging.info(f"➡️ '{language}' 언어로 추출 시도... ({len(to_fetch)}개 영상)")
+        
+        run_input = {
+            "startUrls": [watch_url(video_id) for video_id in to_fetch],
+            "language": language,
+            "includeTimestamps": "No"
+        }
+        
+        logging.info(f"🔍 Apify 요청 데이터: {run_input}")
+        
+        # Actor 실행 (병렬 모드에서 다른 언어가 먼저 확정되면 중단됨)
+        started_at = time.monotonic()
+        with tracing.span("apify_run", language=language):
+            run = run_actor(client, ACTOR_ID, run_input, cancel_event)
+        if run is None:
+            return results
+        
+        # 결과 가져오기 (실행에 넣은 영상 수만큼만, 비어 있으면 백오프로 재시도)
+        # 실패한 실행은 데이터가 더 들어오지 않으므로 한 번만 확인
+        # 다시 쓴 실행(run["videos"])의 데이터셋에는 다른 영상의 항목도 섞여 있으므로 영상별로 골라냄
+        run_videos = run.get('videos') or to_fetch
+        timeout = 20 if run.get('status') == 'SUCCEEDED' else 0
+        with tracing.span("poll_wait", language=language):
+            items = wait_for_items(client, run["defaultDatasetId"], started_at, cancel_event,
+                                   limit=len(run_videos), timeout=timeout)
+        if not items:
+            if cancel_event is None or not cancel_event.is_set():
+                logging.warning(f"❌ '{language}' 언어 데이터셋이 비어 있습니다. (실행 상태: {run.get('status')})")
+            return results
+        
+        for video_id, item in match_items_to_videos(to_fetch, items, run_videos).items():
+            logging.info(f"📄 [{video_id}] 데이터 항목: {item}")
             
-            # 결과 가져오기 (최대 10번 시도)
-            max_attempts = 10
-            for attempt in range(max_attempts):
-                try:
-                    items = list(client.dataset(run["defaultDatasetId"]).iterate_items())
-                    
-                    if items:
-                        item = items[0]
-                        logging.info(f"📄 데이터 항목 {attempt + 1}: {item}")
-                        
-                        transcript = item.get('transcript', '')
-                        video_title = item.get('videoTitle', '')
-                        
-                        if transcript and transcript.strip():
-                            logging.info(f"📊 총 {len(items)}개 항목 처리됨")
-                            logging.info(f"✅ '{language}' 언어 자막 추출 성공! (길이: {len(transcript)} 문자)")
-                            return transcript.strip(), language, video_title
-                        else:
-                            logging.warning(f"❌ '{language}' 언어로 자막을 찾을 수 없습니다.")
-                            break
-                    else:
-                        logging.info(f"⏳ 시도 {attempt + 1}/{max_attempts}: 아직 데이터가 없습니다. 2초 후 재시도...")
-                        time.sleep(2)
-                        
-                except Exception as e:
-                    logging.error(f"데이터 가져오기 오류 (시도 {attempt + 1}): {e}")
-                    time.sleep(2)
+            transcript = (item.get('transcript') or '').strip()
+            video_title = item.get('videoTitle', '')
             
-        except Exception as e:
-            logging.error(f"'{language}' 언어 처리 중 오류: {e}")
-            continue
+            if transcript:
+                logging.info(f"✅ [{video_id}] '{language}' 언어 자막 추출 성공! (길이: {len(transcript)} 문자)")
+                results[video_id] = (transcript, video_title)
+            else:
+                record_missing_transcript(video_id, [language])
+        
+    except Exception as e:
+        logging.error(f"'{language}' 언어 처리 중 오류: {e}")
     
-    logging.error("❌ 모든 언어에서 자막 추출 실패")
-    return None, None, None
+    return results
 
-def summarize_with_gemini(transcript, video_title="YouTube 영상"):
-    """Google Gemini API를 사용하여 자막을 요약합니다."""
-    import google.generativeai as genai
-    
+def generate_with_gemini(prompt, max_output_tokens=2048, on_text=None, system_instruction=None):
+    """
+    Google Gemini API로 프롬프트에 대한 응답 텍스트를 생성합니다. 실패하면 None.
+    on_text가 있으면 스트리밍으로 생성하며, 도착하는 텍스트 조각마다 on_text(조각)를 호출합니다.
+    system_instruction(고정 지시문)은 지시문 캐시가 있으면 캐시를 참조하고, 없으면 system instruction으로 보냅니다.
+    """
     # 환경변수에서 API 키 가져오기
     api_key = os.environ.get('GEMINI_API_KEY')
     if not api_key:
@@ -119,83 +410,379 @@ def summarize_with_gemini(transcript, video_title="YouTube 영상"):
         return None
     
     try:
-        # Gemini API 설정
-        genai.configure(api_key=api_key)
-        
-        # 모델 선택 (gemini-2.0-flash 사용)
-        model_name = 'gemini-2.0-flash'
+        # 모델 선택 (기본값 gemini-2.0-flash), 같은 설정의 모델은 프로세스 전체에서 재사용
+        model_name = GEMINI_MODEL
         logging.info(f"'{model_name}' 모델로 요약 생성 중...")
-        
-        # 생성 설정 - 출력 토큰 수 늘리기
-        generation_config = genai.types.GenerationConfig(
-            max_output_tokens=2048,  # 최대 출력 토큰 수 (기본값 대비 증가)
-            temperature=0.7,  # 창의성 조절 (0.0-1.0)
-        )
-        
-        model = genai.GenerativeModel(
-            model_name=model_name,
-            generation_config=generation_config
-        )
-        
-        # 향상된 프롬프트 생성
-        prompt = f"""
-다음 YouTube 영상의 정보를 바탕으로 가독성 있는 한 페이지의 보고서 형태로 요약하세요. 최종 결과는 한국어로 작성하고, 마크다운 문법은 사용하지 마세요.
-
-요약 구조:
-• 개요
-• 내용
-• 결론
+        cached_content = None
+        if system_instruction and prompt_cache is not None:
+            cached_content = prompt_cache.get(api_key, model_name, system_instruction)
+        streamed = []
+        try:
+            return _generate_text(api_key, model_name, prompt, max_output_tokens, on_text, streamed,
+                                  system_instruction, cached_content)
+        except Exception as e:
+            # 캐시가 지워졌거나 만료된 경우: 이미 보낸 조각이 없으면 지시문을 직접 보내 한 번 더 시도
+            if cached_content is None or streamed:
+                raise
+            logging.warning(f"⚠️ 지시문 캐시({cached_content}) 참조 실패, 지시문을 직접 보내 다시 시도합니다: {e}")
+            prompt_cache.invalidate(api_key, model_name, system_instruction, cached_content)
+            return _generate_text(api_key, model_name, prompt, max_output_tokens, on_text, streamed,
+                                  system_instruction, None)
+            
+    except Exception as e:
+        logging.error(f"Gemini API 호출 중 오류 발생: {e}")
+        return None
 
-주의사항:
-- 마크다운 문법 사용 금지 (**, ##, ```, - 등)
-- 일반 텍스트로만 작성
-- 불릿 포인트는 • 사용
-- 줄바꿈은 자연스럽게
+def _generate_text(api_key, model_name, prompt, max_output_tokens, on_text, streamed, system_instruction, cached_content):
+    """모델 하나로 응답을 생성합니다. (스트리밍 중 전달한 조각 수는 streamed에 기록)"""
+    if cached_content:
+        model_kwargs = {"cached_content": cached_content}
+    elif system_instruction:
+        model_kwargs = {"system_instruction": system_instruction}
+    else:
+        model_kwargs = {}
+    model = clients.get_gemini_model(api_key, model_name, max_output_tokens=max_output_tokens, **model_kwargs)
+    
+    # 스트리밍 모드: 조각이 도착하는 대로 전달하고 전체 텍스트를 모음 (사용량은 마지막 조각에 들어 있음)
+    if on_text is not None:
+        parts = []
+        usage = None
+        for chunk in model.generate_content(prompt, stream=True):
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            text = chunk.text
+            if text:
+                parts.append(text)
+                streamed.append(len(text))
+                on_text(text)
+        record_usage(usage)
+        text = "".join(parts).strip()
+        if not text:
+            logging.error("Gemini API 응답이 비어있습니다.")
+            return None
+        logging.info("✅ Gemini 스트리밍 응답 생성 성공")
+        return text
+    
+    # API 호출
+    response = model.generate_content(prompt)
+    record_usage(getattr(response, "usage_metadata", None))
+    
+    if response and response.text:
+        logging.info("✅ Gemini 응답 생성 성공")
+        return response.text.strip()
+    else:
+        logging.error("Gemini API 응답이 비어있습니다.")
+        return None
 
+def build_report_prompt(video_title, content, note=""):
+    """개요/내용/결론 보고서 요약 요청에서 영상마다 달라지는 부분입니다. (지시문은 REPORT_INSTRUCTION)"""
+    prompt = f"""
 영상 정보
 제목: {video_title}
-내용: {transcript}
+내용: {content}
 """
+    return note.strip() + "\n" + prompt if note else prompt
+
+def summarize_with_gemini(transcript, video_title="YouTube 영상", on_text=None, note=""):
+    """Google Gemini API를 사용하여 자막을 한 번에 요약합니다."""
+    return generate_with_gemini(build_report_prompt(video_title, transcript, note), on_text=on_text,
+                                system_instruction=REPORT_INSTRUCTION)
+
+def summarize_chunk(chunk, index, total, video_title):
+    """긴 자막의 한 부분을 요약합니다. (map 단계, 지시문은 CHUNK_INSTRUCTION)"""
+    prompt = f"""
+영상 제목: {video_title}
+부분: {index}/{total}
+
+자막:
+{chunk}
+"""
+    return generate_with_gemini(prompt, max_output_tokens=1024, system_instruction=CHUNK_INSTRUCTION)
+
+def summarize_long_transcript(transcript, video_title, on_text=None):
+    """
+    긴 자막을 청크별로 병렬 요약한 뒤 하나의 보고서로 합칩니다. (summary, 메타 정보)를 반환합니다.
+    on_text가 있으면 마지막 합치기(reduce) 단계의 출력을 스트리밍합니다.
+    """
+    def reduce_summaries(partials):
+        content = "\n\n".join(f"[{i}부] {partial}" for i, partial in enumerate(partials, 1))
+        note = "\n내용은 긴 영상을 순서대로 나눠 요약한 부분 요약들입니다. 중복을 정리하고 흐름이 이어지도록 하나의 보고서로 합치세요."
+        return generate_with_gemini(build_report_prompt(video_title, content, note), on_text=on_text,
+                                    system_instruction=REPORT_INSTRUCTION)
+
+    return map_reduce(
+        transcript,
+        tracing.propagate(lambda chunk, index, total: summarize_chunk(chunk, index, total, video_title)),
+        reduce_summaries,
+        max_tokens=SUMMARY_CHUNK_TOKENS,
+        max_workers=SUMMARY_MAP_WORKERS,
+    )
+
+def plan_transcript(transcript, video_title):
+    """입력 예산에 맞는 전략(pass_through/head_tail/sample/map_reduce)과 모델에 넘길 자막을 정합니다."""
+    return token_budget.plan(
+        transcript,
+        max_chars=MAX_TRANSCRIPT_LENGTH,
+        max_tokens=SUMMARY_MAX_INPUT_TOKENS,
+        overhead_tokens=estimate_tokens(REPORT_INSTRUCTION + build_report_prompt(video_title, "")),
+        chunk_tokens=SUMMARY_CHUNK_TOKENS,
+        max_chunks=SUMMARY_MAX_CHUNKS,
+        head_tail_ratio=SUMMARY_HEAD_TAIL_RATIO,
+        sample_ratio=SUMMARY_SAMPLE_RATIO,
+    )
+
+def summarize_transcript(transcript, video_title, on_text=None):
+    """
+    입력 예산에 맞춰 자막을 줄이거나 그대로 한 번에 요약하고, 훨씬 길면 map-reduce로 요약합니다.
+    (summary, 메타 정보)를 반환하며, 메타 정보에는 요약 방식, 예산 전략, 단계별 소요 시간(초)이 들어갑니다.
+    on_text가 있으면 최종 보고서를 생성하는 동안 텍스트 조각을 스트리밍합니다.
+    """
+    plan = plan_transcript(transcript, video_title)
+    if plan.strategy == token_budget.MAP_REDUCE:
+        logging.info(f"📚 긴 자막({len(transcript)}자)은 나눠서 요약합니다.")
+        summary, meta = summarize_long_transcript(plan.text, video_title, on_text)
+        return summary, dict(meta, mode="map_reduce", budget=plan.to_meta())
+
+    note = ""
+    if plan.strategy in (token_budget.HEAD_TAIL, token_budget.SAMPLE):
+        note = "\n내용은 긴 자막에서 일부를 발췌한 것이며 '…'는 생략된 부분입니다. 생략된 내용을 지어내지 마세요."
+    started = time.monotonic()
+    summary = summarize_with_gemini(plan.text, video_title, on_text, note)
+    timings = {"summarize": round(time.monotonic() - started, 3)}
+    return summary, {"mode": "single", "budget": plan.to_meta(), "timings": timings}
+
+def summarize_videos(video_ids, emit=None):
+    """
+    여러 영상을 한 번에 처리합니다. (요약 캐시 확인 → 자막 일괄 추출 → 요약 병렬 생성)
+    영상 순서대로 (HTTP 상태 코드, 응답 dict) 목록을 반환합니다.
+    emit(이벤트, 데이터)가 있으면 진행 상황과 요약 텍스트를 스트리밍하며, 요약은 영상 순서대로 생성합니다.
+    """
+    results = {}
+    pending = []
+    
+    # 캐시된 요약이 있으면 바로 사용
+    for video_id in video_ids:
+        cached = summary_cache.get(video_id, SUMMARY_LANGUAGE, GEMINI_MODEL, PROMPT_VERSION)
+        if cached:
+            logging.info(f"⚡ 캐시 적중: {video_id}")
+            results[video_id] = (200, dict(cached, video_id=video_id, cached=True))
+        else:
+            pending.append(video_id)
+    
+    if pending:
+        logging.info(f"처리 시작: {pending}")
+        if emit:
+            emit("status", {"stage": "transcript", "video_ids": pending})
         
-        # API 호출
-        response = model.generate_content(prompt)
+        # 사전 점검: 가망 없는 영상은 Apify를 실행하지 않고 거절
+        verdicts = preflight_videos(pending)
+        for video_id, verdict in verdicts.items():
+            if verdict.rejected:
+                results[video_id] = (400, rejection_payload(video_id, verdict))
+        pending = [video_id for video_id in pending if video_id not in results]
         
-        if response and response.text:
-            summary = response.text.strip()
-            logging.info("✅ Gemini 요약 생성 성공")
-            return summary
-        else:
-            logging.error("Gemini API 응답이 비어있습니다.")
-            return None
-            
+        # 자막 추출 (제목도 함께)
+        transcripts = get_youtube_transcripts(
+            pending, {video_id: verdicts[video_id].languages for video_id in pending} if verdicts else None
+        ) if pending else {}
+        
+        to_summarize = []
+        for video_id in pending:
+            if video_id in transcripts:
+                to_summarize.append(video_id)
+            else:
+                logging.warning(f"자막 추출 실패: {video_id}")
+                results[video_id] = (400, {"video_id": video_id, "error": "자막을 추출할 수 없습니다."})
+        
+        # 스트리밍 모드: 영상 순서대로 요약하면서 텍스트를 바로 전달
+        if emit:
+            for video_id in to_summarize:
+                results[video_id] = stream_video_summary(video_id, transcripts[video_id], emit)
+        
+        # Gemini로 요약 생성 (영상별 병렬)
+        elif to_summarize:
+            with ThreadPoolExecutor(max_workers=min(len(to_summarize), SUMMARY_WORKERS)) as executor:
+                summaries = executor.map(
+                    tracing.propagate(lambda video_id: summarize_video(video_id, *transcripts[video_id])),
+                    to_summarize,
+                )
+                for video_id, result in zip(to_summarize, summaries):
+                    results[video_id] = result
+    
+    return [results[video_id] for video_id in video_ids]
+
+def preflight_videos(video_ids):
+    """영상들을 사전 점검해 {video_id: Verdict}를 반환합니다. (PREFLIGHT=0 이면 빈 dict)"""
+    if not PREFLIGHT or not video_ids:
+        return {}
+    return video_preflight.check_many(video_ids, LANGUAGES)
+
+def rejection_payload(video_id, verdict):
+    """사전 점검에서 거절된 영상의 응답 dict를 만듭니다."""
+    # 자막 없음은 기존 응답과 같은 문구를 사용 (메신저봇 스크립트의 안내 메시지 유지)
+    error = "자막을 추출할 수 없습니다." if verdict.reason == preflight.NO_CAPTIONS else verdict.message
+    payload = {"video_id": video_id, "error": error, "reason": verdict.reason}
+    if verdict.info.title:
+        payload["video_title"] = verdict.info.title
+    if verdict.info.duration:
+        payload["duration"] = verdict.info.duration
+    return payload
+
+def stream_video_summary(video_id, transcript_info, emit):
+    """
+    영상 하나의 요약을 스트리밍하며 생성합니다.
+    텍스트 조각은 delta 이벤트로, 완성된 개요/내용/결론 단락은 section 이벤트로 보냅니다.
+    """
+    transcript, language, video_title = transcript_info
+    emit("meta", {"video_id": video_id, "video_title": video_title or "제목 없음", "language": language})
+    
+    splitter = SectionSplitter()
+    def on_text(text):
+        emit("delta", {"video_id": video_id, "text": text})
+        for name, body in splitter.feed(text):
+            emit("section", {"video_id": video_id, "name": name, "text": body})
+    
+    result = summarize_video(video_id, transcript, language, video_title, on_text)
+    for name, body in splitter.close():
+        emit("section", {"video_id": video_id, "name": name, "text": body})
+    return result
+
+def summarize_video(video_id, transcript, language, video_title, on_text=None):
+    """
+    추출한 자막으로 요약을 만들고 (HTTP 상태 코드, 응답 dict)를 반환합니다.
+    on_text가 있으면 요약 텍스트를 생성되는 대로 on_text(조각)로 전달합니다.
+    """
+    logging.info(f"✅ [{video_id}] '{language}' 자막 추출 성공 (길이: {len(transcript)})")
+    
+    # 영상 제목이 없는 경우 기본값 설정
+    if not video_title:
+        logging.warning(f"⚠️ [{video_id}] 영상 제목을 가져오지 못했습니다.")
+        video_title = "제목 없음"
+    else:
+        logging.info(f"🎥 [{video_id}] 영상 제목: {video_title}")
+    
+    # 요약 전 자막 정리 (입력 토큰 절약)
+    text, clean_stats = prepare_transcript(video_id, transcript)
+    
+    # Gemini로 요약 생성
+    logging.info(f"[{video_id}] Gemini AI로 요약 생성 중...")
+    with tracing.span("summarize"):
+        summary, summary_meta = summarize_transcript(text, video_title, on_text)
+    
+    if not summary:
+        logging.error(f"[{video_id}] 요약 생성 실패")
+        return 500, {"video_id": video_id, "error": "요약을 생성할 수 없습니다."}
+    
+    logging.info(f"✅ [{video_id}] 요약 생성 완료")
+    
+    response_data = {
+        "video_id": video_id,
+        "summary": summary,
+        "video_title": video_title,
+        "language": language,
+        "transcript_length": len(transcript),
+        "cleaned_length": len(text),
+        "tokens_removed": clean_stats["tokens_removed"],
+        "summary_mode": summary_meta["mode"],
+        "budget": summary_meta["budget"],
+        "timings": summary_meta["timings"],
+    }
+    summary_cache.set(video_id, SUMMARY_LANGUAGE, GEMINI_MODEL, PROMPT_VERSION, response_data)
+    return 200, response_data
+
+def prepare_transcript(video_id, transcript):
+    """요약에 넘길 자막과 정리 통계를 반환합니다. (TRANSCRIPT_CLEAN=0 이면 그대로)"""
+    if not TRANSCRIPT_CLEAN:
+        return transcript, {"chars_removed": 0, "tokens_removed": 0}
+    with tracing.span("clean"):
+        text, stats = clean_transcript(transcript, drop_low_info=TRANSCRIPT_DROP_LOW_INFO)
+    logging.info(
+        f"🧹 [{video_id}] 자막 정리: {stats['chars_before']} → {stats['chars_after']}자 "
+        f"(약 {stats['tokens_removed']}토큰 절약, 표시 {stats['annotations']}개, 중복 줄 {stats['duplicate_lines']}개, "
+        f"추임새 {stats['fillers']}개, 반복 단어 {stats['repeated_words']}개, 맞장구 문장 {stats['low_info_sentences']}개)"
+    )
+    return text, stats
+
+def build_response(room, video_ids, emit=None):
+    """영상들을 처리하고 응답할 (HTTP 상태 코드, 응답 dict)를 만듭니다."""
+    results = coalesced_summaries(room, video_ids, emit)
+
+    # 영상이 하나면 기존과 같은 형태로 응답
+    if len(results) == 1:
+        return results[0]
+
+    # 여러 영상이면 결과 배열로 응답 (하나라도 성공하면 200)
+    statuses = [status for status, _ in results]
+    status = 200 if 200 in statuses else statuses[0]
+    response = {"results": [payload for _, payload in results], "count": len(results)}
+    if status == 429:
+        response["retry_after"] = max(payload["retry_after"] for _, payload in results if "retry_after" in payload)
+    return status, response
+
+def coalesced_summaries(room, video_ids, emit=None):
+    """
+    같은 영상을 이미 다른 요청이 처리 중이면 새로 처리하지 않고 그 결과를 함께 받습니다.
+    직접 맡은 영상만 입장 관리자를 거쳐 처리하므로, 기다리는 요청은 슬롯을 차지하지 않습니다.
+    """
+    claims = {video_id: inflight.claim(video_id) for video_id in video_ids}
+    owned = [video_id for video_id in video_ids if claims[video_id][1]]
+
+    results = {}
+    error = None
+    try:
+        if owned:
+            results.update(zip(owned, admitted_summaries(room, owned, emit)))
     except Exception as e:
-        logging.error(f"Gemini API 호출 중 오류 발생: {e}")
-        return None
+        error = e
+        raise
+    finally:
+        for video_id in owned:
+            inflight.finish(video_id, claims[video_id][0], result=results.get(video_id), error=error)
+
+    for video_id in video_ids:
+        if video_id not in results:
+            logging.info(f"🔗 진행 중인 처리에 합류: {video_id}")
+            status, payload = claims[video_id][0].wait()
+            results[video_id] = (status, dict(payload, coalesced=True))
+
+    return [results[video_id] for video_id in video_ids]
+
+def admitted_summaries(room, video_ids, emit=None):
+    """
+    입장 관리자에서 슬롯을 얻은 뒤 summarize_videos를 실행합니다.
+    슬롯이 없으면 방별 대기열에서 기다리고, 끝내 얻지 못하면 영상마다 429 결과를 만듭니다.
+    """
+    try:
+        with admission.slot(room):
+            return summarize_videos(video_ids, emit)
+    except QueueFull as e:
+        logging.warning(f"대기열이 가득 차 요청을 거부합니다. ({e.reason}, {e.retry_after}초 후 재시도)")
+        payload = {"error": "Too many requests, please try again later.", "retry_after": e.retry_after}
+        return [(429, dict(payload, video_id=video_id)) for video_id in video_ids]
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
-        # 동시 처리 제한
-        if not semaphore.acquire(blocking=False):
-            logging.warning("동시 처리 한도 초과로 요청을 거부합니다.")
-            self.send_response(429)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": "Too many requests, please try again later."}).encode())
-            return
+        # 요청 ID(X-Request-ID 헤더 또는 새로 생성)를 로그와 응답 헤더에 붙이고 단계별 소요 시간을 기록
+        with tracing.request_context(self.headers.get('X-Request-ID'), endpoint="youtube"):
+            self._handle_post()
 
+    def _handle_post(self):
         try:
-            # Content-Length 헤더에서 요청 본문 크기 가져오기
-            content_length = int(self.headers.get('Content-Length', 0))
-            
-            # 요청 본문 읽기
-            post_data = self.rfile.read(content_length)
-            
-            # JSON 파싱
-            body = json.loads(post_data.decode('utf-8')) if post_data else {}
-            
-            room = body.get('room')
-            sender = body.get('sender')
-            message = body.get('msg')
+            with tracing.span("parse"):
+                # Content-Length 헤더에서 요청 본문 크기 가져오기
+                content_length = int(self.headers.get('Content-Length', 0))
+                
+                # 요청 본문 읽기
+                post_data = self.rfile.read(content_length)
+                
+                # JSON 파싱
+                body = json.loads(post_data.decode('utf-8')) if post_data else {}
+                
+                room = body.get('room')
+                sender = body.get('sender')
+                message = body.get('msg')
+                
+                # 메시지에 포함된 모든 영상 ID 추출 (중복 제거)
+                video_ids = extract_video_ids(message)[:MAX_VIDEOS_PER_MESSAGE] if message else []
             
             logging.info(f"[{room}] '{sender}'로부터 메시지 수신: {message}")
 
@@ -206,72 +793,49 @@ class handler(BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps({"status": "no_message"}).encode())
                 return
 
-            # URL 정규화 및 ID 추출
-            normalized_url = normalize_url(message)
-            if not normalized_url:
+            if not video_ids:
                 logging.info(f"YouTube URL이 아님: {message}")
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/json')
                 self.end_headers()
                 self.wfile.write(json.dumps({"status": "not_a_youtube_url"}).encode())
                 return
-                
-            video_id = get_video_id(normalized_url)
-            if not video_id:
-                logging.error(f"비디오 ID를 추출할 수 없음: {normalized_url}")
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "Could not extract video ID"}).encode())
-                return
-
-            logging.info(f"처리 시작: {normalized_url} (ID: {video_id})")
 
-            # 자막 추출 (제목도 함께)
-            transcript, language, video_title = get_youtube_transcript(normalized_url)
-            
-            if not transcript:
-                logging.warning(f"자막 추출 실패: {video_id}")
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": "자막을 추출할 수 없습니다."}).encode())
+            # 스트리밍 모드: 요약이 생성되는 대로 server-sent events로 전달
+            if body.get('stream'):
+                self._stream_response(room, video_ids)
                 return
 
-            logging.info(f"✅ '{language}' 자막 추출 성공 (길이: {len(transcript)})")
-            
-            # 영상 제목이 없는 경우 기본값 설정
-            if not video_title:
-                logging.warning("⚠️ 영상 제목을 가져오지 못했습니다.")
-                video_title = "제목 없음"
-            else:
-                logging.info(f"🎥 영상 제목: {video_title}")
-
-            # Gemini로 요약 생성
-            logging.info("Gemini AI로 요약 생성 중...")
-            summary = summarize_with_gemini(transcript, video_title)
-            
-            if not summary:
-                logging.error("요약 생성 실패")
-                self.send_response(500)
+            # 작업 모드: 작업 ID를 바로 돌려주고 처리는 백그라운드에서 진행
+            if body.get('async'):
+                unavailable = async_jobs_unavailable()
+                if unavailable:
+                    self._send_json(501, {"error": unavailable, "reason": "async_unavailable"})
+                    return
+                try:
+                    job_id = job_runner.submit(
+                        tracing.propagate(lambda: build_response(room, video_ids)),
+                        {"room": room, "sender": sender, "video_ids": video_ids},
+                        callback_url=body.get('callback_url'),
+                    )
+                except CallbackNotAllowed:
+                    self._send_json(400, {"error": "callback_url host is not allowed (JOB_CALLBACK_HOSTS)",
+                                          "reason": "callback_not_allowed"})
+                    return
+                logging.info(f"📥 작업 등록: {job_id} ({video_ids})")
+                status_url = f"/api/youtube/jobs/{job_id}"
+                self.send_response(202)
                 self.send_header('Content-Type', 'application/json')
+                self.send_header('Location', status_url)
                 self.end_headers()
-                self.wfile.write(json.dumps({"error": "요약을 생성할 수 없습니다."}).encode())
+                self.wfile.write(json.dumps({"job_id": job_id, "status": "queued", "status_url": status_url}).encode())
                 return
 
-            logging.info("✅ 요약 생성 완료")
-
-            response_data = {
-                "summary": summary,
-                "video_title": video_title,
-                "language": language,
-                "transcript_length": len(transcript)
-            }
-
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode())
+            status, payload = build_response(room, video_ids)
+            if status == 429:
+                self._send_json(429, payload, headers={'Retry-After': str(payload['retry_after'])})
+                return
+            self._send_json(status, payload)
 
         except Exception as e:
             logging.error(f"처리 중 오류 발생: {e}", exc_info=True)
@@ -279,11 +843,92 @@ class handler(BaseHTTPRequestHandler):
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
             self.wfile.write(json.dumps({"error": "An internal error occurred"}).encode())
-        finally:
-            semaphore.release()
 
     def do_GET(self):
-        self.send_response(405)
+        url = urlparse(self.path)
+        path = url.path.rstrip('/')
+
+        # 캐시 크기 조정을 위한 적중/미스/제거 통계
+        if path.endswith('/cache'):
+            self._send_json(200, {
+                "summary_cache": summary_cache.stats(),
+                "transcript_cache": transcript_cache.stats(),
+                "preflight_cache": video_preflight.cache.stats(),
+                "transcript_providers": transcript_chain.stats(),
+            })
+            return
+
+        # 작업 상태 조회: /api/youtube/jobs/<id>
+        if '/jobs/' in path:
+            job = job_store.get(path.rsplit('/', 1)[-1])
+            if not job:
+                self._send_json(404, {"error": "Job not found"})
+                return
+            self._send_json(200, job)
+            return
+
+        # 단계별 지연 시간 등 프로세스 내 메트릭 (Prometheus 텍스트 형식, ?format=json 이면 JSON)
+        if path.endswith('/metrics'):
+            if parse_qs(url.query).get('format') == ['json']:
+                self._send_json(200, metrics.snapshot())
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', metrics.PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self._send_json(405, {"error": "Method not allowed"})
+
+    def _stream_response(self, room, video_ids):
+        """
+        text/event-stream 으로 진행 상황(status, meta), 요약 조각(delta), 완성된 단락(section)을 보내고
+        마지막에 일반 응답과 같은 내용을 end 이벤트로 보냅니다.
+        클라이언트 연결이 끊겨도 처리는 끝까지 진행해 캐시와 합류한 요청에 결과를 남깁니다.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        
+        started = time.monotonic()
+        state = {"connected": True, "first_section": False}
+        
+        def emit(event, data):
+            if event == "section" and not state["first_section"]:
+                state["first_section"] = True
+                stream_first_section.observe(time.monotonic() - started)
+            if not state["connected"]:
+                return
+            try:
+                self.wfile.write(format_sse(event, data))
+                self.wfile.flush()
+            except OSError:
+                state["connected"] = False
+                logging.warning("스트리밍 연결이 끊어졌습니다. 처리는 계속 진행합니다.")
+        
+        try:
+            status, payload = build_response(room, video_ids, emit)
+        except Exception as e:
+            logging.error(f"처리 중 오류 발생: {e}", exc_info=True)
+            status, payload = 500, {"error": "An internal error occurred"}
+        emit("end", {"status": status, "body": payload})
+
+    def end_headers(self):
+        # 요청 처리 중이면 로그와 같은 요청 ID를 응답 헤더로 알려줌
+        if tracing.current_trace() is not None:
+            self.send_header('X-Request-ID', tracing.current_request_id())
+        super().end_headers()
+
+    def _send_json(self, status, payload, headers=None):
+        with tracing.span("serialize"):
+            body = json.dumps(payload).encode()
+        self.send_response(status)
         self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(json.dumps({"error": "Method not allowed"}).encode()) 
\ No newline at end of file
+        self.wfile.write(body) 
\ No newline at end of file
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+동시 작업 수용량 부하 테스트: Flask 스레드 서버(server.py) vs asyncio 서버(asgi_server.py) (오프라인)
+
+benchmarks/mock_upstreams.py 의 가짜 Apify/Gemini 서버를 띄우고, 두 서버를 각각 별도 프로세스로 실행한 뒤
+단계(--levels)마다 서로 다른 영상 요청을 한꺼번에 보내 성공 수, 지연 시간(p50/p95), 처리 시간과
+서버 프로세스의 최대 RSS / 스레드 수를 비교합니다.
+
+Apify 실행이 오래 걸리는 상황(--apify-latency fixed:5)에서는 Flask 서버는 요청마다 스레드 하나가 대기하고,
+asyncio 서버는 스레드 없이 대기하므로 동시 요청이 늘수록 메모리와 스레드 수 차이가 커집니다.
+
+사용법:
+    python benchmarks/bench_async_server.py [--target flask|asgi|both] [--levels 50,200,500]
+                                            [--apify-latency fixed:5] [--gemini-latency lognormal:0.5,0.3]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+from bench_pipeline import make_workload, mock_call, percentile, start_mock
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+SERVERS = {
+    "flask": ("server.py", "/youtube"),
+    "asgi": ("asgi_server.py", "/youtube"),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def proc_status(pid):
+    """/proc/<pid>/status 에서 RSS(KB), 최대 RSS(KB), 스레드 수를 읽습니다."""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                name, _, value = line.partition(":")
+                if name in ("VmRSS", "VmHWM", "Threads"):
+                    values[name] = int(value.split()[0])
+    except FileNotFoundError:
+        pass
+    return values
+
+
+class Sampler:
+    """부하를 거는 동안 서버 프로세스의 RSS와 스레드 수를 주기적으로 기록합니다."""
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_threads = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            status = proc_status(self.pid)
+            self.peak_rss = max(self.peak_rss, status.get("VmRSS", 0))
+            self.peak_threads = max(self.peak_threads, status.get("Threads", 0))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def start_server(name, env, log):
+    """대상 서버를 별도 프로세스로 실행하고 /metrics 가 응답할 때까지 기다립니다."""
+    script, path = SERVERS[name]
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, script],
+        cwd=ROOT_DIR / "python_bot",
+        env=dict(env, PORT=str(port)),
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} 서버가 시작 중 종료되었습니다. (로그: {log.name})")
+        try:
+            if httpx.get(base_url + "/metrics", timeout=1).status_code == 200:
+                return process, base_url + path
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{name} 서버가 60초 안에 시작되지 않았습니다.")
+
+
+async def fire(url, workload, timeout):
+    """요청을 한꺼번에 보내고 (지연 시간, 상태) 목록을 반환합니다."""
+    limits = httpx.Limits(max_connections=len(workload), max_keepalive_connections=0)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        async def post(room, message):
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json={"room": room, "sender": "bench", "msg": message})
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            return time.perf_counter() - started, status
+
+        return await asyncio.gather(*(post(room, message) for room, message in workload))
+
+
+def run_level(name, url, pid, level, seed, timeout):
+    workload = make_workload(level, {"unique": 1.0}, seed)
+    baseline = proc_status(pid)
+    started = time.perf_counter()
+    with Sampler(pid) as sampler:
+        results = asyncio.run(fire(url, workload, timeout))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, status in results if status == 200)
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        "target": name,
+        "level": level,
+        "ok": statuses.get(200, 0),
+        "elapsed": elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "statuses": statuses,
+        "rss_before": baseline.get("VmRSS", 0),
+        "peak_rss": sampler.peak_rss,
+        "peak_threads": sampler.peak_threads,
+    }
+
+
+def print_row(result):
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items(), key=str))
+    print(f"  {result['target']:<6} {result['level']:>5}  {result['ok']:>5}  {result['elapsed']:7.1f}s  "
+          f"{result['p50']:7.2f}s  {result['p95']:7.2f}s  "
+          f"{result['rss_before'] / 1024:7.1f}  {result['peak_rss'] / 1024:7.1f}  {result['peak_threads']:>7}   {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask 스레드 서버와 asyncio 서버의 동시 작업 수용량 비교")
+    parser.add_argument("--target", choices=["flask", "asgi", "both"], default="both")
+    parser.add_argument("--levels", default="50,200,500", help="단계별 동시 요청 수 (쉼표로 구분)")
+    parser.add_argument("--apify-latency", default="fixed:5")
+    parser.add_argument("--gemini-latency", default="lognormal:0.5,0.3")
+    parser.add_argument("--timeout", type=float, default=300, help="요청 하나의 제한 시간(초)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    args.apify_failure_rate = args.gemini_failure_rate = 0.0
+    mock_process, mock_url = start_mock(args)
+    tmp = tempfile.TemporaryDirectory()
+
+    targets = ["flask", "asgi"] if args.target == "both" else [args.target]
+    print("🏁 동시 작업 수용량 부하 테스트 (가짜 Apify/Gemini)")
+    print("=" * 110)
+    print(f"단계 {levels}, Apify {args.apify_latency}, Gemini {args.gemini_latency}")
+    print(f"  {'서버':<6} {'동시':>5}  {'성공':>5}  {'소요':>8}  {'p50':>8}  {'p95':>8}  "
+          f"{'RSS 전':>7}  {'최대 RSS':>7}  {'최대 스레드':>7}   상태  (RSS 단위 MB)")
+
+    try:
+        for name in targets:
+            env = dict(
+                os.environ,
+                CLIENT_BACKEND="rest",
+                APIFY_API_BASE_URL=mock_url,
+                GEMINI_API_BASE_URL=mock_url,
+                YOUTUBE_BASE_URL=mock_url,
+                APIFY_API_TOKEN="bench-token",
+                GEMINI_API_KEY="bench-key",
+                CACHE_URL=f"sqlite:///{os.path.join(tmp.name, name + '-cache.sqlite3')}",
+                PYTHONWARNINGS="ignore",
+                # 입장 제한 때문에 대기하지 않도록 두 서버 모두 가장 큰 단계만큼 허용
+                MAX_CONCURRENT_REQUESTS=str(max(levels)),
+                MAX_QUEUED_REQUESTS=str(max(levels)),
+                MAX_QUEUE_WAIT=str(args.timeout),
+            )
+            with open(os.path.join(tmp.name, name + ".log"), "w") as log:
+                process, url = start_server(name, env, log)
+                try:
+                    for index, level in enumerate(levels):
+                        mock_call(mock_url, "/__reset", "POST")
+                        print_row(run_level(name, url, process.pid, level, args.seed + index, args.timeout))
+                finally:
+                    process.terminate()
+                    process.wait()
+    finally:
+        mock_process.terminate()
+        mock_process.wait()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+요청당 클라이언트 준비 비용 벤치마크
+
+1. 준비 비용: 요청마다 ApifyClient 생성 + genai.configure + GenerativeModel 생성(기존 방식)과
+   ytcore.clients 레지스트리에서 꺼내 쓰는 방식의 요청당 시간을 비교합니다. (네트워크 없음)
+2. 연결 재사용: 로컬 keep-alive HTTP 서버를 Apify API 대신 띄워 두고,
+   요청마다 새 ApifyClient로 호출할 때와 공유 클라이언트로 호출할 때의 요청당 시간과
+   새로 맺은 TCP 연결 수를 비교합니다. (실제 API에서는 TLS 핸드셰이크 비용이 더해집니다)
+
+사용법:
+    python benchmarks/bench_client_setup.py [요청 수]
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ytcore import clients
+
+FAKE_TOKEN = "bench-token"
+FAKE_GEMINI_KEY = "bench-key"
+MODEL_NAME = "gemini-2.0-flash"
+
+
+class FakeApifyHandler(BaseHTTPRequestHandler):
+    """Actor 실행 조회(GET /v2/actor-runs/<id>)에 항상 SUCCEEDED로 답하는 서버."""
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1  # 헤더와 본문을 한 번에 보내 Nagle/지연 ACK 대기를 피함
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        FakeApifyHandler.connections += 1
+
+    def do_GET(self):
+        body = json.dumps({"data": {"id": self.path.rsplit("/", 1)[-1], "status": "SUCCEEDED"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def per_request_setup_legacy():
+    """변경 전: 요청마다 클라이언트와 모델을 새로 만듦."""
+    from apify_client import ApifyClient
+    import google.generativeai as genai
+    ApifyClient(FAKE_TOKEN)
+    genai.configure(api_key=FAKE_GEMINI_KEY)
+    generation_config = genai.types.GenerationConfig(max_output_tokens=2048, temperature=0.7)
+    genai.GenerativeModel(model_name=MODEL_NAME, generation_config=generation_config)
+
+
+def per_request_setup_shared():
+    """변경 후: 레지스트리에서 꺼내 씀."""
+    clients.get_apify_client(FAKE_TOKEN)
+    clients.get_gemini_model(FAKE_GEMINI_KEY, MODEL_NAME, max_output_tokens=2048)
+
+
+def timed(func, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def bench_setup(count):
+    print("1) 요청당 준비 비용 (네트워크 없음)")
+    print("-" * 70)
+    # 라이브러리 import 비용은 양쪽 모두에서 제외
+    per_request_setup_legacy()
+    per_request_setup_shared()
+    legacy = timed(per_request_setup_legacy, count)
+    shared = timed(per_request_setup_shared, count)
+    print(f"{'요청마다 새로 생성':<24} {legacy * 1e6:>12,.1f} µs/요청")
+    print(f"{'ytcore.clients 재사용':<24} {shared * 1e6:>12,.1f} µs/요청   ({legacy / shared:,.0f}배)")
+
+
+def bench_connections(count):
+    from apify_client import ApifyClient
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeApifyHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}"
+
+    def fresh():
+        ApifyClient(FAKE_TOKEN, api_url=api_url).run("run1").get()
+
+    shared_client = ApifyClient(FAKE_TOKEN, api_url=api_url)
+
+    def shared():
+        shared_client.run("run1").get()
+
+    print()
+    print("2) 연결 재사용 (로컬 keep-alive 서버)")
+    print("-" * 70)
+    for name, func in (("요청마다 새 ApifyClient", fresh), ("공유 ApifyClient", shared)):
+        FakeApifyHandler.connections = 0
+        elapsed = timed(func, count)
+        print(f"{name:<24} {elapsed * 1e3:>10,.2f} ms/요청   새 TCP 연결 {FakeApifyHandler.connections}개")
+    server.shutdown()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print("🔌 클라이언트 재사용 벤치마크")
+    print("=" * 70)
+    print(f"요청 {count:,}회 평균")
+    print()
+    bench_setup(count)
+    bench_connections(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vercel 함수(api/youtube.py) 콜드 스타트 벤치마크
+
+새 파이썬 인터프리터를 여러 번 띄워 다음을 측정합니다.
+- 프로세스 전체 시간: 인터프리터 시작 + 모듈 로드(클라이언트 준비 포함)
+- 모듈 로드 시간: import youtube (서버리스 컨테이너가 처음 뜰 때 한 번 드는 비용)
+- 첫 요청 준비 시간: 첫 요청에서 Apify/Gemini 클라이언트를 꺼내는 데 걸린 시간
+
+CLIENT_BACKEND=sdk(apify_client + google.generativeai)와 rest(ytcore.rest_clients)를 비교하고,
+-X importtime 으로 모듈 로드 시간을 많이 차지하는 패키지를 보여줍니다.
+실제 API는 호출하지 않습니다. (키는 가짜 값)
+
+사용법:
+    python benchmarks/bench_cold_start.py [반복 횟수] [프로파일에 표시할 패키지 수]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+API_DIR = ROOT_DIR / "api"
+
+CHILD = f"""
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {str(API_DIR)!r})
+import youtube
+loaded = time.perf_counter()
+from ytcore import clients
+clients.get_apify_client(os.environ["APIFY_API_TOKEN"])
+clients.get_gemini_model(os.environ["GEMINI_API_KEY"], youtube.GEMINI_MODEL, max_output_tokens=2048)
+ready = time.perf_counter()
+print(json.dumps({{"import": loaded - started, "first_request": ready - loaded}}))
+"""
+
+
+def child_env(backend, cache_path):
+    env = dict(os.environ)
+    env.update(
+        CLIENT_BACKEND=backend,
+        APIFY_API_TOKEN="bench-token",
+        GEMINI_API_KEY="bench-key",
+        CACHE_URL=f"sqlite:///{cache_path}",
+        PYTHONWARNINGS="ignore",
+    )
+    return env
+
+
+def run_once(backend, cache_path):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=child_env(backend, cache_path),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = time.perf_counter() - started
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["total"] = total
+    return timings
+
+
+def import_profile(backend, cache_path, top):
+    """-X importtime 출력의 모듈별 자체 시간을 최상위 패키지 단위로 합쳐 큰 순서로 반환합니다."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {str(API_DIR)!r}); import youtube"],
+        env=child_env(backend, cache_path),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return sorted(((us, package) for package, us in packages.items()), reverse=True)[:top]
+
+
+def summarize(samples, key):
+    values = [sample[key] * 1000 for sample in samples]
+    return statistics.median(values), min(values)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print("🧊 콜드 스타트 벤치마크 (api/youtube.py)")
+    print("=" * 78)
+    print(f"새 인터프리터 {repeat}회 실행, 중앙값(최솟값) ms")
+    print("-" * 78)
+    print(f"{'백엔드':<8} {'프로세스 전체':>18} {'모듈 로드':>18} {'첫 요청 준비':>18}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "cache.sqlite3")
+        results = {}
+        for backend in ("sdk", "rest"):
+            run_once(backend, cache_path)  # 디스크 캐시/바이트코드 준비
+            samples = [run_once(backend, cache_path) for _ in range(repeat)]
+            results[backend] = samples
+            cells = [summarize(samples, key) for key in ("total", "import", "first_request")]
+            print(f"{backend:<8} " + " ".join(f"{median:>10.1f} ({low:>5.1f})" for median, low in cells))
+
+        sdk_total = summarize(results["sdk"], "total")[0]
+        rest_total = summarize(results["rest"], "total")[0]
+        print("-" * 78)
+        print(f"rest 백엔드가 콜드 스타트 {sdk_total - rest_total:.0f} ms 단축 ({sdk_total / rest_total:.2f}배)")
+
+        for backend in ("sdk", "rest"):
+            print()
+            print(f"📦 import 시간 상위 {top}개 패키지 ({backend}, -X importtime 자체 시간 합계)")
+            for self_us, package in import_profile(backend, cache_path, top):
+                print(f"   {self_us / 1000:>8.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
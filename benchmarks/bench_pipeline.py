@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+요약 파이프라인 처리량 벤치마크 (오프라인)
+
+benchmarks/mock_upstreams.py 의 가짜 Apify/Gemini 서버를 별도 프로세스로 띄우고,
+실제 api/youtube.py 의 handler 와 python_bot/server.py 의 Flask app 을 로컬 HTTP 서버로 실행한 뒤
+여러 스레드에서 메시지를 보내 지연 시간 분포(p50/p95/p99), 처리량, 상태 코드, 업스트림 호출 수를 출력합니다.
+
+작업 구성(--mix, 비율):
+- repeat: 몇 개 안 되는 인기 영상을 반복해서 요청 (캐시/요청 합치기 효과)
+- long:   아주 긴 자막 (map-reduce 요약)
+- nocap:  자막 없는 영상
+- live:   진행 중인 라이브 (사전 점검에서 거절)
+- unique: 매번 다른 보통 영상
+
+사용법:
+    python benchmarks/bench_pipeline.py [--target api|flask|both] [--requests 200] [--concurrency 8]
+                                        [--mix repeat=0.4,long=0.1,nocap=0.1,unique=0.4]
+                                        [--apify-latency lognormal:0.3,0.5] [--gemini-latency lognormal:0.2,0.4]
+                                        [--apify-failure-rate 0.0] [--gemini-failure-rate 0.0] [--no-preflight]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+HOT_VIDEOS = 5
+ID_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def start_mock(args):
+    """가짜 업스트림 서버를 별도 프로세스로 띄우고 (프로세스, 주소)를 반환합니다."""
+    command = [
+        sys.executable, str(ROOT_DIR / "benchmarks" / "mock_upstreams.py"),
+        "--port", "0",
+        "--apify-latency", args.apify_latency,
+        "--gemini-latency", args.gemini_latency,
+        "--apify-failure-rate", str(args.apify_failure_rate),
+        "--gemini-failure-rate", str(args.gemini_failure_rate),
+        "--seed", str(args.seed),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline().strip()
+    if not line.startswith("MOCK_BASE_URL="):
+        process.kill()
+        raise RuntimeError(f"가짜 서버 시작 실패: {line}")
+    return process, line.split("=", 1)[1]
+
+
+def mock_call(base_url, path, method="GET"):
+    request = urllib.request.Request(base_url + path, data=b"{}" if method == "POST" else None, method=method)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def make_workload(count, mix, seed):
+    """(방, 메시지) 목록을 만듭니다."""
+    rng = random.Random(seed)
+    kinds, weights = zip(*mix.items())
+
+    def unique_id(prefix):
+        return prefix + "".join(rng.choice(ID_CHARS) for _ in range(11 - len(prefix)))
+
+    workload = []
+    for index in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "repeat":
+            video_id = f"HOT{rng.randrange(HOT_VIDEOS):08d}"
+        elif kind == "long":
+            video_id = unique_id("LONG")
+        elif kind == "nocap":
+            video_id = unique_id("NOCAP")
+        elif kind == "live":
+            video_id = unique_id("LIVE")
+        else:
+            video_id = unique_id("V")
+        workload.append((f"room{index % 7}", f"이거 보세요 https://youtu.be/{video_id}"))
+    return workload
+
+
+def start_api_target():
+    sys.path.insert(0, str(ROOT_DIR / "api"))
+    from http.server import ThreadingHTTPServer
+    import youtube
+    server = ThreadingHTTPServer(("127.0.0.1", 0), youtube.handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/api/youtube", server.shutdown
+
+
+def start_flask_target():
+    sys.path.insert(0, str(ROOT_DIR / "python_bot"))
+    from werkzeug.serving import make_server
+    import server as flask_server
+    server = make_server("127.0.0.1", 0, flask_server.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/youtube", server.shutdown
+
+
+TARGETS = {"api": start_api_target, "flask": start_flask_target}
+
+
+def post(url, room, message):
+    body = json.dumps({"room": room, "sender": "bench", "msg": message}).encode()
+    request = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except Exception:
+        status = "error"
+    return time.perf_counter() - started, status
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_target(name, url, workload, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda job: post(url, *job), workload))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        "target": name,
+        "requests": len(results),
+        "elapsed": elapsed,
+        "throughput": len(results) / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1],
+        "statuses": statuses,
+    }
+
+
+def print_report(result, upstream):
+    print(f"\n▶ {result['target']}  ({result['requests']}건, {result['elapsed']:.1f}초)")
+    print(f"   처리량   {result['throughput']:8.2f} 요청/초")
+    print(f"   지연     p50 {result['p50'] * 1000:8.0f} ms   p95 {result['p95'] * 1000:8.0f} ms   "
+          f"p99 {result['p99'] * 1000:8.0f} ms   max {result['max'] * 1000:8.0f} ms")
+    print(f"   상태     " + ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items(), key=str)))
+    print("   업스트림 " + ", ".join(f"{name}={count}" for name, count in sorted(upstream.items())))
+    per_request = upstream.get("gemini.calls", 0) / result["requests"]
+    print(f"   요청당   Apify 실행 {upstream.get('apify.runs', 0) / result['requests']:.2f}회, Gemini 호출 {per_request:.2f}회")
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        mix[kind.strip()] = float(weight)
+    unknown = set(mix) - {"repeat", "long", "nocap", "live", "unique"}
+    if unknown:
+        raise SystemExit(f"알 수 없는 작업 종류: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요약 파이프라인 처리량 벤치마크 (가짜 업스트림 사용)")
+    parser.add_argument("--target", choices=["api", "flask", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default="repeat=0.4,long=0.1,nocap=0.1,unique=0.4")
+    parser.add_argument("--apify-latency", default="lognormal:0.3,0.5")
+    parser.add_argument("--gemini-latency", default="lognormal:0.2,0.4")
+    parser.add_argument("--apify-failure-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-preflight", action="store_true", help="영상 사전 점검을 끄고 측정 (PREFLIGHT=0)")
+    parser.add_argument("--verbose", action="store_true", help="대상 서버 로그를 그대로 출력")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    mock_process, mock_url = start_mock(args)
+    tmp = tempfile.TemporaryDirectory()
+
+    # 대상 모듈을 불러오기 전에 업스트림 주소와 설정을 정함
+    os.environ.update(
+        CLIENT_BACKEND="rest",
+        APIFY_API_BASE_URL=mock_url,
+        GEMINI_API_BASE_URL=mock_url,
+        YOUTUBE_BASE_URL=mock_url,
+        APIFY_API_TOKEN="bench-token",
+        GEMINI_API_KEY="bench-key",
+        CACHE_URL=f"sqlite:///{os.path.join(tmp.name, 'cache.sqlite3')}",
+        PYTHONWARNINGS="ignore",
+        PREFLIGHT="0" if args.no_preflight else "1",
+    )
+
+    targets = ["api", "flask"] if args.target == "both" else [args.target]
+    print("🏁 파이프라인 벤치마크 (가짜 Apify/Gemini)")
+    print("=" * 78)
+    print(f"요청 {args.requests}건, 동시 {args.concurrency}, 구성 {mix}")
+    print(f"Apify {args.apify_latency} (실패율 {args.apify_failure_rate:.0%}), "
+          f"Gemini {args.gemini_latency} (실패율 {args.gemini_failure_rate:.0%})")
+
+    try:
+        for name in targets:
+            workload = make_workload(args.requests, mix, args.seed)
+            quiet = io.StringIO()
+            with contextlib.ExitStack() as stack:
+                if not args.verbose:
+                    # 대상 서버의 print/접속 로그/경고는 결과 표에 섞이지 않도록 버림
+                    stack.enter_context(contextlib.redirect_stdout(quiet))
+                    stack.enter_context(contextlib.redirect_stderr(quiet))
+                    stack.enter_context(warnings.catch_warnings())
+                    warnings.simplefilter("ignore")
+                url, stop = TARGETS[name]()
+                if not args.verbose:
+                    logging.disable(logging.WARNING)
+                mock_call(mock_url, "/__reset", "POST")
+                result = run_target(name, url, workload, args.concurrency)
+                upstream = mock_call(mock_url, "/__stats")
+                stop()
+            print_report(result, upstream)
+    finally:
+        mock_process.terminate()
+        mock_process.wait()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+요약 지시문 캐시 벤치마크: 입력 토큰(과금 기준)과 Gemini 응답 시간 비교 (오프라인)
+
+benchmarks/mock_upstreams.py 의 가짜 Gemini 서버를 띄우고 api/youtube.py 의 summarize_with_gemini 를
+영상(자막 길이 --transcript-chars)마다 여러 번 호출해 방식별 호출당 입력 토큰, 캐시 토큰, 과금 토큰과 응답 시간을 출력합니다.
+
+- inline:  지시문과 영상 정보를 한 프롬프트로 보냄 (이전 방식)
+- system:  지시문을 system instruction으로 따로 보냄 (GEMINI_PROMPT_CACHE=0)
+- cached:  지시문을 모델별 캐시(cachedContents)로 한 번 만들어 참조 (최소 크기 검사 없음)
+- cached@N: 실제 Gemini 최소 캐시 크기(N토큰) 검사를 켠 기본 설정 (지시문이 짧으면 system과 같음)
+
+가짜 서버는 캐시에서 읽은 토큰을 다시 처리하지 않고(지연 없음) 일반 입력 단가의 CACHED_TOKEN_PRICE 배로 과금합니다.
+
+사용법:
+    python benchmarks/bench_prompt_cache.py [--requests 30] [--transcript-chars 1500,10000]
+                                            [--gemini-latency fixed:0.2] [--concurrency 4]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bench_pipeline import mock_call, percentile, start_mock
+from mock_upstreams import SENTENCE
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def make_transcript(chars, seed):
+    parts, n = [], seed * 1000
+    while sum(len(part) for part in parts) < chars:
+        parts.append(SENTENCE.format(n=n))
+        n += 1
+    return "".join(parts)[:chars]
+
+
+def run_mode(youtube, mode, transcripts, concurrency):
+    """방식 하나로 자막마다 요약을 만들고 응답 시간 목록을 반환합니다."""
+    from ytcore.prompt_cache import PromptCache
+
+    if mode == "inline":
+        def summarize(title, transcript):
+            return youtube.generate_with_gemini(youtube.REPORT_INSTRUCTION + youtube.build_report_prompt(title, transcript))
+    else:
+        def summarize(title, transcript):
+            return youtube.summarize_with_gemini(transcript, title)
+        if mode == "system":
+            youtube.prompt_cache = None
+        elif mode == "cached":
+            youtube.prompt_cache = PromptCache(min_tokens=0)
+        else:
+            youtube.prompt_cache = PromptCache(min_tokens=int(mode.split("@")[1]))
+
+    def timed(item):
+        title, transcript = item
+        started = time.perf_counter()
+        summary = summarize(title, transcript)
+        return time.perf_counter() - started, summary is not None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(timed, transcripts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요약 지시문 캐시의 입력 토큰/응답 시간 비교")
+    parser.add_argument("--requests", type=int, default=30, help="자막 길이별 요약 수")
+    parser.add_argument("--transcript-chars", default="1500,10000", help="자막 길이(자) 목록 (쉼표로 구분)")
+    parser.add_argument("--modes", default="inline,system,cached,cached@1024")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--gemini-latency", default="fixed:0.2")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    args.apify_latency = "fixed:0.1"
+    args.apify_failure_rate = args.gemini_failure_rate = 0.0
+    mock_process, mock_url = start_mock(args)
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.update(
+        CLIENT_BACKEND="rest",
+        GEMINI_API_BASE_URL=mock_url,
+        APIFY_API_BASE_URL=mock_url,
+        YOUTUBE_BASE_URL=mock_url,
+        APIFY_API_TOKEN="bench-token",
+        GEMINI_API_KEY="bench-key",
+        CACHE_URL=f"sqlite:///{os.path.join(tmp.name, 'cache.sqlite3')}",
+    )
+    sys.path.insert(0, str(ROOT_DIR / "api"))
+    warnings.simplefilter("ignore")
+    import youtube
+    logging.getLogger().setLevel(logging.ERROR)
+
+    sizes = [int(size) for size in args.transcript_chars.split(",") if size.strip()]
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    print("🗃️ 요약 지시문 캐시 벤치마크 (가짜 Gemini)")
+    print("=" * 100)
+    print(f"지시문 {len(youtube.REPORT_INSTRUCTION)}자, Gemini {args.gemini_latency}, 자막 길이별 {args.requests}회, "
+          f"동시 {args.concurrency}")
+    print(f"  {'자막':>6}  {'방식':<12} {'성공':>4}  {'입력 토큰':>9}  {'캐시 토큰':>9}  {'과금 토큰':>9}  "
+          f"{'절감':>6}  {'p50':>7}  {'p95':>7}  {'캐시 생성':>4}")
+    try:
+        for size in sizes:
+            transcripts = [(f"벤치마크 영상 {i}", make_transcript(size, args.seed + i)) for i in range(args.requests)]
+            baseline = None
+            for mode in modes:
+                mock_call(mock_url, "/__reset", "POST")
+                results = run_mode(youtube, mode, transcripts, args.concurrency)
+                stats = mock_call(mock_url, "/__stats")
+                calls = max(1, stats.get("gemini.calls", 0))
+                billed = stats.get("gemini.billed_input_tokens", 0) / calls
+                baseline = baseline or billed
+                latencies = sorted(latency for latency, _ in results)
+                print(f"  {size:>6}  {mode:<12} {sum(ok for _, ok in results):>4}  "
+                      f"{stats.get('gemini.prompt_tokens', 0) / calls:>9.0f}  "
+                      f"{stats.get('gemini.cached_tokens', 0) / calls:>9.0f}  {billed:>9.0f}  "
+                      f"{1 - billed / baseline:>6.1%}  {percentile(latencies, 0.5):>6.3f}s  "
+                      f"{percentile(latencies, 0.95):>6.3f}s  {stats.get('gemini.cache_creates', 0):>4}")
+    finally:
+        mock_process.terminate()
+        mock_process.wait()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+자막 정리(ytcore.transcript_clean) 벤치마크
+
+한국어/영어 자막 말뭉치를 만들어 clean_transcript 전후의 글자 수와 추정 토큰 수,
+단계별 제거 개수, 처리 속도를 출력하고 같은 입력에 항상 같은 결과가 나오는지 확인합니다.
+
+말뭉치는 자동 자막의 특징(롤링 자막 겹침, 같은 줄 반복, [음악]/[Music] 표시, 추임새)을 흉내 내어
+시드로 고정 생성합니다. 실제 자막 파일(.txt)이 있는 디렉터리를 주면 그 파일들도 함께 측정합니다.
+
+사용법:
+    python benchmarks/bench_transcript_clean.py [자막 수(언어별)] [자막 디렉터리]
+"""
+
+import hashlib
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ytcore.transcript_clean import clean_transcript
+
+KOREAN_SENTENCES = [
+    "오늘은 파이썬으로 업무 자동화를 하는 방법을 알아보겠습니다",
+    "먼저 필요한 라이브러리를 설치해야 합니다",
+    "이 부분이 정말 중요한데요 많은 분들이 여기서 실수를 하십니다",
+    "데이터를 가져온 다음에는 필요한 항목만 골라서 정리합니다",
+    "결과를 엑셀 파일로 저장하면 나중에 확인하기 편합니다",
+    "반복되는 작업은 스케줄러에 등록해 두면 매일 자동으로 실행됩니다",
+    "오류가 났을 때는 로그를 먼저 확인하는 습관을 들이세요",
+    "다음 영상에서는 웹 크롤링을 더 자세히 다뤄 보겠습니다",
+    "구독과 좋아요 부탁드립니다",
+]
+ENGLISH_SENTENCES = [
+    "today we are going to talk about caching strategies for web applications",
+    "the first thing you need to understand is how the request flows through the system",
+    "this is really important because most performance problems start right here",
+    "once the data is in memory you can serve it without touching the database",
+    "but you have to be careful about invalidation when the source changes",
+    "a simple time based expiry is often good enough for most use cases",
+    "let me show you a quick demo of how this works in practice",
+    "if you found this helpful please like and subscribe",
+]
+LANGUAGES = {
+    "ko": {
+        "sentences": KOREAN_SENTENCES,
+        "details": ["약 {n}초가 걸립니다", "{n}번 예제를 보시면", "{n}퍼센트 정도 빨라집니다", "{n}줄이면 충분합니다"],
+        "annotations": ["[음악]", "[박수]", "[웃음]", "(웃음)", "♪♪"],
+        "fillers": ["음", "어", "음음", "으음"],
+        "backchannel": ["네.", "그렇죠.", "자."],
+    },
+    "en": {
+        "sentences": ENGLISH_SENTENCES,
+        "details": ["and it takes about {n} seconds", "as you can see in example {n}", "which is {n} percent faster",
+                    "with only {n} lines of code"],
+        "annotations": ["[Music]", "[Applause]", "[Laughter]", "(laughs)", "♪"],
+        "fillers": ["um", "uh", "umm", "erm"],
+        "backchannel": ["okay.", "right.", "yeah."],
+    },
+}
+
+
+def make_transcript(rng, spec, sentence_count):
+    """롤링 자막 형태의 자막 하나를 만듭니다. (줄마다 앞 줄의 뒷부분을 다시 포함)"""
+    words = []
+    for _ in range(sentence_count):
+        sentence = rng.choice(spec["sentences"]).split()
+        # 실제 자막처럼 문장마다 내용이 조금씩 다르도록 숫자가 들어간 구절을 덧붙임
+        if rng.random() < 0.8:
+            sentence += rng.choice(spec["details"]).format(n=rng.randint(1, 999)).split()
+        for word in sentence:
+            words.append(word)
+            if rng.random() < 0.05:
+                words.append(rng.choice(spec["fillers"]))
+        words[-1] += "."
+        if rng.random() < 0.1:
+            words.append(rng.choice(spec["backchannel"]))
+
+    lines = []
+    position = 0
+    while position < len(words):
+        width = rng.randint(6, 10)
+        line = words[position:position + width]
+        if rng.random() < 0.08:
+            line.insert(rng.randint(0, len(line)), rng.choice(spec["annotations"]))
+        lines.append(" ".join(line))
+        if rng.random() < 0.05:
+            lines.append(lines[-1])  # 같은 줄 반복
+        # 롤링 자막: 다음 줄이 이번 줄의 뒷부분을 다시 시작
+        position += max(1, width - rng.randint(0, width // 2))
+    return "\n".join(lines)
+
+
+def make_corpus(per_language, seed=42):
+    rng = random.Random(seed)
+    corpus = []
+    for language, spec in LANGUAGES.items():
+        for _ in range(per_language):
+            corpus.append((language, make_transcript(rng, spec, rng.randint(40, 400))))
+    return corpus
+
+
+def load_directory(directory):
+    return [("file", path.read_text(encoding="utf-8")) for path in sorted(Path(directory).glob("*.txt"))]
+
+
+def digest(texts):
+    sha = hashlib.sha256()
+    for text in texts:
+        sha.update(text.encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()[:16]
+
+
+def run(corpus, drop_low_info):
+    groups = {}
+    outputs = []
+    for language, text in corpus:
+        started = time.perf_counter()
+        cleaned, stats = clean_transcript(text, drop_low_info=drop_low_info)
+        elapsed = time.perf_counter() - started
+        outputs.append(cleaned)
+        group = groups.setdefault(language, {"count": 0, "elapsed": 0.0, "bytes": 0})
+        group["count"] += 1
+        group["elapsed"] += elapsed
+        group["bytes"] += len(text.encode("utf-8"))
+        for key, value in stats.items():
+            group[key] = group.get(key, 0) + value
+    return groups, outputs
+
+
+def print_groups(title, groups):
+    print(title)
+    print(f"{'말뭉치':<6} {'자막':>5} {'글자 전→후':>22} {'토큰 절약':>10} {'자막당':>9} {'처리량':>10}")
+    for language, group in groups.items():
+        chars = f"{group['chars_before']:,}→{group['chars_after']:,}"
+        chars_saved = 1 - group["chars_after"] / max(1, group["chars_before"])
+        tokens_saved = group["tokens_removed"] / max(1, group["tokens_before"])
+        per_item = group["elapsed"] / group["count"] * 1000
+        throughput = group["bytes"] / group["elapsed"] / 1e6
+        print(f"{language:<6} {group['count']:>5} {chars:>22} {tokens_saved:>9.1%} {per_item:>7.2f}ms {throughput:>7.2f}MB/s"
+              f"   (글자 {chars_saved:.1%} 감소)")
+        print(f"{'':<6} 제거: 표시 {group['annotations']:,}, 중복 줄 {group['duplicate_lines']:,}, "
+              f"추임새 {group['fillers']:,}, 반복 단어 {group['repeated_words']:,}, 맞장구 문장 {group['low_info_sentences']:,}")
+
+
+def main():
+    per_language = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    corpus = make_corpus(per_language)
+    if len(sys.argv) > 2:
+        corpus += load_directory(sys.argv[2])
+
+    print("🧹 자막 정리 벤치마크")
+    print("=" * 78)
+    for drop_low_info in (False, True):
+        groups, outputs = run(corpus, drop_low_info)
+        _, repeated = run(corpus, drop_low_info)
+        print_groups(f"\ndrop_low_info={drop_low_info}", groups)
+        same = digest(outputs) == digest(repeated)
+        print(f"결정성: {'✅ 두 번 실행 결과 동일' if same else '❌ 실행마다 결과가 다름'} ({digest(outputs)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+YouTube URL 추출 마이크로 벤치마크
+
+채팅 메시지 말뭉치를 만들어 기존 파서들(api normalize_url, YouTubeDetector 패턴 반복)과
+ytcore.youtube_url 의 단일 정규식 추출기를 비교하고 초당 처리 메시지 수를 출력합니다.
+
+사용법:
+    python benchmarks/bench_url_extract.py [메시지 수] [반복 횟수]
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ytcore.youtube_url import extract_video_ids
+
+CHAT_LINES = [
+    "ㅋㅋㅋㅋ 이거 봐봐",
+    "오늘 점심 뭐 먹을까요?",
+    "회의는 3시에 시작합니다",
+    "Did you see the game last night?",
+    "이번 주말에 등산 가실 분~",
+    "사진 보내드릴게요",
+    "넵 알겠습니다!",
+    "링크 공유합니다",
+]
+
+URL_FORMS = [
+    "https://www.youtube.com/watch?v={id}",
+    "https://youtube.com/watch?v={id}&t=42s",
+    "https://www.youtube.com/watch?feature=share&v={id}",
+    "https://m.youtube.com/watch?v={id}&list=PL1234",
+    "https://music.youtube.com/watch?v={id}&si=abcdef",
+    "https://youtu.be/{id}?si=XyZ123",
+    "https://www.youtube.com/live/{id}?feature=shared",
+    "https://youtube.com/shorts/{id}",
+    "https://www.youtube.com/embed/{id}",
+    "https://www.youtube.com/v/{id}",
+]
+
+ID_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+
+
+def make_corpus(size, seed=42):
+    """URL이 없는 메시지, 하나 있는 메시지, 여러 개 있는 메시지를 섞은 말뭉치를 만듭니다."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = [rng.choice(CHAT_LINES) for _ in range(rng.randint(1, 4))]
+        roll = rng.random()
+        url_count = 0 if roll < 0.6 else (1 if roll < 0.9 else rng.randint(2, 4))
+        for _ in range(url_count):
+            video_id = "".join(rng.choice(ID_CHARS) for _ in range(11))
+            words.insert(rng.randint(0, len(words)), rng.choice(URL_FORMS).format(id=video_id))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def legacy_api_normalize(url):
+    """변경 전 api/youtube.py 의 normalize_url + get_video_id (첫 URL만 찾음)."""
+    for pattern in (r"youtu\.be/([a-zA-Z0-9_-]+)",
+                    r"youtube\.com/watch\?v=([a-zA-Z0-9_-]+)",
+                    r"youtube\.com/live/([a-zA-Z0-9_-]+)",
+                    r"youtube\.com/shorts/([a-zA-Z0-9_-]+)"):
+        match = re.search(pattern, url)
+        if match:
+            normalized = f"https://www.youtube.com/watch?v={match.group(1)}"
+            return [re.search(r"watch\?v=([a-zA-Z0-9_-]+)", normalized).group(1)]
+    return []
+
+
+LEGACY_DETECTOR_PATTERNS = [
+    r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/|youtube\.com\/v\/)([\w-]+)',
+    r'youtube\.com\/watch\?.*v=([\w-]+)',
+    r'youtu\.be\/([\w-]+)',
+    r'youtube\.com\/embed\/([\w-]+)',
+    r'youtube\.com\/v\/([\w-]+)'
+]
+
+
+def legacy_detector(text):
+    """변경 전 YouTubeDetector: detect_youtube_url 후 extract_video_id 로 두 번 훑음."""
+    detected = None
+    for pattern in LEGACY_DETECTOR_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            detected = match.group(0)
+            break
+    if not detected:
+        return []
+    for pattern in LEGACY_DETECTOR_PATTERNS:
+        match = re.search(pattern, detected, re.IGNORECASE)
+        if match:
+            return [match.group(1)]
+    return []
+
+
+def bench(name, func, corpus, repeat):
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(len(func(message)) for message in corpus)
+        best = min(best, time.perf_counter() - start)
+    rate = len(corpus) / best
+    print(f"{name:<28} {rate:>12,.0f} 메시지/초   (찾은 ID: {found})")
+    return rate
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    corpus = make_corpus(size)
+    expected = sum(len(set(re.findall(r"[?&/]v[=/]([\w-]{11})|(?:be|live|shorts|embed)/([\w-]{11})", m))) > 0 for m in corpus)
+
+    print("🔗 YouTube URL 추출 벤치마크")
+    print("=" * 70)
+    print(f"메시지 {size:,}개, URL 포함 메시지 약 {expected:,}개, 최선 {repeat}회 기준")
+    print("-" * 70)
+    legacy_api = bench("기존 api normalize_url", legacy_api_normalize, corpus, repeat)
+    legacy_det = bench("기존 YouTubeDetector", legacy_detector, corpus, repeat)
+    shared = bench("ytcore extract_video_ids", extract_video_ids, corpus, repeat)
+    print("-" * 70)
+    print(f"api 대비 {shared / legacy_api:.2f}배, detector 대비 {shared / legacy_det:.2f}배")
+    print("※ 기존 파서는 메시지당 첫 URL만 찾고, 새 추출기는 모든 URL을 찾습니다.")
+
+
+if __name__ == "__main__":
+    main()
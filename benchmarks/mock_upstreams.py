@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Apify / Gemini API를 흉내 내는 로컬 서버 (오프라인 벤치마크용)
+
+실제 서비스 대신 이 서버를 띄우고 APIFY_API_BASE_URL, GEMINI_API_BASE_URL 을 이 주소로 설정하면
+api/youtube.py 와 python_bot/server.py 를 외부 호출 없이 그대로 돌려볼 수 있습니다. (CLIENT_BACKEND=rest)
+
+흉내 내는 API:
+- POST /v2/acts/<actor>/runs                  Actor 실행 시작 (실행 시간은 지연 분포에서 뽑음)
+- GET  /v2/actor-runs/<id>?waitForFinish=N    실행 상태 (끝날 때까지 최대 N초 대기)
+- POST /v2/actor-runs/<id>/abort              실행 중단
+- GET  /v2/datasets/<id>/items                실행이 끝난 뒤에만 항목 반환
+- POST /v1beta/models/<model>:generateContent / :streamGenerateContent?alt=sse
+- POST /v1beta/cachedContents                 지시문 캐시 만들기 (generateContent 의 cachedContent 로 참조)
+- GET  /watch?v=<id>, /oembed?url=...           YouTube 시청 페이지(ytInitialPlayerResponse) / oEmbed (YOUTUBE_BASE_URL)
+- GET  /api/timedtext?v=<id>&lang=<code>        YouTube 자막 트랙 (fmt=json3)
+- GET  /__stats, POST /__reset                호출 수 통계 조회 / 초기화
+
+영상 ID 접두어로 자막 상황을 정합니다.
+- NOCAP...  모든 언어에서 자막 없음
+- EN...     영어 자막만 있음
+- LONG...   아주 긴 한국어 자막
+- LIVE...   진행 중인 라이브 (자막 없음)
+- MEMB...   멤버십 전용 영상 (재생 불가, 자막 없음)
+- HUGE...   10시간짜리 영상 (보통 길이의 한국어 자막)
+- 그 외     보통 길이의 한국어 자막
+
+Gemini 입력 토큰은 2자당 1토큰으로 셉니다. 캐시에서 읽은 토큰(cachedContentTokenCount)은 다시 처리하지 않으므로
+응답 지연에 더해지지 않고 CACHED_TOKEN_PRICE 비율로만 과금한 것으로 봅니다. (/__stats 의 gemini.billed_input_tokens)
+
+사용법:
+    python benchmarks/mock_upstreams.py [--port 8787] [--apify-latency lognormal:0.3,0.5]
+                                        [--gemini-latency lognormal:0.2,0.4]
+                                        [--apify-failure-rate 0.0] [--gemini-failure-rate 0.0]
+                                        [--gemini-cache-min-tokens 0]
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SUMMARY_TEXT = (
+    "• 개요\n이 영상은 벤치마크용 가짜 영상으로, 주제와 배경을 간단히 소개합니다.\n\n"
+    "• 내용\n• 첫 번째 핵심 내용을 설명합니다.\n• 두 번째 핵심 내용을 예시와 함께 다룹니다.\n"
+    "• 세 번째로 실제 적용 방법을 정리합니다.\n\n"
+    "• 결론\n핵심 내용을 정리하고 앞으로의 방향을 제시합니다.\n"
+)
+
+# 캐시에서 읽은 입력 토큰의 단가 (일반 입력 토큰 대비, Gemini 컨텍스트 캐싱 할인)
+CACHED_TOKEN_PRICE = 0.25
+
+SENTENCE = "오늘은 {n}번째 주제에 대해 자세히 이야기해 보겠습니다. "
+VIDEO_ID_RE = re.compile(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]+)")
+
+
+class LatencyProfile:
+    """
+    지연 시간 분포와 실패율.
+    "fixed:0.2", "uniform:0.1,0.5", "lognormal:중앙값,sigma" 형식으로 만듭니다.
+    """
+
+    def __init__(self, kind="lognormal", params=(0.3, 0.5), failure_rate=0.0):
+        self.kind = kind
+        self.params = params
+        self.failure_rate = failure_rate
+
+    @classmethod
+    def parse(cls, spec, failure_rate=0.0):
+        kind, _, values = spec.partition(":")
+        return cls(kind, tuple(float(value) for value in values.split(",") if value), failure_rate)
+
+    def sample(self, rng):
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        median, sigma = (self.params + (0.5,))[:2]
+        return rng.lognormvariate(math.log(median), sigma)
+
+    def fails(self, rng):
+        return rng.random() < self.failure_rate
+
+    def __str__(self):
+        return f"{self.kind}:{','.join(str(value) for value in self.params)} (실패율 {self.failure_rate:.0%})"
+
+
+def transcript_for(video_id, language, long_chars):
+    """영상 ID와 언어로 자막 텍스트를 정합니다. 자막이 없으면 빈 문자열."""
+    if video_id.startswith(("NOCAP", "LIVE", "MEMB")):
+        return ""
+    if video_id.startswith("EN"):
+        if language not in ("English", "Default"):
+            return ""
+        return " ".join(f"This is sentence number {n} about the topic." for n in range(60))
+    if language not in ("Korean", "Default"):
+        return ""
+    size = long_chars if video_id.startswith("LONG") else 3000
+    text = "".join(SENTENCE.format(n=n) for n in range(size // len(SENTENCE) + 1))
+    return text[:size]
+
+
+def player_response_for(video_id):
+    """영상 ID로 YouTube 시청 페이지의 ytInitialPlayerResponse를 만듭니다."""
+    if video_id.startswith("MEMB"):
+        return {"playabilityStatus": {"status": "UNPLAYABLE", "reason": "Join this channel to get access to members-only content"}}
+    details = {"videoId": video_id, "title": f"벤치마크 영상 {video_id}", "lengthSeconds": "600", "isLiveContent": False}
+    tracks = [{"languageCode": "ko", "kind": "asr"}]
+    if video_id.startswith("LIVE"):
+        details.update(lengthSeconds="0", isLiveContent=True, isLive=True)
+        tracks = []
+    elif video_id.startswith("NOCAP"):
+        tracks = []
+    elif video_id.startswith("EN"):
+        tracks = [{"languageCode": "en"}]
+    elif video_id.startswith("LONG"):
+        details["lengthSeconds"] = "7200"
+    elif video_id.startswith("HUGE"):
+        details["lengthSeconds"] = "36000"
+    response = {"playabilityStatus": {"status": "OK"}, "videoDetails": details}
+    for track in tracks:
+        track["baseUrl"] = f"/api/timedtext?v={video_id}&lang={track['languageCode']}"
+    if tracks:
+        response["captions"] = {"playerCaptionsTracklistRenderer": {"captionTracks": tracks}}
+    return response
+
+
+class MockUpstreams:
+    """가짜 Apify + Gemini 서버."""
+
+    def __init__(self, apify=None, gemini=None, long_chars=60000, seed=0, cache_min_tokens=0):
+        self.apify = apify or LatencyProfile()
+        self.gemini = gemini or LatencyProfile("lognormal", (0.2, 0.4))
+        self.long_chars = long_chars
+        self.cache_min_tokens = cache_min_tokens
+        self.cached_contents = {}
+        self.cache_ids = itertools.count(1)
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.runs = {}
+        self.run_ids = itertools.count(1)
+        self.server = None
+        self.reset()
+
+    # 통계
+
+    def reset(self):
+        with self.lock:
+            self.counts = {}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counts)
+        if "gemini.prompt_tokens" in stats:
+            cached = stats.get("gemini.cached_tokens", 0)
+            stats["gemini.billed_input_tokens"] = stats["gemini.prompt_tokens"] - cached + cached * CACHED_TOKEN_PRICE
+        return stats
+
+    def _sample(self, profile):
+        with self.rng_lock:
+            return profile.sample(self.rng), profile.fails(self.rng)
+
+    # Apify
+
+    def start_run(self, actor_id, run_input):
+        duration, failed = self._sample(self.apify)
+        run_id = f"run{next(self.run_ids)}"
+        run = {
+            "id": run_id,
+            "actId": actor_id,
+            "status": "RUNNING",
+            "defaultDatasetId": f"ds-{run_id}",
+            "_input": run_input,
+            "_finish_at": time.monotonic() + duration,
+            "_final": "FAILED" if failed else "SUCCEEDED",
+        }
+        with self.lock:
+            self.runs[run_id] = run
+        self.count("apify.runs")
+        self.count(f"apify.runs.{run_input.get('language', 'none')}")
+        if failed:
+            self.count("apify.runs.failed")
+        return self.public_run(run)
+
+    def refresh(self, run):
+        if run["status"] == "RUNNING" and time.monotonic() >= run["_finish_at"]:
+            run["status"] = run["_final"]
+        return run
+
+    def public_run(self, run):
+        return {key: value for key, value in self.refresh(run).items() if not key.startswith("_")}
+
+    def wait_run(self, run_id, wait_secs):
+        run = self.runs[run_id]
+        deadline = time.monotonic() + wait_secs
+        while self.refresh(run)["status"] == "RUNNING" and time.monotonic() < deadline:
+            time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+        return self.public_run(run)
+
+    def abort_run(self, run_id):
+        run = self.runs[run_id]
+        if self.refresh(run)["status"] == "RUNNING":
+            run["status"] = "ABORTED"
+            self.count("apify.aborts")
+        return self.public_run(run)
+
+    def dataset_items(self, dataset_id):
+        run = self.runs[dataset_id[len("ds-"):]]
+        if self.refresh(run)["status"] != "SUCCEEDED":
+            return []
+        run_input = run["_input"]
+        items = []
+        for start_url in run_input.get("startUrls", []):
+            url = start_url["url"] if isinstance(start_url, dict) else start_url
+            match = VIDEO_ID_RE.search(url)
+            video_id = match.group(1) if match else url
+            items.append({
+                "url": url,
+                "videoTitle": f"벤치마크 영상 {video_id}",
+                "title": f"벤치마크 영상 {video_id}",
+                "transcript": transcript_for(video_id, run_input.get("language", "Korean"), self.long_chars),
+            })
+        return items
+
+    # Gemini
+
+    def generate(self, prompt_chars, cached_chars=0):
+        latency, failed = self._sample(self.gemini)
+        # 입력이 길수록 조금 더 오래 걸림 (캐시에서 읽은 앞부분은 다시 처리하지 않음)
+        time.sleep(latency * (1 + (prompt_chars - cached_chars) / 20000))
+        self.count("gemini.calls")
+        self.count("gemini.prompt_chars", prompt_chars)
+        self.count("gemini.prompt_tokens", prompt_chars // 2)
+        self.count("gemini.cached_tokens", cached_chars // 2)
+        if failed:
+            self.count("gemini.failed")
+        return not failed
+
+    def create_cached_content(self, body):
+        """지시문 캐시를 만듭니다. 최소 토큰 수보다 짧으면 None"""
+        text = "".join(part.get("text", "") for part in body.get("systemInstruction", {}).get("parts", []))
+        if len(text) // 2 < self.cache_min_tokens:
+            return None
+        ttl = float(str(body.get("ttl", "3600s")).rstrip("s"))
+        name = f"cachedContents/mock{next(self.cache_ids)}"
+        with self.lock:
+            self.cached_contents[name] = {"model": body.get("model", ""), "text": text, "expires": time.monotonic() + ttl}
+        self.count("gemini.cache_creates")
+        return {"name": name, "model": body.get("model", ""), "usageMetadata": {"totalTokenCount": len(text) // 2}}
+
+    def cached_content(self, name):
+        with self.lock:
+            cached = self.cached_contents.get(name)
+            if cached is not None and time.monotonic() >= cached["expires"]:
+                del self.cached_contents[name]
+                cached = None
+        return cached
+
+    # 서버
+
+    def start(self, host="127.0.0.1", port=0):
+        self.server = _Server((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_port}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+class _Server(ThreadingHTTPServer):
+    # 동시 연결 수백 개를 받는 부하 테스트에서도 연결이 밀리지 않도록 listen 대기열을 늘림
+    request_queue_size = 1024
+
+
+def _make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = -1
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, payload, status=200, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length)) if length else {}
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            parts = url.path.strip("/").split("/")
+            if url.path == "/__stats":
+                return self._json(mock.stats())
+            if url.path == "/watch":
+                mock.count("youtube.watch")
+                player = json.dumps(player_response_for(query.get("v", [""])[0]), ensure_ascii=False)
+                html = f"<html><script>var ytInitialPlayerResponse = {player};var meta = {{}};</script></html>".encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(html)))
+                self.end_headers()
+                self.wfile.write(html)
+                return
+            if url.path == "/api/timedtext":
+                mock.count("youtube.timedtext")
+                language = {"ko": "Korean", "en": "English"}.get(query.get("lang", [""])[0], "")
+                text = transcript_for(query.get("v", [""])[0], language, mock.long_chars)
+                sentences = [sentence.strip() + "." for sentence in text.split(".") if sentence.strip()]
+                return self._json({"events": [{"segs": [{"utf8": sentence}]} for sentence in sentences]})
+            if url.path == "/oembed":
+                mock.count("youtube.oembed")
+                match = VIDEO_ID_RE.search(query.get("url", [""])[0])
+                video_id = match.group(1) if match else ""
+                if video_id.startswith("MEMB"):
+                    return self._json({"error": "Unauthorized"}, 401)
+                return self._json({"title": f"벤치마크 영상 {video_id}", "type": "video"})
+            if parts[:2] == ["v2", "actor-runs"] and parts[2] in mock.runs:
+                wait = min(60, int(query.get("waitForFinish", ["0"])[0]))
+                mock.count("apify.run_status")
+                return self._json({"data": mock.wait_run(parts[2], wait)})
+            if parts[:2] == ["v2", "datasets"] and parts[-1] == "items":
+                mock.count("apify.dataset_reads")
+                items = mock.dataset_items(parts[2])
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", [str(len(items))])[0])
+                return self._json(items[offset:offset + limit], headers={"X-Apify-Pagination-Total": str(len(items))})
+            self._json({"error": "not found"}, 404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")
+            body = self._body()
+            if url.path == "/__reset":
+                mock.reset()
+                return self._json({"ok": True})
+            if parts[:2] == ["v2", "acts"] and parts[-1] == "runs":
+                return self._json({"data": mock.start_run(parts[2], body)}, 201)
+            if parts[:2] == ["v2", "actor-runs"] and parts[-1] == "abort":
+                return self._json({"data": mock.abort_run(parts[2])})
+            if parts[:2] == ["v1beta", "models"]:
+                return self._generate(parts[2], body)
+            if parts == ["v1beta", "cachedContents"]:
+                cached = mock.create_cached_content(body)
+                if cached is None:
+                    return self._json({"error": {"code": 400, "message": "Cached content is too small"}}, 400)
+                return self._json(cached)
+            self._json({"error": "not found"}, 404)
+
+        def _generate(self, target, body):
+            prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+            system = "".join(part.get("text", "") for part in body.get("systemInstruction", {}).get("parts", []))
+            cached_text = ""
+            if body.get("cachedContent"):
+                cached = mock.cached_content(body["cachedContent"])
+                if cached is None:
+                    return self._json({"error": {"code": 404, "message": "CachedContent not found"}}, 404)
+                if system or cached["model"] != "models/" + target.split(":")[0]:
+                    return self._json({"error": {"code": 400, "message": "cachedContent conflicts with request"}}, 400)
+                cached_text = cached["text"]
+            total_chars = len(prompt) + len(system) + len(cached_text)
+            if not mock.generate(total_chars, len(cached_text)):
+                return self._json({"error": {"code": 500, "message": "mock failure"}}, 500)
+            usage = {"promptTokenCount": total_chars // 2, "candidatesTokenCount": len(SUMMARY_TEXT) // 2}
+            if cached_text:
+                usage["cachedContentTokenCount"] = len(cached_text) // 2
+            if target.endswith(":streamGenerateContent"):
+                mock.count("gemini.stream_calls")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                lines = SUMMARY_TEXT.splitlines(keepends=True)
+                for index, line in enumerate(lines, 1):
+                    chunk = {"candidates": [{"content": {"parts": [{"text": line}]}}]}
+                    if index == len(lines):
+                        chunk["usageMetadata"] = usage
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+                    self.wfile.flush()
+                self.close_connection = True
+                return
+            self._json({
+                "candidates": [{"content": {"parts": [{"text": SUMMARY_TEXT}], "role": "model"}}],
+                "usageMetadata": usage,
+            })
+
+    return Handler
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="가짜 Apify / Gemini 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--apify-latency", default="lognormal:0.3,0.5", help="Actor 실행 시간 분포")
+    parser.add_argument("--gemini-latency", default="lognormal:0.2,0.4", help="Gemini 응답 시간 분포")
+    parser.add_argument("--apify-failure-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0)
+    parser.add_argument("--long-chars", type=int, default=60000, help="LONG 영상의 자막 길이(자)")
+    parser.add_argument("--gemini-cache-min-tokens", type=int, default=0,
+                        help="지시문 캐시를 만들 수 있는 최소 토큰 수 (실제 Gemini는 모델별 1024~4096)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def from_args(args):
+    return MockUpstreams(
+        apify=LatencyProfile.parse(args.apify_latency, args.apify_failure_rate),
+        gemini=LatencyProfile.parse(args.gemini_latency, args.gemini_failure_rate),
+        long_chars=args.long_chars,
+        seed=args.seed,
+        cache_min_tokens=args.gemini_cache_min_tokens,
+    )
+
+
+def main():
+    args = build_parser().parse_args()
+    mock = from_args(args)
+    base_url = mock.start(args.host, args.port)
+    print(f"MOCK_BASE_URL={base_url}", flush=True)
+    print(f"🧪 가짜 Apify/Gemini 서버 실행 중: Apify {mock.apify}, Gemini {mock.gemini}", flush=True)
+    print(f"   export APIFY_API_BASE_URL={base_url} GEMINI_API_BASE_URL={base_url} YOUTUBE_BASE_URL={base_url} "
+          f"CLIENT_BACKEND=rest", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
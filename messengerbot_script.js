@@ -1,76 +1,84 @@
 const scriptName = "YouTube 요약 봇";
 
+// 서버 주소
+var SERVER_ORIGIN = "https://ytchoi.vercel.app";
+
+// 작업 상태 확인 간격과 최대 횟수 (3초 × 60회 = 최대 3분)
+var POLL_INTERVAL_MS = 3000;
+var POLL_MAX_ATTEMPTS = 60;
+
+// 요약 전달 방식
+// "async": 작업을 등록하고 완성된 요약을 확인해서 전송
+// "stream": 요약이 생성되는 대로 받아서 개요를 먼저 보내고 나머지는 완성 후 전송
+//           (응답을 끝까지 모았다가 보내는 호스팅 환경에서는 효과가 없으므로 PC 서버 등에서 사용)
+var DELIVERY_MODE = "async";
+var STREAM_READ_TIMEOUT_MS = 120000;  // 스트리밍 읽기 타임아웃 (자막 추출 동안은 데이터가 오지 않음)
+var SYNC_READ_TIMEOUT_MS = 120000;    // 작업 모드를 쓸 수 없는 서버에 한 번에 요청할 때의 읽기 타임아웃
+
 /**
  * YouTube URL을 감지하여 자막을 추출하고 AI로 요약하는 봇
  */
 function response(room, msg, sender, isGroupChat, replier) {
-    // YouTube URL 패턴 확인 (일반 영상, 라이브, 쇼츠 모두 포함)
-    if (msg.includes("youtu.be/") || msg.includes("youtube.com/watch") || msg.includes("youtube.com/live/") || msg.includes("youtube.com/shorts/")) {
+    // YouTube URL 패턴 확인 (일반 영상, 라이브, 쇼츠, 임베드 모두 포함 - 서버의 ytcore/youtube_url.py와 동일한 형태)
+    // "YouTube.com"처럼 대문자로 쓴 링크도 감지하도록 소문자로 바꿔서 확인
+    var lower = msg.toLowerCase();
+    if (lower.includes("youtu.be/") || lower.includes("youtube.com/watch") || lower.includes("youtube.com/live/") || lower.includes("youtube.com/shorts/") || lower.includes("youtube.com/embed/") || lower.includes("youtube.com/v/")) {
         try {
             // 즉시 처리 시작 메시지 보내기
             replier.reply("🔄 YouTube 영상 요약 중입니다... 잠시만 기다려주세요!");
             
-            // HTTP 요청 데이터 준비
+            if (DELIVERY_MODE === "stream") {
+                summarizeStreaming(replier, JSON.stringify({
+                    "msg": msg,
+                    "sender": sender,
+                    "room": room,
+                    "stream": true
+                }));
+                return;
+            }
+            
+            // HTTP 요청 데이터 준비 (작업 모드: 서버는 작업 ID만 바로 돌려줌)
             var data = JSON.stringify({
                 "msg": msg,
                 "sender": sender,
-                "room": room
+                "room": room,
+                "async": true
             });
             
-            // HTTP 연결 설정 (타임아웃 시간 대폭 증가)
-            var url = new java.net.URL("https://ytchoi.vercel.app/api/youtube");
-            var connection = url.openConnection();
-            connection.setRequestMethod("POST");
-            connection.setRequestProperty("Content-Type", "application/json");
-            connection.setDoOutput(true);
+            var res = httpRequest("POST", SERVER_ORIGIN + "/api/youtube", data);
             
-            // 타임아웃 시간 증가 (기본 5초 → 120초)
-            connection.setConnectTimeout(30000);  // 연결 타임아웃: 30초
-            connection.setReadTimeout(120000);    // 읽기 타임아웃: 120초
+            // 작업 모드를 쓸 수 없는 서버(서버리스 등, 501)면 한 번의 요청으로 결과를 기다림
+            if (res.code === 501) {
+                res = httpRequest("POST", SERVER_ORIGIN + "/api/youtube", JSON.stringify({
+                    "msg": msg,
+                    "sender": sender,
+                    "room": room
+                }), SYNC_READ_TIMEOUT_MS);
+            }
             
-            // 요청 데이터 전송
-            var outputStream = connection.getOutputStream();
-            var writer = new java.io.OutputStreamWriter(outputStream, "UTF-8");
-            writer.write(data);
-            writer.flush();
-            writer.close();
+            // 작업이 등록되면 짧은 요청으로 결과가 나올 때까지 확인
+            if (res.code === 202) {
+                var job = JSON.parse(res.body);
+                res = pollJob(SERVER_ORIGIN + job.status_url);
+                if (res === null) {
+                    replier.reply("❌ PC 서버 연결 실패\n⏰ 처리 시간이 너무 오래 걸립니다. 잠시 후 다시 시도해주세요.");
+                    return;
+                }
+            }
             
-            // 응답 받기
-            var responseCode = connection.getResponseCode();
-            if (responseCode === 200 || responseCode === 400) {
+            if (res.code === 200 || res.code === 400) {
                 // 성공 응답(200) 또는 클라이언트 오류(400) 모두 JSON으로 처리
-                var inputStream;
-                if (responseCode === 200) {
-                    inputStream = connection.getInputStream();
-                } else {
-                    inputStream = connection.getErrorStream();
-                }
-                
-                var response = "";
-                var reader = new java.io.BufferedReader(new java.io.InputStreamReader(inputStream, "UTF-8"));
-                var line;
-                while ((line = reader.readLine()) !== null) {
-                    response += line;
-                }
-                reader.close();
-                
-                var result = JSON.parse(response);
-                if (result.summary) {
-                    replier.reply("📝 YouTube 영상 요약:\n\n🎥 " + result.video_title + "\n\n" + result.summary);
-                } else if (result.error) {
-                    // 자막이 없거나 다른 오류의 경우 친근한 메시지로 안내
-                    if (result.error.includes("자막을 추출할 수 없습니다")) {
-                        replier.reply("😔 죄송합니다. 이 영상은 자막이 없어서 요약할 수 없어요.\n\n📝 자막이 있는 영상을 올려주시면 요약해드릴게요!");
-                    } else if (result.error.includes("요약을 생성할 수 없습니다")) {
-                        replier.reply("😅 요약 생성 중 문제가 발생했어요. 잠시 후 다시 시도해주세요!");
-                    } else {
-                        replier.reply("❌ 처리 실패: " + result.error);
+                var result = typeof res.body === "string" ? JSON.parse(res.body) : res.body;
+                if (result.results) {
+                    // 링크 여러 개를 한 번에 보낸 경우 영상별로 결과 전송
+                    for (var i = 0; i < result.results.length; i++) {
+                        replyResult(replier, result.results[i]);
                     }
                 } else {
-                    replier.reply("❌ 알 수 없는 오류가 발생했습니다.");
+                    replyResult(replier, result);
                 }
             } else {
-                replier.reply("❌ 서버 오류 (HTTP " + responseCode + ")");
+                replier.reply("❌ 서버 오류 (HTTP " + res.code + ")");
             }
             
         } catch (e) {
@@ -88,6 +96,176 @@ function response(room, msg, sender, isGroupChat, replier) {
     }
 }
 
+/**
+ * 작업이 끝날 때까지 상태를 확인하고 {code, body(결과 객체)}를 반환 (시간 초과 시 null)
+ */
+function pollJob(statusUrl) {
+    for (var attempt = 0; attempt < POLL_MAX_ATTEMPTS; attempt++) {
+        java.lang.Thread.sleep(POLL_INTERVAL_MS);
+        
+        var res = httpRequest("GET", statusUrl, null);
+        if (res.code !== 200) {
+            continue;
+        }
+        
+        var job = JSON.parse(res.body);
+        if (job.status === "done" || job.status === "failed") {
+            return { code: job.http_status, body: job.result };
+        }
+    }
+    return null;
+}
+
+/**
+ * 스트리밍 모드로 요약을 받아 개요 단락이 완성되면 바로 보내고, 나머지 단락은 요약이 끝난 뒤 보냄
+ */
+function summarizeStreaming(replier, data) {
+    var titles = {};    // video_id -> 영상 제목
+    var posted = {};    // video_id -> 개요를 이미 보냈는지
+    var rest = {};      // video_id -> 개요 이후 단락 목록
+    var end = null;
+    
+    streamRequest(SERVER_ORIGIN + "/api/youtube", data, function (event, payload) {
+        if (event === "meta") {
+            titles[payload.video_id] = payload.video_title;
+        } else if (event === "section") {
+            var videoId = payload.video_id;
+            if (payload.name === "개요" && !posted[videoId]) {
+                replier.reply("📝 YouTube 영상 요약:\n\n🎥 " + titles[videoId] + "\n\n• 개요\n" + payload.text);
+                posted[videoId] = true;
+            } else if (posted[videoId]) {
+                (rest[videoId] = rest[videoId] || []).push("• " + payload.name + "\n" + payload.text);
+            }
+        } else if (event === "end") {
+            end = payload;
+        }
+    });
+    
+    if (end === null) {
+        replier.reply("❌ PC 서버 연결 실패\n⏰ 처리 시간이 너무 오래 걸립니다. 잠시 후 다시 시도해주세요.");
+        return;
+    }
+    
+    var results = end.body.results ? end.body.results : [end.body];
+    for (var i = 0; i < results.length; i++) {
+        var result = results[i];
+        if (result.summary && posted[result.video_id]) {
+            // 개요는 이미 보냈으므로 나머지 단락만 전송
+            if (rest[result.video_id]) {
+                replier.reply(rest[result.video_id].join("\n\n"));
+            }
+        } else {
+            replyResult(replier, result);
+        }
+    }
+}
+
+/**
+ * server-sent events 응답을 한 줄씩 읽으며 이벤트마다 onEvent(이벤트 이름, 데이터 객체)를 호출
+ * 스트림이 아닌 오류 응답(예: 429)은 end 이벤트로 바꿔서 전달
+ */
+function streamRequest(address, data, onEvent) {
+    var url = new java.net.URL(address);
+    var connection = url.openConnection();
+    connection.setRequestMethod("POST");
+    connection.setRequestProperty("Content-Type", "application/json");
+    connection.setRequestProperty("Accept", "text/event-stream");
+    connection.setConnectTimeout(10000);
+    connection.setReadTimeout(STREAM_READ_TIMEOUT_MS);
+    connection.setDoOutput(true);
+    var writer = new java.io.OutputStreamWriter(connection.getOutputStream(), "UTF-8");
+    writer.write(data);
+    writer.flush();
+    writer.close();
+    
+    var code = connection.getResponseCode();
+    var inputStream = code < 400 ? connection.getInputStream() : connection.getErrorStream();
+    var reader = new java.io.BufferedReader(new java.io.InputStreamReader(inputStream, "UTF-8"));
+    var contentType = String(connection.getContentType() || "");
+    
+    if (contentType.indexOf("text/event-stream") === -1) {
+        var body = "";
+        var line;
+        while ((line = reader.readLine()) !== null) {
+            body += line;
+        }
+        reader.close();
+        onEvent("end", { status: code, body: body ? JSON.parse(body) : { error: "HTTP " + code } });
+        return;
+    }
+    
+    var event = null;
+    var text;
+    while ((text = reader.readLine()) !== null) {
+        text = String(text);
+        if (text.indexOf("event:") === 0) {
+            event = text.substring(6).trim();
+        } else if (text.indexOf("data:") === 0) {
+            onEvent(event, JSON.parse(text.substring(5).trim()));
+        }
+    }
+    reader.close();
+}
+
+/**
+ * HTTP 요청을 보내고 {code, body(문자열)}를 반환
+ * 소켓을 오래 붙잡지 않도록 타임아웃은 짧게 설정 (readTimeoutMs로 바꿀 수 있음, 기본 15초)
+ */
+function httpRequest(method, address, data, readTimeoutMs) {
+    var url = new java.net.URL(address);
+    var connection = url.openConnection();
+    connection.setRequestMethod(method);
+    connection.setRequestProperty("Content-Type", "application/json");
+    connection.setConnectTimeout(10000);  // 연결 타임아웃: 10초
+    connection.setReadTimeout(readTimeoutMs || 15000);  // 읽기 타임아웃: 기본 15초
+    
+    // 요청 데이터 전송
+    if (data !== null) {
+        connection.setDoOutput(true);
+        var writer = new java.io.OutputStreamWriter(connection.getOutputStream(), "UTF-8");
+        writer.write(data);
+        writer.flush();
+        writer.close();
+    }
+    
+    // 응답 받기 (오류 응답은 getErrorStream으로 읽음)
+    var code = connection.getResponseCode();
+    var inputStream = code < 400 ? connection.getInputStream() : connection.getErrorStream();
+    var body = "";
+    if (inputStream !== null) {
+        var reader = new java.io.BufferedReader(new java.io.InputStreamReader(inputStream, "UTF-8"));
+        var line;
+        while ((line = reader.readLine()) !== null) {
+            body += line;
+        }
+        reader.close();
+    }
+    return { code: code, body: body };
+}
+
+/**
+ * 영상 하나의 처리 결과(요약 또는 오류)를 채팅방에 전송
+ */
+function replyResult(replier, result) {
+    if (result.summary) {
+        replier.reply("📝 YouTube 영상 요약:\n\n🎥 " + result.video_title + "\n\n" + result.summary);
+    } else if (result.error) {
+        // 자막이 없거나 다른 오류의 경우 친근한 메시지로 안내
+        if (result.error.includes("자막을 추출할 수 없습니다")) {
+            replier.reply("😔 죄송합니다. 이 영상은 자막이 없어서 요약할 수 없어요.\n\n📝 자막이 있는 영상을 올려주시면 요약해드릴게요!");
+        } else if (result.error.includes("요약을 생성할 수 없습니다")) {
+            replier.reply("😅 요약 생성 중 문제가 발생했어요. 잠시 후 다시 시도해주세요!");
+        } else if (result.reason) {
+            // 사전 점검에서 거절된 영상 (라이브 진행 중, 재생 불가, 너무 긴 영상)
+            replier.reply("😔 " + result.error);
+        } else {
+            replier.reply("❌ 처리 실패: " + result.error);
+        }
+    } else {
+        replier.reply("❌ 알 수 없는 오류가 발생했습니다.");
+    }
+}
+
 // 아래는 수정할 필요 없는 기본 함수들입니다.
 function onCreate(savedInstanceState, activity) {}
 function onStart(activity) {}
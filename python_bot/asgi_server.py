@@ -0,0 +1,262 @@
+"""
+메신저봇R 요청을 처리하는 asyncio(ASGI) 서버. server.py(Flask)와 같은 /youtube, /metrics 계약을 따릅니다.
+
+Flask 스레드 서버는 요청마다 OS 스레드 하나가 Apify 실행과 Gemini 응답을 기다리는 동안 붙잡혀 있지만,
+여기서는 Apify 실행 대기, 재시도 대기, Gemini 호출이 모두 이벤트 루프 위의 await 이므로
+한 프로세스에서 수백 개의 요청을 적은 메모리로 동시에 처리할 수 있습니다.
+(사전 점검만 기존 동기 코드를 기본 스레드 풀에서 실행하며, 결과는 캐시됩니다)
+
+실행:
+    python asgi_server.py                   uvicorn이 설치되어 있으면 uvicorn, 없으면 ytcore.asgi.serve
+    uvicorn asgi_server:app --port 8080     (python_bot 폴더에서)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+
+from gemini_client import summarize_with_budget_async
+from youtube_transcript import check_video, get_youtube_transcript_async
+
+# 공용 모듈(ytcore)을 불러오기 위해 저장소 루트를 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ytcore import asgi, metrics, preflight, tracing
+from ytcore.admission import AsyncAdmissionController, QueueFull
+from ytcore.async_clients import AsyncApifyClient, AsyncGeminiModel
+from ytcore.singleflight import AsyncSingleFlight
+from ytcore.transcript_clean import clean_transcript
+from ytcore.youtube_url import extract_video_id, watch_url
+
+# .env 파일에서 환경변수 로드
+load_dotenv()
+
+# 로깅 설정 (로그 줄마다 요청 ID 표시)
+tracing.configure_logging()
+
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# 동시 처리 제한 (스레드를 쓰지 않으므로 Flask 서버보다 기본값이 큼, 가득 차면 Retry-After와 함께 429)
+admission = AsyncAdmissionController(
+    concurrency=int(os.environ.get('MAX_CONCURRENT_REQUESTS', 200)),
+    max_queue=int(os.environ.get('MAX_QUEUED_REQUESTS', 1000)),
+    max_wait=float(os.environ.get('MAX_QUEUE_WAIT', 30)),
+)
+
+# 같은 영상을 동시에 요청하면 처리 하나에 합류 (Apify/Gemini 중복 호출 방지)
+inflight = AsyncSingleFlight()
+
+# 비동기 클라이언트는 이벤트 루프에 묶이므로 서버가 시작된 뒤 만들고 종료 시 닫음
+_clients = {}
+
+
+def get_clients():
+    """(Apify 클라이언트, Gemini 모델)을 처음 필요할 때 만들어 재사용합니다."""
+    if not _clients:
+        max_connections = int(os.environ.get('ASYNC_MAX_CONNECTIONS', 50))
+        _clients["apify"] = AsyncApifyClient(
+            os.environ.get('APIFY_API_TOKEN'),
+            api_url=os.environ.get('APIFY_API_BASE_URL'),
+            max_connections=max_connections,
+            poll_max_delay=float(os.environ.get('APIFY_POLL_MAX_DELAY', 2)),
+        )
+        _clients["gemini"] = AsyncGeminiModel(
+            os.environ.get('GEMINI_API_KEY'),
+            GEMINI_MODEL,
+            api_url=os.environ.get('GEMINI_API_BASE_URL'),
+            max_connections=max_connections,
+        )
+    return _clients["apify"], _clients["gemini"]
+
+
+async def close_clients():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+def normalize_url(url):
+    """다양한 형태의 YouTube URL을 표준 watch?v=ID 형태로 정규화합니다."""
+    video_id = extract_video_id(url)
+    return watch_url(video_id) if video_id else None
+
+
+async def process_video(normalized_url, video_id):
+    """자막 추출과 요약을 진행하고 (HTTP 상태 코드, 응답 dict)를 반환합니다. (server.process_video의 비동기판)"""
+    logging.info(f"처리 시작: {normalized_url} (ID: {video_id})")
+    apify, gemini = get_clients()
+
+    # 사전 점검: 라이브/재생 불가/너무 긴/자막 없는 영상은 Apify를 실행하지 않고 거절
+    verdict = await asyncio.to_thread(check_video, video_id)
+    if verdict is not None and verdict.rejected:
+        error = "자막을 추출할 수 없습니다." if verdict.reason == preflight.NO_CAPTIONS else verdict.message
+        return 400, {"error": error, "reason": verdict.reason}
+
+    # 자막 추출 (제목도 함께, 사전 점검에서 확인한 자막 언어만 시도)
+    transcript, language, video_title = await get_youtube_transcript_async(
+        apify, normalized_url, languages=verdict.languages if verdict is not None else None
+    )
+
+    if not transcript:
+        logging.warning(f"자막 추출 실패: {video_id}")
+        return 400, {"error": "자막을 추출할 수 없습니다."}
+
+    logging.info(f"✅ '{language}' 자막 추출 성공 (길이: {len(transcript)})")
+
+    # 영상 제목이 없으면 사전 점검에서 읽은 제목 사용 (제목만을 위한 Actor 실행은 하지 않음)
+    if not video_title and verdict is not None and verdict.info is not None:
+        video_title = verdict.info.title
+    if not video_title:
+        logging.warning("⚠️ 영상 제목을 가져오지 못했습니다.")
+        video_title = "제목 없음"
+    logging.info(f"🎥 영상 제목: {video_title}")
+
+    # 요약 전 자막 정리 (비음성 표시/롤링 자막 중복/추임새 제거, TRANSCRIPT_CLEAN=0 이면 생략)
+    text = transcript
+    if os.environ.get('TRANSCRIPT_CLEAN', '1') != '0':
+        with tracing.span("clean"):
+            text, clean_stats = clean_transcript(
+                transcript, drop_low_info=os.environ.get('TRANSCRIPT_DROP_LOW_INFO', '0') == '1'
+            )
+        logging.info(f"🧹 자막 정리: {clean_stats['chars_before']} → {clean_stats['chars_after']}자 (약 {clean_stats['tokens_removed']}토큰 절약)")
+
+    # Gemini로 요약 생성
+    logging.info("Gemini AI로 요약 생성 중...")
+    with tracing.span("summarize"):
+        summary, budget = await summarize_with_budget_async(gemini, text, video_title)
+
+    if not summary:
+        logging.error("요약 생성 실패")
+        return 500, {"error": "요약을 생성할 수 없습니다."}
+
+    logging.info("✅ 요약 생성 완료")
+
+    return 200, {
+        "summary": summary,
+        "video_title": video_title,
+        "language": language,
+        "transcript_length": len(transcript),
+        "cleaned_length": len(text),
+        "budget": budget
+    }
+
+
+async def admitted_process_video(room, normalized_url, video_id):
+    """입장 관리자에서 슬롯을 얻은 뒤 process_video를 실행합니다. 얻지 못하면 429 결과를 만듭니다."""
+    try:
+        async with admission.slot(room):
+            return await process_video(normalized_url, video_id)
+    except QueueFull as e:
+        logging.warning(f"대기열이 가득 차 요청을 거부합니다. ({e.reason}, {e.retry_after}초 후 재시도)")
+        return 429, {"error": "Too many requests, please try again later.", "retry_after": e.retry_after}
+
+
+async def handle_youtube_message(body):
+    """요청 본문의 메시지를 처리하고 (상태 코드, 응답 dict, 추가 헤더)를 반환합니다."""
+    try:
+        with tracing.span("parse"):
+            data = json.loads(body) if body else {}
+            room = data.get('room')
+            sender = data.get('sender')
+            message = data.get('msg')
+            # URL 정규화 및 ID 추출
+            normalized_url = normalize_url(message) if message else None
+        if not data:
+            logging.error("요청 데이터가 없습니다.")
+            return 400, {"error": "Request body is empty"}, {}
+
+        logging.info(f"[{room}] '{sender}'로부터 메시지 수신: {message}")
+
+        if not message:
+            return 200, {"status": "no_message"}, {}
+
+        if not normalized_url:
+            logging.info(f"YouTube URL이 아님: {message}")
+            return 200, {"status": "not_a_youtube_url"}, {}
+
+        video_id = extract_video_id(normalized_url)
+        if not video_id:
+            logging.error(f"비디오 ID를 추출할 수 없음: {normalized_url}")
+            return 400, {"error": "Could not extract video ID"}, {}
+
+        # 같은 영상을 이미 처리 중이면 새로 처리하지 않고 그 결과를 함께 받음
+        # (처리는 분리된 태스크에서 돌므로 먼저 온 요청이 취소되어도 합류한 요청은 결과를 받음)
+        (status, payload), shared = await inflight.do(
+            video_id, lambda: admitted_process_video(room, normalized_url, video_id)
+        )
+        if shared:
+            logging.info(f"🔗 진행 중인 처리에 합류: {video_id}")
+            payload = dict(payload, coalesced=True)
+
+        if status == 429:
+            return status, payload, {"Retry-After": str(payload["retry_after"])}
+        return status, payload, {}
+
+    except Exception as e:
+        logging.error(f"처리 중 오류 발생: {e}", exc_info=True)
+        return 500, {"error": "An internal error occurred"}, {}
+
+
+async def app(scope, receive, send):
+    """ASGI 앱: POST /youtube, GET /metrics"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                get_clients()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await close_clients()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+
+    path, method = scope["path"], scope["method"]
+    if path == "/youtube" and method == "POST":
+        # 요청 ID(X-Request-ID 헤더 또는 새로 생성)를 로그와 응답 헤더에 붙이고 단계별 소요 시간을 기록
+        with tracing.request_context(asgi.header(scope, "X-Request-ID"), endpoint="youtube") as trace:
+            status, payload, headers = await handle_youtube_message(await asgi.read_body(receive))
+            with tracing.span("serialize"):
+                await asgi.send_json(send, status, payload, dict(headers, **{"X-Request-ID": trace.request_id}))
+        return
+
+    if path == "/metrics" and method == "GET":
+        # 단계별 지연 시간 등 프로세스 내 메트릭 (Prometheus 텍스트 형식, ?format=json 이면 JSON)
+        query = parse_qs(scope["query_string"].decode("latin-1"))
+        if query.get("format") == ["json"]:
+            return await asgi.send_json(send, 200, metrics.snapshot())
+        body = metrics.render_prometheus().encode("utf-8")
+        return await asgi.send_body(send, 200, body, metrics.PROMETHEUS_CONTENT_TYPE)
+
+    await asgi.send_json(send, 404, {"error": "Not found"})
+
+
+def run_server():
+    port = int(os.environ.get("PORT", 8080))
+    logging.info(f"🌍 asyncio 서버가 http://0.0.0.0:{port} 에서 시작됩니다.")
+    logging.info("메신저봇R에서 다음 주소로 요청을 보내도록 설정하세요:")
+    logging.info(f"  http://<PC의-내부-IP-주소>:{port}/youtube")
+    logging.info("Ctrl+C를 눌러 서버를 종료할 수 있습니다.")
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+    if uvicorn is not None and os.environ.get('ASGI_SERVER', 'auto') != 'builtin':
+        uvicorn.run(app, host='0.0.0.0', port=port, log_config=None)
+        return
+    try:
+        asyncio.run(asgi.serve(app, host='0.0.0.0', port=port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    run_server()
@@ -18,9 +18,45 @@ class Config:
     # Gemini Settings
     GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
     
+    # 요약 입력 예산 (자막 글자 수 상한 MAX_TRANSCRIPT_LENGTH와 함께 적용되는 입력 토큰 상한)
+    SUMMARY_MAX_INPUT_TOKENS = int(os.getenv('SUMMARY_MAX_INPUT_TOKENS', '32000'))
+    SUMMARY_HEAD_TAIL_RATIO = float(os.getenv('SUMMARY_HEAD_TAIL_RATIO', '1.2'))
+    SUMMARY_SAMPLE_RATIO = float(os.getenv('SUMMARY_SAMPLE_RATIO', '2.0'))
+    SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', '4000'))
+    SUMMARY_MAX_CHUNKS = int(os.getenv('SUMMARY_MAX_CHUNKS', '16'))
+    SUMMARY_MAP_WORKERS = int(os.getenv('SUMMARY_MAP_WORKERS', '4'))
+    
     # Apify Settings
     APIFY_ACTOR_ID = os.getenv('APIFY_ACTOR_ID', 'dB9f4B02ocpTICIEY')
     
+    # Actor별 회로 차단기 (최근 BREAKER_WINDOW번 중 실패율이 BREAKER_FAILURE_RATE 이상이거나
+    # 절반 이상이 BREAKER_SLOW_SECONDS보다 오래 걸리면 BREAKER_COOLDOWN초 동안 다른 Actor 사용)
+    BREAKER_WINDOW = int(os.getenv('BREAKER_WINDOW', '20'))
+    BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', '5'))
+    BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', '0.5'))
+    BREAKER_SLOW_SECONDS = float(os.getenv('BREAKER_SLOW_SECONDS', '120')) or None
+    BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', '60'))
+    
+    # 자막 공급자 시도 순서 (지연 시간/성공률에 따라 실행 중에 조정)
+    TRANSCRIPT_PROVIDERS = os.getenv('TRANSCRIPT_PROVIDERS', 'apify,apify_backup,timedtext')
+    TIMEDTEXT_TIMEOUT = float(os.getenv('TIMEDTEXT_TIMEOUT', '5'))
+    
+    # 헤지 모드: 기본 Actor가 최근 p95보다 오래 걸리면 백업 Actor를 함께 실행 (표본이 적을 때는 HEDGE_DELAY초)
+    TRANSCRIPT_HEDGE = os.getenv('TRANSCRIPT_HEDGE', '0') == '1'
+    TRANSCRIPT_HEDGE_DELAY = float(os.getenv('TRANSCRIPT_HEDGE_DELAY', '30'))
+    TRANSCRIPT_HEDGE_MIN_DELAY = float(os.getenv('TRANSCRIPT_HEDGE_MIN_DELAY', '2'))
+    
+    # 영상 사전 점검 (라이브/재생 불가/너무 긴/자막 없는 영상은 Apify 실행 없이 거절)
+    PREFLIGHT = os.getenv('PREFLIGHT', '1') != '0'
+    PREFLIGHT_MAX_DURATION = int(os.getenv('PREFLIGHT_MAX_DURATION', str(4 * 3600)))
+    PREFLIGHT_TIMEOUT = float(os.getenv('PREFLIGHT_TIMEOUT', '3'))
+    PREFLIGHT_CACHE_TTL = int(os.getenv('PREFLIGHT_CACHE_TTL', str(6 * 3600)))
+    YOUTUBE_BASE_URL = os.getenv('YOUTUBE_BASE_URL') or None
+    
+    # 같은 (영상, 언어, Actor) 실행이 끝났거나 진행 중이면 새로 실행하지 않고 그 실행/데이터셋을 다시 사용
+    APIFY_RUN_REUSE = os.getenv('APIFY_RUN_REUSE', '1') != '0'
+    APIFY_RUN_REUSE_TTL = int(os.getenv('APIFY_RUN_REUSE_TTL', str(24 * 3600)))
+    
     @classmethod
     def validate(cls):
         """설정 유효성 검사"""
@@ -43,8 +79,12 @@ class Config:
         return {
             'check_interval': cls.CHECK_INTERVAL,
             'max_transcript_length': cls.MAX_TRANSCRIPT_LENGTH,
+            'summary_max_input_tokens': cls.SUMMARY_MAX_INPUT_TOKENS,
             'gemini_model': cls.GEMINI_MODEL,
             'apify_actor_id': cls.APIFY_ACTOR_ID,
+            'preflight': cls.PREFLIGHT,
+            'transcript_hedge': cls.TRANSCRIPT_HEDGE,
+            'apify_run_reuse': cls.APIFY_RUN_REUSE,
             'has_apify_token': bool(cls.APIFY_API_TOKEN),
             'has_gemini_key': bool(cls.GEMINI_API_KEY)
         }
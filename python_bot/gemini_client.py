@@ -1,25 +1,64 @@
-import google.generativeai as genai
+import asyncio
 import os
+import sys
+from pathlib import Path
+
+# 공용 모듈(ytcore)을 불러오기 위해 저장소 루트를 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config
+from ytcore import clients, token_budget
+from ytcore.chunking import chunk_text, estimate_tokens, map_reduce
 
 def configure_gemini():
-    """Gemini API 키를 설정합니다."""
+    """Gemini API 키를 설정합니다. (키가 바뀐 경우에만 다시 설정)"""
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY 환경 변수가 설정되지 않았습니다.")
-    genai.configure(api_key=api_key)
+    clients.configure_gemini(api_key)
+    return api_key
 
 def summarize_with_gemini(transcript: str, title: str) -> str:
     """
     주어진 텍스트(자막)를 Gemini AI를 사용하여 요약합니다.
     영상 제목을 참고하여 더 자연스러운 요약을 생성합니다.
     """
-    configure_gemini()
+    summary, _ = summarize_with_budget(transcript, title)
+    return summary
+
+def summarize_with_budget(transcript: str, title: str):
+    """
+    입력 예산(Config.MAX_TRANSCRIPT_LENGTH, SUMMARY_MAX_INPUT_TOKENS)에 맞춰 자막을 요약합니다.
+    조금 넘으면 앞/뒤만 남기고, 더 넘으면 고르게 뽑고, 훨씬 길면 나눠서 요약한 뒤 합칩니다.
+    (요약, 예산 전략 정보 dict)를 반환합니다.
+    """
+    api_key = configure_gemini()
     
+    # 모델 객체는 프로세스 전체에서 재사용
     model_name = "gemini-1.5-flash"
-    model = genai.GenerativeModel(model_name)
+    model = clients.get_gemini_model(api_key, model_name, max_output_tokens=None, temperature=None)
+
+    plan = plan_budget(transcript, title)
+    if plan.strategy == token_budget.MAP_REDUCE:
+        return summarize_long_transcript(model, plan.text, title), plan.to_meta()
+    return generate_summary(model, model_name, build_prompt(title, plan.text), title), plan.to_meta()
 
-    # 한글 요약을 위한 프롬프트
-    prompt = f"""
+def plan_budget(transcript: str, title: str) -> token_budget.Plan:
+    """설정된 입력 예산에 맞춘 요약 전략(그대로/앞뒤/샘플링/나눠서 요약)을 정합니다."""
+    return token_budget.plan(
+        transcript,
+        max_chars=Config.MAX_TRANSCRIPT_LENGTH,
+        max_tokens=Config.SUMMARY_MAX_INPUT_TOKENS,
+        overhead_tokens=estimate_tokens(build_prompt(title, "")),
+        chunk_tokens=Config.SUMMARY_CHUNK_TOKENS,
+        max_chunks=Config.SUMMARY_MAX_CHUNKS,
+        head_tail_ratio=Config.SUMMARY_HEAD_TAIL_RATIO,
+        sample_ratio=Config.SUMMARY_SAMPLE_RATIO,
+    )
+
+def build_prompt(title: str, transcript: str) -> str:
+    """한글 요약을 위한 프롬프트를 만듭니다."""
+    return f"""
     당신은 YouTube 영상 요약 전문가입니다. 다음은 '{title}'라는 제목의 영상에서 추출한 자막입니다.
     이 자막 내용을 바탕으로, 영상의 핵심 내용을 3~5개의 주요 항목으로 정리하여 한국어로 요약해주세요.
     각 항목은 글머리 기호(•)로 시작하고, 간결하고 명확하게 설명해야 합니다.
@@ -32,27 +71,131 @@ def summarize_with_gemini(transcript: str, title: str) -> str:
     요약:
     """
 
+def build_chunk_prompt(title: str, chunk: str, index: int, total: int) -> str:
+    """긴 자막의 한 부분을 요약하는 프롬프트를 만듭니다."""
+    return f"""
+        다음은 '{title}' 영상 자막의 {index}/{total}번째 부분입니다.
+        이 부분의 핵심 내용을 한국어 글머리 기호(•)로 간결하게 정리해주세요.
+
+        --- 자막 내용 ---
+        {chunk}
+        --- 자막 끝 ---
+        """
+
+def build_combine_prompt(title: str, partials: list) -> str:
+    """부분 요약들을 최종 요약으로 합치는 프롬프트를 만듭니다."""
+    joined = "\n\n".join(partials)
+    return f"""
+        당신은 YouTube 영상 요약 전문가입니다. 다음은 '{title}'라는 제목의 긴 영상을 순서대로 나눠 요약한 내용입니다.
+        이 내용을 바탕으로, 영상의 핵심 내용을 3~5개의 주요 항목으로 정리하여 한국어로 요약해주세요.
+        각 항목은 글머리 기호(•)로 시작하고, 간결하고 명확하게 설명해야 합니다.
+        전체적으로는 친근하고 이해하기 쉬운 어조를 사용해주세요.
+
+        --- 부분 요약 ---
+        {joined}
+        --- 부분 요약 끝 ---
+
+        요약:
+        """
+
+def response_text(response) -> str:
+    """
+    응답 텍스트를 읽습니다. (SDK / REST 응답 모두)
+    SDK 응답은 텍스트가 없으면 .text에서 예외가 나므로 조각(parts)을 직접 모으고, REST 응답은 .text만 있습니다.
+    """
     try:
-        print(f"'{model_name}' 모델로 요약 생성 중...")
-        response = model.generate_content(prompt)
-        
-        # 때때로 response.text가 비어있는 경우를 대비
-        if not response.text:
-             # response.parts를 직접 확인
-            if response.parts:
-                summary = "".join(part.text for part in response.parts)
-                if summary: return summary.strip()
+        text = response.text
+    except ValueError:
+        text = ""
+    if not text:
+        # 때때로 response.text가 비어있는 경우를 대비해 response.parts를 직접 확인
+        text = "".join(getattr(part, "text", "") for part in getattr(response, "parts", None) or [])
+    return text.strip()
 
+def generate_summary(model, model_name: str, prompt: str, title: str) -> str:
+    """프롬프트 하나로 요약을 생성합니다. 실패하면 안내 문구를 반환합니다."""
+    try:
+        print(f"'{model_name}' 모델로 요약 생성 중...")
+        summary = response_text(model.generate_content(prompt))
+        if not summary:
             print("⚠️ Gemini AI가 비어있는 응답을 반환했습니다.")
             # 실패 시 간단한 대체 텍스트 제공
             return f"'{title}' 영상의 내용을 요약하는 데 실패했습니다."
 
-        return response.text.strip()
+        return summary
 
     except Exception as e:
         print(f"❌ Gemini AI 요약 중 오류 발생: {e}")
         return f"'{title}' 영상의 내용을 요약 중 오류가 발생했습니다."
 
+def summarize_long_transcript(model, transcript: str, title: str) -> str:
+    """긴 자막을 청크별로 병렬 요약(map)한 뒤 최종 요약으로 합칩니다(reduce)."""
+    print(f"📚 긴 자막({len(transcript)}자)은 나눠서 요약합니다.")
+
+    def summarize_chunk(chunk, index, total):
+        try:
+            return response_text(model.generate_content(build_chunk_prompt(title, chunk, index, total)))
+        except Exception as e:
+            print(f"❌ 부분 요약 {index}/{total} 실패: {e}")
+            return None
+
+    def combine(partials):
+        try:
+            return response_text(model.generate_content(build_combine_prompt(title, partials)))
+        except Exception as e:
+            print(f"❌ 최종 요약 합치기 실패: {e}")
+            return None
+
+    summary, meta = map_reduce(
+        transcript,
+        summarize_chunk,
+        combine,
+        max_tokens=Config.SUMMARY_CHUNK_TOKENS,
+        max_workers=Config.SUMMARY_MAP_WORKERS,
+    )
+    print(f"⏱️ 청크 {meta['chunks']}개, 단계별 소요 시간: {meta['timings']}")
+    return summary or f"'{title}' 영상의 내용을 요약하는 데 실패했습니다."
+
+async def summarize_with_budget_async(model, transcript: str, title: str):
+    """
+    summarize_with_budget의 비동기판 (asgi_server.py 용). model은 ytcore.async_clients.AsyncGeminiModel 입니다.
+    나눠서 요약할 때는 SUMMARY_MAP_WORKERS개까지 동시에 호출합니다.
+    """
+    plan = plan_budget(transcript, title)
+    if plan.strategy != token_budget.MAP_REDUCE:
+        try:
+            response = await model.generate_content(build_prompt(title, plan.text))
+            summary = response_text(response)
+        except Exception as e:
+            print(f"❌ Gemini AI 요약 중 오류 발생: {e}")
+            return f"'{title}' 영상의 내용을 요약 중 오류가 발생했습니다.", plan.to_meta()
+        if not summary:
+            print("⚠️ Gemini AI가 비어있는 응답을 반환했습니다.")
+            return f"'{title}' 영상의 내용을 요약하는 데 실패했습니다.", plan.to_meta()
+        return summary, plan.to_meta()
+
+    chunks = chunk_text(plan.text, Config.SUMMARY_CHUNK_TOKENS)
+    print(f"📚 긴 자막({len(plan.text)}자)은 {len(chunks)}개로 나눠서 요약합니다.")
+    limit = asyncio.Semaphore(max(1, Config.SUMMARY_MAP_WORKERS))
+
+    async def summarize_chunk(chunk, index):
+        async with limit:
+            try:
+                return response_text(await model.generate_content(build_chunk_prompt(title, chunk, index, len(chunks))))
+            except Exception as e:
+                print(f"❌ 부분 요약 {index}/{len(chunks)} 실패: {e}")
+                return None
+
+    partials = await asyncio.gather(*(summarize_chunk(chunk, index) for index, chunk in enumerate(chunks, 1)))
+    partials = [partial for partial in partials if partial]
+    summary = None
+    if partials:
+        try:
+            summary = response_text(await model.generate_content(build_combine_prompt(title, partials)))
+        except Exception as e:
+            print(f"❌ 최종 요약 합치기 실패: {e}")
+    return summary or f"'{title}' 영상의 내용을 요약하는 데 실패했습니다.", plan.to_meta()
+
 # 사용 예시
 if __name__ == '__main__':
     # 테스트를 위해 API 키 환경 변수 설정 필요
@@ -102,6 +102,7 @@ def main():
         print(f"📊 설정 정보:")
         print(f"   - 메시지 확인 주기: {config_info['check_interval']}초")
         print(f"   - 최대 자막 길이: {config_info['max_transcript_length']}자")
+        print(f"   - 요약 입력 토큰 예산: {config_info['summary_max_input_tokens']}토큰")
         print(f"   - Gemini 모델: {config_info['gemini_model']}")
         print(f"   - Apify 토큰: {'✅' if config_info['has_apify_token'] else '❌'}")
         print(f"   - Gemini 키: {'✅' if config_info['has_gemini_key'] else '❌'}")
@@ -1,75 +1,223 @@
-from flask import Flask, request, jsonify
-import re
+from flask import Flask, request, jsonify, make_response
 import os
-import threading
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from dotenv import load_dotenv  # .env 파일 로딩을 위해 추가
-from youtube_transcript import get_youtube_transcript, get_video_title
-from gemini_client import summarize_with_gemini
+from youtube_transcript import check_video, get_youtube_transcript, get_video_title, recover_transcript
+from gemini_client import summarize_with_budget
+
+# 공용 모듈(ytcore)을 불러오기 위해 저장소 루트를 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ytcore import clients, journal, metrics, preflight, prefork, tracing
+from ytcore.admission import AdmissionController, QueueFull
+from ytcore.singleflight import DEFAULT_SHARED_PATH, SharedSingleFlight, SingleFlight
+from ytcore.transcript_clean import clean_transcript
+from ytcore.youtube_url import extract_video_id, watch_url
 
 # .env 파일에서 환경변수 로드
 load_dotenv()
 
-# 로깅 설정
+# 로깅 설정 (로그 줄마다 요청 ID 표시)
 import logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+tracing.configure_logging()
 
 app = Flask(__name__)
 
-# 동시 처리 제한을 위한 세마포어
-semaphore = threading.Semaphore(5) 
-# 처리된 URL 추적 (메모리 기반, 재시작 시 초기화)
-processed_urls = set()
+# 외부 API 클라이언트를 서버 시작 시 한 번만 준비하고 모든 요청이 재사용
+clients.warm_up(
+    apify_token=os.environ.get('APIFY_API_TOKEN'),
+    gemini_key=os.environ.get('GEMINI_API_KEY'),
+    gemini_models=[("gemini-1.5-flash", None, None)],
+)
+
+# 워커 프로세스 수 (1이면 기존처럼 단일 프로세스, 0이면 CPU 코어 수만큼)
+WORKERS = int(os.environ.get('SERVER_WORKERS', 1)) or prefork.default_workers()
+
+# 동시 처리 제한 (워커마다 따로 적용, 슬롯이 없으면 방별 공정 대기열에서 기다리고, 가득 차면 Retry-After와 함께 429)
+admission = AdmissionController(
+    concurrency=int(os.environ.get('MAX_CONCURRENT_REQUESTS', 5)),
+    max_queue=int(os.environ.get('MAX_QUEUED_REQUESTS', 20)),
+    max_wait=float(os.environ.get('MAX_QUEUE_WAIT', 30)),
+)
+
+# 같은 영상을 동시에 요청하면 처리 하나에 합류 (Apify/Gemini 중복 호출 방지)
+# 워커가 여러 개이면 다른 워커에서 처리 중인 요청에도 합류 (SQLite 파일 공유)
+if WORKERS > 1:
+    inflight = SharedSingleFlight(os.environ.get('SINGLEFLIGHT_DB', DEFAULT_SHARED_PATH))
+else:
+    inflight = SingleFlight()
+
+# 처리 중인 작업 기록 (재시작되면 진행 중이던 Apify 실행에 다시 붙어 요약까지 마침, 워커끼리 공유)
+# JOURNAL_LEASE초 동안 생존 신호가 없는 프로세스의 작업을 다른 프로세스가 이어받음
+job_journal = journal.JobJournal(
+    os.environ.get('JOURNAL_DB', journal.DEFAULT_JOURNAL_PATH),
+    lease=float(os.environ.get('JOURNAL_LEASE', 30)),
+)
+recovery_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="recovery")
 
 def normalize_url(url):
     """다양한 형태의 YouTube URL을 표준 watch?v=ID 형태로 정규화합니다."""
-    # youtu.be/ID 형태
-    match = re.search(r"youtu\.be/([a-zA-Z0-9_-]+)", url)
-    if match:
-        return f"https://www.youtube.com/watch?v={match.group(1)}"
-    
-    # youtube.com/watch?v=ID 형태 (다른 파라미터 포함 가능)
-    match = re.search(r"youtube\.com/watch\?v=([a-zA-Z0-9_-]+)", url)
-    if match:
-        return f"https://www.youtube.com/watch?v={match.group(1)}"
-        
-    # youtube.com/shorts/ID 형태
-    match = re.search(r"youtube\.com/shorts/([a-zA-Z0-9_-]+)", url)
-    if match:
-        return f"https://www.youtube.com/watch?v={match.group(1)}" # shorts도 watch로 변환
-        
-    return None
+    video_id = extract_video_id(url)
+    return watch_url(video_id) if video_id else None
 
 def get_video_id(url):
     """정규화된 URL에서 비디오 ID를 추출합니다."""
-    match = re.search(r"watch\?v=([a-zA-Z0-9_-]+)", url)
-    return match.group(1) if match else None
+    return extract_video_id(url)
+    
+def process_video(normalized_url, video_id, job=None):
+    """
+    자막 추출과 요약을 진행하고 (HTTP 상태 코드, 응답 dict)를 반환합니다.
+    job이 있으면 재시작 전에 끝내지 못한 작업을 이어서 처리합니다. (기록해 둔 자막 또는 Apify 실행 재사용)
+    """
+    logging.info(f"처리 시작: {normalized_url} (ID: {video_id})")
+
+    saved = job["outputs"] if job else {}
+    if "transcript" in saved:
+        # 재시작 전에 자막까지 받아 두었으면 요약만 다시 진행
+        transcript, language, video_title = saved["transcript"], saved["language"], saved["video_title"]
+        logging.info(f"♻️ 기록해 둔 '{language}' 자막으로 이어서 요약합니다.")
+    else:
+        transcript = language = video_title = None
+        if job and job["runs"]:
+            # 이전 프로세스가 시작한 Apify 실행에 다시 붙어 데이터셋을 읽음 (새로 실행하지 않음)
+            transcript, language, video_title = recover_transcript(job["runs"], normalized_url)
+
+        if not transcript:
+            # 사전 점검: 라이브/재생 불가/너무 긴/자막 없는 영상은 Apify를 실행하지 않고 거절
+            verdict = check_video(video_id)
+            if verdict is not None and verdict.rejected:
+                error = "자막을 추출할 수 없습니다." if verdict.reason == preflight.NO_CAPTIONS else verdict.message
+                return 400, {"error": error, "reason": verdict.reason}
+
+            # 자막 추출 (제목도 함께, 사전 점검에서 확인한 자막 언어만 시도)
+            transcript, language, video_title = get_youtube_transcript(
+                normalized_url, languages=verdict.languages if verdict is not None else None
+            )
+
+        if not transcript:
+            logging.warning(f"자막 추출 실패: {video_id}")
+            return 400, {"error": "자막을 추출할 수 없습니다."}
+
+        logging.info(f"✅ '{language}' 자막 추출 성공 (길이: {len(transcript)})")
+
+        # 영상 제목이 없는 경우에만 별도로 가져오기
+        if not video_title:
+            logging.info(f"🎥 영상 제목 가져오는 중: {normalized_url}")
+            video_title = get_video_title(normalized_url)
+            if not video_title:
+                logging.warning("⚠️ 영상 제목을 가져오지 못했습니다.")
+                video_title = "제목 없음"
+        else:
+            logging.info(f"🎥 영상 제목: {video_title}")
+
+        # 재시작되어도 자막을 다시 받지 않도록 기록
+        journal.checkpoint("summarize", transcript=transcript, language=language, video_title=video_title)
+
+    # 요약 전 자막 정리 (비음성 표시/롤링 자막 중복/추임새 제거, TRANSCRIPT_CLEAN=0 이면 생략)
+    text = transcript
+    if os.environ.get('TRANSCRIPT_CLEAN', '1') != '0':
+        with tracing.span("clean"):
+            text, clean_stats = clean_transcript(
+                transcript, drop_low_info=os.environ.get('TRANSCRIPT_DROP_LOW_INFO', '0') == '1'
+            )
+        logging.info(f"🧹 자막 정리: {clean_stats['chars_before']} → {clean_stats['chars_after']}자 (약 {clean_stats['tokens_removed']}토큰 절약)")
+
+    # Gemini로 요약 생성
+    logging.info("Gemini AI로 요약 생성 중...")
+    with tracing.span("summarize"):
+        summary, budget = summarize_with_budget(text, video_title)
     
+    if not summary:
+        logging.error("요약 생성 실패")
+        return 500, {"error": "요약을 생성할 수 없습니다."}
+
+    logging.info("✅ 요약 생성 완료")
+
+    response_data = {
+        "summary": summary,
+        "video_title": video_title,
+        "language": language,
+        "transcript_length": len(transcript),
+        "cleaned_length": len(text),
+        "budget": budget
+    }
+
+    return 200, response_data
+
+def admitted_process_video(room, normalized_url, video_id):
+    """
+    입장 관리자에서 슬롯을 얻은 뒤 process_video를 실행합니다.
+    슬롯이 없으면 방별 대기열에서 기다리고, 끝내 얻지 못하면 429 결과를 만듭니다.
+    """
+    try:
+        with admission.slot(room):
+            return journaled_process_video(room, normalized_url, video_id)
+    except QueueFull as e:
+        logging.warning(f"대기열이 가득 차 요청을 거부합니다. ({e.reason}, {e.retry_after}초 후 재시도)")
+        return 429, {"error": "Too many requests, please try again later.", "retry_after": e.retry_after}
+
+def journaled_process_video(room, normalized_url, video_id, job=None):
+    """단계, Apify 실행 ID, 중간 결과를 작업 기록에 남기면서 process_video를 실행합니다."""
+    with job_journal.track(video_id, normalized_url, room, job_id=job["job_id"] if job else None) as job_id:
+        status, payload = process_video(normalized_url, video_id, job)
+        job_journal.finish(job_id, status, payload)
+        return status, payload
+
+def resume_job(job):
+    """
+    이전 프로세스가 처리 도중 끝난 작업을 이어서 처리합니다. 결과는 같은 영상을 다시 요청할 때 바로 전달됩니다.
+    (요청이 몇 개 안 되고 기다리는 사용자도 없으므로 입장 대기열은 거치지 않음)
+    """
+    with tracing.request_context(None, endpoint="recovery"):
+        logging.info(f"♻️ 중단된 작업 이어서 처리: {job['video_id']} ({job['stage']} 단계, Apify 실행 {len(job['runs'])}개, {job['attempts']}번째 시도)")
+        try:
+            (status, payload), shared = inflight.do(
+                job["video_id"], lambda: journaled_process_video(job["room"], job["url"], job["video_id"], job)
+            )
+            if shared:
+                # 사용자가 다시 보낸 요청이 먼저 처리 중이었으면 그 결과로 끝냄 (이미 전달됨)
+                job_journal.finish(job["job_id"], status, payload, delivered=True)
+            logging.info(f"♻️ 작업 이어서 처리 완료: {job['video_id']} ({status})")
+        except Exception as e:
+            logging.error(f"중단된 작업 처리 실패: {e}", exc_info=True)
+
+def start_recovery():
+    """작업 기록을 주기적으로 확인해 주인 프로세스가 죽은 작업을 백그라운드에서 이어서 처리합니다."""
+    job_journal.watch(lambda job: recovery_pool.submit(resume_job, job))
+
+
 @app.route('/youtube', methods=['POST'])
 def handle_youtube_request():
     """메신저봇R로부터 YouTube URL 처리 요청을 받습니다."""
-    
-    if not semaphore.acquire(blocking=False):
-        logging.warning("동시 처리 한도 초과로 요청을 거부합니다.")
-        return jsonify({"error": "Too many requests, please try again later."}), 429
+    # 요청 ID(X-Request-ID 헤더 또는 새로 생성)를 로그와 응답 헤더에 붙이고 단계별 소요 시간을 기록
+    with tracing.request_context(request.headers.get('X-Request-ID'), endpoint="youtube") as trace:
+        response = make_response(handle_youtube_message())
+        response.headers['X-Request-ID'] = trace.request_id
+        return response
 
+
+def handle_youtube_message():
+    """요청 본문의 메시지를 처리하고 Flask 응답 값을 반환합니다."""
     try:
-        # force=True 옵션을 추가하여 Content-Type 검사를 건너뛰고 데이터를 JSON으로 강제 해석합니다.
-        data = request.get_json(force=True)
+        with tracing.span("parse"):
+            # force=True 옵션을 추가하여 Content-Type 검사를 건너뛰고 데이터를 JSON으로 강제 해석합니다.
+            data = request.get_json(force=True) or {}
+            room = data.get('room')
+            sender = data.get('sender')
+            message = data.get('msg')
+            # URL 정규화 및 ID 추출
+            normalized_url = normalize_url(message) if message else None
         if not data:
             logging.error("요청 데이터가 없습니다.")
             return jsonify({"error": "Request body is empty"}), 400
-
-        room = data.get('room')
-        sender = data.get('sender')
-        message = data.get('msg')
         
         logging.info(f"[{room}] '{sender}'로부터 메시지 수신: {message}")
 
         if not message:
             return jsonify({"status": "no_message"}), 200
 
-        # URL 정규화 및 ID 추출
-        normalized_url = normalize_url(message)
         if not normalized_url:
             logging.info(f"YouTube URL이 아님: {message}")
             return jsonify({"status": "not_a_youtube_url"}), 200
@@ -79,56 +227,40 @@ def handle_youtube_request():
             logging.error(f"비디오 ID를 추출할 수 없음: {normalized_url}")
             return jsonify({"error": "Could not extract video ID"}), 400
 
-        # 중복 처리 방지
-        if video_id in processed_urls:
-            logging.info(f"이미 처리된 URL입니다: {video_id}")
-            return jsonify({"status": "already_processed"}), 200
-            
-        logging.info(f"처리 시작: {normalized_url} (ID: {video_id})")
-
-        # 자막 추출 (제목도 함께)
-        transcript, language, video_title = get_youtube_transcript(normalized_url)
-        
-        if not transcript:
-            logging.warning(f"자막 추출 실패: {video_id}")
-            return jsonify({"error": "자막을 추출할 수 없습니다."}), 400
-
-        logging.info(f"✅ '{language}' 자막 추출 성공 (길이: {len(transcript)})")
-        
-        # 영상 제목이 없는 경우에만 별도로 가져오기
-        if not video_title:
-            logging.info(f"🎥 영상 제목 가져오는 중: {normalized_url}")
-            video_title = get_video_title(normalized_url)
-            if not video_title:
-                logging.warning("⚠️ 영상 제목을 가져오지 못했습니다.")
-                video_title = "제목 없음"
+        # 재시작 전에 받은 요청을 이어서 끝낸 결과가 있으면 바로 응답
+        recovered = job_journal.take_recovered(video_id)
+        if recovered is not None:
+            logging.info(f"♻️ 재시작 후 이어서 끝낸 결과로 응답: {video_id}")
+            (status, payload), shared = recovered, False
+            payload = dict(payload, recovered=True)
         else:
-            logging.info(f"🎥 영상 제목: {video_title}")
-
-        # Gemini로 요약 생성
-        logging.info("Gemini AI로 요약 생성 중...")
-        summary = summarize_with_gemini(transcript, video_title)
-        
-        if not summary:
-            logging.error("요약 생성 실패")
-            return jsonify({"error": "요약을 생성할 수 없습니다."}), 500
-
-        logging.info("✅ 요약 생성 완료")
+            # 같은 영상을 이미 처리 중이면 새로 처리하지 않고 그 결과를 함께 받음
+            (status, payload), shared = inflight.do(
+                video_id, lambda: admitted_process_video(room, normalized_url, video_id)
+            )
+        if shared:
+            logging.info(f"🔗 진행 중인 처리에 합류: {video_id}")
+            payload = dict(payload, coalesced=True)
+            # 재시작 후 이어서 처리하던 작업에 합류했으면 그 결과는 전달된 것으로 표시
+            job_journal.take_recovered(video_id)
 
-        response_data = {
-            "summary": summary,
-            "video_title": video_title,
-            "language": language,
-            "transcript_length": len(transcript)
-        }
-
-        return jsonify(response_data)
+        with tracing.span("serialize"):
+            body = jsonify(payload)
+        if status == 429:
+            return body, 429, {"Retry-After": str(payload["retry_after"])}
+        return body, status
 
     except Exception as e:
         logging.error(f"처리 중 오류 발생: {e}", exc_info=True)
         return jsonify({"error": "An internal error occurred"}), 500
-    finally:
-        semaphore.release()
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """단계별 지연 시간 등 프로세스 내 메트릭 (Prometheus 텍스트 형식, ?format=json 이면 JSON)"""
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.snapshot())
+    return metrics.render_prometheus(), 200, {"Content-Type": metrics.PROMETHEUS_CONTENT_TYPE}
 
 
 def run_server():
@@ -140,7 +272,22 @@ def run_server():
     logging.info(f"  http://<PC의-내부-IP-주소>:{port}/youtube")
     logging.info("PC의 내부 IP 주소는 cmd에서 'ipconfig' 명령어로 확인할 수 있습니다.")
     logging.info("Ctrl+C를 눌러 서버를 종료할 수 있습니다.")
-    app.run(host='0.0.0.0', port=port)
+    if WORKERS <= 1:
+        start_recovery()
+        app.run(host='0.0.0.0', port=port)
+        return
+    # 워커 프로세스 풀: 같은 포트를 함께 쓰고, SIGHUP이면 무중단 재시작 (kill -HUP <주 프로세스 PID>)
+    prefork.Arbiter(
+        serve_worker,
+        prefork.listen('0.0.0.0', port),
+        WORKERS,
+        graceful_timeout=float(os.environ.get('WORKER_GRACEFUL_TIMEOUT', 30)),
+    ).run()
+
+def serve_worker(sock, ready):
+    """워커 프로세스에서 실행: 공유 소켓으로 Flask 앱을 제공합니다."""
+    start_recovery()
+    prefork.serve_wsgi(app, sock, ready)
 
 if __name__ == '__main__':
     run_server() 
\ No newline at end of file
@@ -1,34 +1,37 @@
-import re
-from urllib.parse import urlparse, parse_qs
+import sys
+from pathlib import Path
+
+# 공용 모듈(ytcore)을 불러오기 위해 저장소 루트를 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ytcore.youtube_url import find_video_urls, extract_video_id, watch_url
 
 class YouTubeDetector:
     """YouTube URL 감지 및 비디오 ID 추출 클래스"""
     
-    def __init__(self):
-        # YouTube URL 패턴들
-        self.youtube_patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/|youtube\.com\/v\/)([\w-]+)',
-            r'youtube\.com\/watch\?.*v=([\w-]+)',
-            r'youtu\.be\/([\w-]+)',
-            r'youtube\.com\/embed\/([\w-]+)',
-            r'youtube\.com\/v\/([\w-]+)'
-        ]
-    
     def detect_youtube_url(self, text):
         """텍스트에서 YouTube URL 감지"""
-        for pattern in self.youtube_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(0)
-        return None
+        urls = find_video_urls(text)
+        return urls[0][0] if urls else None
+    
+    def detect_urls(self, text):
+        """텍스트에 포함된 모든 YouTube URL을 한 번에 감지 (같은 영상은 한 번만)"""
+        results = []
+        seen = set()
+        for url, video_id in find_video_urls(text):
+            if video_id in seen:
+                continue
+            seen.add(video_id)
+            results.append({
+                'url': url,
+                'video_id': video_id,
+                'clean_url': watch_url(video_id)
+            })
+        return results
     
     def extract_video_id(self, url):
         """YouTube URL에서 비디오 ID 추출"""
-        for pattern in self.youtube_patterns:
-            match = re.search(pattern, url, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        return None
+        return extract_video_id(url)
     
     def is_youtube_url(self, text):
         """YouTube URL인지 확인"""
@@ -36,7 +39,7 @@ class YouTubeDetector:
     
     def get_video_title_url(self, video_id):
         """비디오 ID로 YouTube URL 생성"""
-        return f"https://www.youtube.com/watch?v={video_id}"
+        return watch_url(video_id)
 
 # 사용 예제
 if __name__ == "__main__":
@@ -54,4 +57,4 @@ if __name__ == "__main__":
             print(f"Found YouTube URL: {url}")
             print(f"Video ID: {video_id}")
             print(f"Clean URL: {detector.get_video_title_url(video_id)}")
-            print("---") 
\ No newline at end of file
+            print("---")
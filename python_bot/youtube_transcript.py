@@ -1,121 +1,460 @@
+import asyncio
 import os
+import sys
+from pathlib import Path
 from apify_client import ApifyClient
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from typing import Optional, Dict
 
-def get_youtube_transcript_backup(url: str):
+# 공용 모듈(ytcore)을 불러오기 위해 저장소 루트를 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import Config
+from ytcore import apify_runs, breaker, metrics, preflight, providers, tracing
+from ytcore.apify_runs import run_actor, wait_for_items, wait_for_run
+from ytcore.cache import PreflightCache, RunIndex, create_backend
+from ytcore.clients import get_apify_client
+from ytcore.probe import probe_languages
+from ytcore.youtube_url import extract_video_id, watch_url
+
+# 시도할 자막 언어 (우선순위 순서)
+LANGUAGES = ["Korean", "English", "Japanese"]
+
+# 자막 추출 Actor (기본 → 백업)
+PRIMARY_ACTOR_ID = Config.APIFY_ACTOR_ID
+BACKUP_ACTOR_ID = "drobnikj/youtube-transcript-extractor"
+
+hedge_total = metrics.counter(
+    "transcript_hedge_total",
+    "헤지 모드 자막 추출 결과 (fired: 백업을 함께 실행, 이긴 Actor별 primary/backup, none: 모두 실패)",
+)
+
+cache_backend = create_backend()
+
+# Apify 실행 전 영상 사전 점검 (결과는 영상 ID별로 캐시)
+video_preflight = preflight.Preflight(
+    cache=PreflightCache(cache_backend, ttl=Config.PREFLIGHT_CACHE_TTL),
+    base_url=Config.YOUTUBE_BASE_URL,
+    timeout=Config.PREFLIGHT_TIMEOUT,
+    max_duration=Config.PREFLIGHT_MAX_DURATION,
+)
+
+# 같은 입력의 Apify 실행이 끝났거나 진행 중이면 그 실행을 다시 씀 (워커/재시작 사이에서도 공유)
+if Config.APIFY_RUN_REUSE:
+    apify_runs.set_run_index(RunIndex(cache_backend, ttl=Config.APIFY_RUN_REUSE_TTL))
+
+def check_video(video_id: str, prefer_korean: bool = True):
+    """
+    Apify를 실행하기 전에 영상을 점검합니다. (라이브, 재생 불가, 너무 긴 영상, 자막 없음)
+    preflight.Verdict를 반환하며, PREFLIGHT=0 이면 None입니다.
+    """
+    if not Config.PREFLIGHT:
+        return None
+    return video_preflight.check(video_id, _languages(prefer_korean))
+
+def _languages(prefer_korean: bool = True):
+    return LANGUAGES if prefer_korean else LANGUAGES[1:]
+
+def actor_breaker(actor_id: str) -> breaker.CircuitBreaker:
+    """Actor별 회로 차단기 (실패율 또는 느린 실행 비율이 높으면 열려서 다른 Actor로 바로 넘어감)"""
+    return breaker.get(
+        actor_id,
+        window=Config.BREAKER_WINDOW,
+        min_calls=Config.BREAKER_MIN_CALLS,
+        failure_rate=Config.BREAKER_FAILURE_RATE,
+        slow_seconds=Config.BREAKER_SLOW_SECONDS,
+        cooldown=Config.BREAKER_COOLDOWN,
+    )
+
+def _run_outcome(run):
+    """Actor 실행 결과 판정: 중단(None)과 이미 끝난 실행의 재사용은 기록하지 않고, SUCCEEDED가 아니면 실패"""
+    if run is None or run.get('reused') == 'finished':
+        return None
+    return run.get('status') == 'SUCCEEDED'
+
+def run_actor_guarded(client, actor_id: str, run_input: dict, cancel_event=None):
+    """회로 차단기를 거쳐 Actor를 실행합니다. 회로가 열려 있으면 breaker.CircuitOpenError."""
+    return actor_breaker(actor_id).call(run_actor, client, actor_id, run_input, cancel_event, classify=_run_outcome)
+
+# 처음부터 상태가 메트릭에 보이도록 미리 만들어 둠
+for _actor_id in (PRIMARY_ACTOR_ID, BACKUP_ACTOR_ID):
+    actor_breaker(_actor_id)
+
+# 백업 Actor 공급자 (기본 Actor와 같은 회로 차단기 설정 사용)
+backup_provider = providers.ApifyBackupProvider(
+    lambda: get_apify_client(os.environ.get("APIFY_API_TOKEN")),
+    actor_id=BACKUP_ACTOR_ID,
+    actor_breaker=actor_breaker(BACKUP_ACTOR_ID),
+)
+
+def get_youtube_transcript_backup(url: str, cancel_event=None):
     """
     백업용 Apify Actor를 사용하여 YouTube 자막을 추출합니다.
     """
     try:
-        client = ApifyClient(os.environ.get("APIFY_API_TOKEN"))
-        
-        # 다른 YouTube 자막 추출 Actor 시도
-        run_input = {
-            "startUrls": [url],
-            "maxRequestRetries": 2
-        }
-        
-        print(f"🔄 백업 Actor로 시도: {run_input}")
-        
-        # 다른 Actor 사용 (예: youtube-transcript-extractor)
-        run = client.actor("drobnikj/youtube-transcript-extractor").call(run_input=run_input)
-        
-        if run and run.get('status') == 'SUCCEEDED':
-            print("✅ 백업 Actor 실행 성공!")
-            
-            for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-                print(f"📄 백업 데이터: {item}")
-                
-                # 다양한 필드명 시도
-                text = item.get("transcript") or item.get("text") or item.get("content") or item.get("subtitle")
-                video_title = item.get("videoTitle") or item.get("title") or item.get("name")
-                
-                if text:
-                    return text.strip(), "backup", video_title
+        # 다른 YouTube 자막 추출 Actor 시도 (예: youtube-transcript-extractor)
+        print(f"🔄 백업 Actor로 시도: {url}")
+        video_id = extract_video_id(url) or url
+        result = backup_provider.fetch({video_id: []}, cancel_event).get(video_id)
+        if result:
+            print("✅ 백업 Actor로 자막 추출 성공!")
+            return result
         
         print("❌ 백업 Actor도 실패")
         return None, None, None
         
+    except breaker.CircuitOpenError as e:
+        print(f"⛔ 백업 Actor 건너뜀: {e}")
+        return None, None, None
     except Exception as e:
         print(f"❌ 백업 Actor 오류: {e}")
         return None, None, None
 
-def get_youtube_transcript(url: str, prefer_korean: bool = True):
+def get_youtube_transcript(url: str, prefer_korean: bool = True, languages: Optional[list] = None):
     """
     Apify를 사용하여 YouTube 동영상의 자막을 추출합니다.
     먼저 기본 Actor를 시도하고, 실패하면 백업 Actor를 시도합니다.
+    languages가 있으면 그 언어만 시도합니다. (사전 점검에서 확인한 자막 언어)
+    
+    공급자 체인(TRANSCRIPT_PROVIDERS, 기본값 apify → apify_backup → timedtext)을 차례로 시도하며,
+    최근 지연 시간과 성공률에 따라 더 빠르고 건강한 공급자를 먼저 시도합니다.
+    회로가 열린 Actor는 건너뛰므로 기본 Actor가 고장 나면 바로 백업 Actor를 사용합니다.
+    TRANSCRIPT_HEDGE=1 이면 기본 Actor가 평소(p95)보다 오래 걸릴 때 백업 Actor를 함께 실행해 먼저 성공한 결과를 씁니다.
+    """
+    if Config.TRANSCRIPT_HEDGE:
+        return get_youtube_transcript_hedged(url, prefer_korean, languages)
+    
+    video_id = extract_video_id(url) or url
+    result = transcript_chain.fetch({video_id: languages if languages is not None else _languages(prefer_korean)})
+    if video_id not in result:
+        print("❌ 모든 자막 공급자에서 자막 추출에 실패했습니다.")
+        return None, None, None
+    transcript, lang, video_title, provider_name = result[video_id]
+    print(f"📦 '{provider_name}' 공급자로 자막을 가져왔습니다.")
+    return transcript, lang, video_title
+
+def _fetch_main(requests_by_video, cancel_event=None):
+    """공급자 체인의 'apify' 공급자: 기본 Actor로 언어별로 시도합니다."""
+    results = {}
+    for video_id, languages in requests_by_video.items():
+        transcript, lang, video_title = get_youtube_transcript_main(
+            watch_url(video_id), languages=languages, cancel_event=cancel_event
+        )
+        if transcript:
+            results[video_id] = (transcript, lang, video_title)
+    return results
+
+transcript_chain = providers.build_chain(
+    Config.TRANSCRIPT_PROVIDERS,
+    {
+        "apify": providers.CallableProvider(
+            "apify", _fetch_main, healthy=lambda: actor_breaker(PRIMARY_ACTOR_ID).state != breaker.OPEN
+        ),
+        "apify_backup": backup_provider,
+        "timedtext": providers.TimedTextProvider(Config.YOUTUBE_BASE_URL, timeout=Config.TIMEDTEXT_TIMEOUT),
+    },
+)
+
+class YouTubeTranscriptExtractor:
+    """
+    자막 추출기 (debug_apify.py, test_apify.py 에서 사용)
+    client / actor_id 로 기본 Actor를 직접 호출할 수 있고, extract_with_fallback 은 공급자 체인을 사용합니다.
     """
-    # 먼저 기본 Actor 시도
-    transcript, lang, video_title = get_youtube_transcript_main(url, prefer_korean)
     
-    if transcript:
-        return transcript, lang, video_title
+    def __init__(self, api_token: Optional[str] = None):
+        self.client = get_apify_client(api_token or Config.APIFY_API_TOKEN or os.environ.get("APIFY_API_TOKEN"))
+        self.actor_id = PRIMARY_ACTOR_ID
+        self.chain = transcript_chain
     
-    # 기본 Actor 실패 시 백업 Actor 시도
-    print("🔄 기본 Actor 실패, 백업 Actor로 시도합니다...")
-    return get_youtube_transcript_backup(url)
+    def extract_with_fallback(self, url: str, prefer_korean: bool = True) -> Dict:
+        """공급자 체인으로 자막을 추출하고 결과를 dict로 반환합니다."""
+        video_id = extract_video_id(url) or url
+        result = self.chain.fetch({video_id: _languages(prefer_korean)}).get(video_id)
+        if not result:
+            return {"success": False, "video_id": video_id, "providers": self.chain.stats()}
+        transcript, language, title, provider_name = result
+        return {
+            "success": True,
+            "video_id": video_id,
+            "transcript": transcript,
+            "language": language,
+            "title": title,
+            "provider": provider_name,
+        }
+
+def hedge_delay(primary: breaker.CircuitBreaker) -> float:
+    """백업 Actor를 함께 실행하기 전에 기다릴 시간: 기본 Actor 최근 실행 시간의 p95 (표본이 적으면 설정값)"""
+    p95 = primary.latency_percentile(0.95)
+    if p95 is None:
+        return Config.TRANSCRIPT_HEDGE_DELAY
+    return max(Config.TRANSCRIPT_HEDGE_MIN_DELAY, p95)
+
+def get_youtube_transcript_hedged(url: str, prefer_korean: bool = True, languages: Optional[list] = None):
+    """
+    기본 Actor를 먼저 실행하고, hedge_delay 안에 끝나지 않으면 백업 Actor를 함께 실행합니다.
+    먼저 자막을 돌려준 쪽을 사용하고 나머지 실행은 중단합니다.
+    (병렬 언어 모드에서는 이미 시작한 기본 Actor의 언어별 실행이 끝까지 진행될 수 있습니다.)
+    """
+    primary = actor_breaker(PRIMARY_ACTOR_ID)
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hedge")
+    futures = {}
+    try:
+        if primary.state != breaker.OPEN:
+            delay = hedge_delay(primary)
+            main = executor.submit(tracing.propagate(
+                lambda: get_youtube_transcript_main(url, prefer_korean, cancel_event=cancel_event, languages=languages)
+            ))
+            futures[main] = "primary"
+            done, _ = wait([main], timeout=delay)
+            if done:
+                result = main.result()
+                if result[0]:
+                    hedge_total.inc(outcome="primary")
+                    return result
+                print("🔄 기본 Actor 실패, 백업 Actor로 시도합니다...")
+            else:
+                print(f"⏱️ 기본 Actor가 {delay:.1f}초(p95) 안에 끝나지 않아 백업 Actor를 함께 실행합니다.")
+                hedge_total.inc(outcome="fired")
+        else:
+            print(f"⛔ 기본 Actor 회로가 열려 있어 백업 Actor로 바로 시도합니다. ({primary.retry_in():.0f}초 후 재확인)")
+        
+        backup = executor.submit(tracing.propagate(lambda: get_youtube_transcript_backup(url, cancel_event)))
+        futures[backup] = "backup"
+        for future in as_completed(futures):
+            result = future.result()
+            if result[0]:
+                print(f"🏁 {futures[future]} Actor 결과를 사용합니다.")
+                hedge_total.inc(outcome=futures[future])
+                return result
+        hedge_total.inc(outcome="none")
+        return None, None, None
+    finally:
+        # 진 쪽의 실행은 백그라운드에서 중단되도록 하고 기다리지 않음
+        cancel_event.set()
+        executor.shutdown(wait=False)
 
-def get_youtube_transcript_main(url: str, prefer_korean: bool = True):
+def get_youtube_transcript_main(url: str, prefer_korean: bool = True, parallel: Optional[bool] = None,
+                                languages: Optional[list] = None, cancel_event=None):
     """
     메인 Apify Actor를 사용하여 YouTube 동영상의 자막을 추출합니다.
     공식 샘플 코드 형식을 따릅니다.
+    parallel이 참이면 모든 언어를 동시에 실행하고, 우선순위가 가장 높은 성공 결과를 사용합니다.
+    cancel_event가 설정되면 진행 중인 실행을 중단합니다. (헤지 모드에서 백업이 먼저 성공한 경우)
     """
-    languages = ["Korean", "English", "Japanese"] if prefer_korean else ["English", "Japanese"]
+    if languages is None:
+        languages = _languages(prefer_korean)
+    if parallel is None:
+        # TRANSCRIPT_PROBE_MODE: sequential(기본값, 한 언어씩) / parallel(동시 실행 후 나머지 중단)
+        parallel = os.environ.get("TRANSCRIPT_PROBE_MODE", "sequential") == "parallel"
     
-    for lang in languages:
-        print(f"➡️ '{lang}' 언어로 추출 시도...")
-        try:
-            client = ApifyClient(os.environ.get("APIFY_API_TOKEN"))
-            
-            # 공식 샘플에 맞춘 정확한 형식
-            run_input = {
-                "startUrls": [url],  # 단순 문자열 배열
-                "language": lang,
-                "includeTimestamps": "No"  # 공식 샘플의 필수 파라미터
-            }
-            
-            print(f"🔍 Apify 요청 데이터: {run_input}")
-            
-            # 공식 샘플의 정확한 Actor ID 사용
-            run = client.actor("dB9f4B02ocpTICIEY").call(run_input=run_input)
-
-            if run and run.get('status') == 'SUCCEEDED':
-                print(f"✅ Apify 실행 성공, 데이터셋 확인 중...")
-                transcript = ""
-                video_title = None
-                item_count = 0
-                
-                for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-                    item_count += 1
-                    print(f"📄 데이터 항목 {item_count}: {item}")
-                    
-                    # 실제 필드명인 'transcript' 사용
-                    text = item.get("transcript") or item.get("text")
-                    if text:
-                        transcript += text + " "
-                    
-                    # 영상 제목도 함께 추출
-                    if not video_title:
-                        video_title = item.get("videoTitle")
-                
-                print(f"📊 총 {item_count}개 항목 처리됨")
-                
-                if transcript.strip():
-                    print(f"✅ '{lang}' 언어 자막 추출 성공! (길이: {len(transcript)} 문자)")
-                    print(f"🎥 영상 제목: {video_title}")
-                    return transcript.strip(), lang, video_title
-                else:
-                    print(f"⚠️ '{lang}' 언어 데이터는 있지만 텍스트가 비어있음")
+    client = get_apify_client(os.environ.get("APIFY_API_TOKEN"))
+    
+    if parallel:
+        print(f"🔀 {languages} 언어를 동시에 시도합니다.")
+        lang, result = probe_languages(
+            languages,
+            tracing.propagate(lambda lang, cancel_event: _extract_language(client, url, lang, cancel_event)),
+        )
+        if result:
+            transcript, video_title = result
+            return transcript, lang, video_title
+    else:
+        for lang in languages:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            result = _extract_language(client, url, lang, cancel_event)
+            if result:
+                transcript, video_title = result
+                return transcript, lang, video_title
+
+    print("❌ 모든 언어로 자막 추출에 실패했습니다.")
+    return None, None, None
+
+def _extract_language(client: ApifyClient, url: str, lang: str, cancel_event=None):
+    """한 언어로 자막을 추출합니다. 성공 시 (자막, 제목), 실패 시 None을 반환합니다."""
+    with tracing.span("transcript", language=lang):
+        return _extract_language_once(client, url, lang, cancel_event)
+
+def _extract_language_once(client: ApifyClient, url: str, lang: str, cancel_event=None):
+    print(f"➡️ '{lang}' 언어로 추출 시도...")
+    try:
+        run_input = _main_run_input(url, lang)
+        print(f"🔍 Apify 요청 데이터: {run_input}")
+        
+        # 공식 샘플의 정확한 Actor ID 사용 (병렬 모드에서 다른 언어가 먼저 확정되면 중단됨)
+        started_at = time.monotonic()
+        with tracing.span("apify_run", language=lang):
+            run = run_actor_guarded(client, PRIMARY_ACTOR_ID, run_input, cancel_event)
+        if run is None:
+            print(f"🛑 '{lang}' 언어 실행이 중단되었습니다.")
+            return None
+
+        if run and run.get('status') == 'SUCCEEDED':
+            print(f"✅ Apify 실행 성공, 데이터셋 확인 중...")
+            with tracing.span("poll_wait", language=lang):
+                # 데이터셋 전체를 받지 않고 앞쪽 항목만 (다시 쓴 실행이면 그 실행의 영상 수만큼)
+                items = wait_for_items(client, run["defaultDatasetId"], started_at, cancel_event,
+                                       limit=len(run.get("videos") or [url]))
+            return _collect_transcript(_video_items(items, url, run.get("videos")), lang)
+
+        else:
+            print(f"❌ '{lang}' 언어 Apify 실행 실패: {run}")
 
+    except breaker.CircuitOpenError as e:
+        print(f"⛔ '{lang}' 언어 건너뜀: {e}")
+    except Exception as e:
+        print(f"❌ '{lang}' 언어 추출 중 오류 발생: {e}")
+
+    return None
+
+def _main_run_input(url: str, lang: str) -> dict:
+    """기본 Actor 입력 (공식 샘플에 맞춘 정확한 형식)"""
+    return {
+        "startUrls": [url],  # 단순 문자열 배열
+        "language": lang,
+        "includeTimestamps": "No"  # 공식 샘플의 필수 파라미터
+    }
+
+def _video_items(items: list, url: str, run_videos=None) -> list:
+    """
+    데이터셋 항목 중 이 영상의 항목만 남깁니다.
+    다시 쓴 실행(run_videos)이나 작업 기록의 실행은 여러 영상을 한 번에 돌린 데이터셋일 수 있습니다.
+    """
+    video_id = extract_video_id(url)
+    if not video_id:
+        return items
+    if run_videos and len(run_videos) > 1:
+        item = apify_runs.match_items_to_videos([video_id], items, run_videos).get(video_id)
+        return [item] if item else []
+    # 다른 영상을 가리키는 항목만 뺌 (영상 정보가 없는 항목은 이 영상의 것으로 봄)
+    return [item for item in items if apify_runs.item_video_id(item, [video_id]) in (None, video_id)]
+
+def _collect_transcript(items: list, lang: str):
+    """기본 Actor 데이터셋 항목을 합쳐 (자막, 제목)을 반환합니다. 텍스트가 없으면 None."""
+    transcript = ""
+    video_title = None
+    item_count = 0
+    
+    for item in items:
+        item_count += 1
+        print(f"📄 데이터 항목 {item_count}: {item}")
+        
+        # 실제 필드명인 'transcript' 사용
+        text = item.get("transcript") or item.get("text")
+        if text:
+            transcript += text + " "
+        
+        # 영상 제목도 함께 추출
+        if not video_title:
+            video_title = item.get("videoTitle")
+    
+    print(f"📊 총 {item_count}개 항목 처리됨")
+    
+    if transcript.strip():
+        print(f"✅ '{lang}' 언어 자막 추출 성공! (길이: {len(transcript)} 문자)")
+        print(f"🎥 영상 제목: {video_title}")
+        return transcript.strip(), video_title
+    print(f"⚠️ '{lang}' 언어 데이터는 있지만 텍스트가 비어있음")
+    return None
+
+def recover_transcript(runs: list, url: str = ""):
+    """
+    이전 프로세스가 시작한 Actor 실행(작업 기록의 runs)에 다시 붙어 url 영상의 자막을 받습니다.
+    아직 실행 중이면 끝날 때까지 기다리고, 성공한 실행의 데이터셋을 읽습니다. (새 실행은 시작하지 않음)
+    (자막, 언어, 제목)을 반환하며, 쓸 수 있는 실행이 없으면 (None, None, None)입니다.
+    """
+    client = get_apify_client(os.environ.get("APIFY_API_TOKEN"))
+    for entry in runs:
+        try:
+            print(f"♻️ 이전 Actor 실행에 다시 연결: {entry['run_id']} ({entry.get('language') or 'backup'})")
+            run = wait_for_run(client, entry["run_id"])
+            if not run or run.get("status") != "SUCCEEDED":
+                print(f"❌ 이전 실행을 쓸 수 없습니다: {run.get('status') if run else '없음'}")
+                continue
+            # 다시 쓴 실행이면 여러 영상이 든 데이터셋이므로 그 실행의 영상 수만큼 읽고 이 영상 항목을 고름
+            run_videos = entry.get("videos")
+            items = wait_for_items(client, run["defaultDatasetId"], time.monotonic(), limit=len(run_videos or [url]))
+            items = _video_items(items, url, run_videos)
+            if entry["actor_id"] == BACKUP_ACTOR_ID:
+                text, title = providers.parse_backup_item(items[0]) if items else (None, None)
+                if text:
+                    return text, "backup", title
             else:
-                print(f"❌ '{lang}' 언어 Apify 실행 실패: {run}")
+                result = _collect_transcript(items, entry.get("language"))
+                if result:
+                    transcript, video_title = result
+                    return transcript, entry.get("language"), video_title
+        except Exception as e:
+            print(f"❌ 이전 실행 {entry['run_id']} 결과를 가져오지 못했습니다: {e}")
+    return None, None, None
+
+async def run_actor_guarded_async(client, actor_id: str, run_input: dict):
+    """run_actor_guarded의 비동기판 (AsyncApifyClient 사용, 같은 회로 차단기에 기록)"""
+    guard = actor_breaker(actor_id)
+    if not guard.allow():
+        raise breaker.CircuitOpenError(guard.name, guard.retry_in())
+    started = time.monotonic()
+    try:
+        run = await client.run_actor(actor_id, run_input)
+    except asyncio.CancelledError:
+        guard.record(None, time.monotonic() - started)
+        raise
+    except Exception:
+        guard.record(False, time.monotonic() - started)
+        raise
+    guard.record(_run_outcome(run), time.monotonic() - started)
+    return run
 
+async def get_youtube_transcript_async(client, url: str, prefer_korean: bool = True,
+                                       languages: Optional[list] = None):
+    """
+    asyncio 서버(asgi_server.py)용 자막 추출. client는 ytcore.async_clients.AsyncApifyClient 입니다.
+    기본 Actor로 언어를 차례로 시도하고, 모두 실패하거나 기본 Actor 회로가 열려 있으면 백업 Actor를 사용합니다.
+    Actor 실행을 기다리는 동안 스레드를 붙잡지 않습니다.
+    """
+    if languages is None:
+        languages = _languages(prefer_korean)
+    
+    for lang in languages:
+        print(f"➡️ '{lang}' 언어로 추출 시도...")
+        try:
+            with tracing.span("transcript", language=lang):
+                with tracing.span("apify_run", language=lang):
+                    run = await run_actor_guarded_async(client, PRIMARY_ACTOR_ID, _main_run_input(url, lang))
+                if run.get('status') != 'SUCCEEDED':
+                    print(f"❌ '{lang}' 언어 Apify 실행 실패: {run}")
+                    continue
+                with tracing.span("poll_wait", language=lang):
+                    items = await client.all_items(run["defaultDatasetId"])
+            result = _collect_transcript(items, lang)
+            if result:
+                transcript, video_title = result
+                return transcript, lang, video_title
+        except breaker.CircuitOpenError as e:
+            print(f"⛔ 기본 Actor 건너뜀: {e}")
+            break
         except Exception as e:
             print(f"❌ '{lang}' 언어 추출 중 오류 발생: {e}")
-            continue
-
-    print("❌ 모든 언어로 자막 추출에 실패했습니다.")
+    
+    print("🔄 기본 Actor 실패, 백업 Actor로 시도합니다...")
+    try:
+        with tracing.span("apify_run", language="backup"):
+            run = await run_actor_guarded_async(client, BACKUP_ACTOR_ID, {"startUrls": [url], "maxRequestRetries": 2})
+        if run.get('status') == 'SUCCEEDED':
+            for item in await client.all_items(run["defaultDatasetId"]):
+                text, video_title = providers.parse_backup_item(item)
+                if text:
+                    print("✅ 백업 Actor로 자막 추출 성공!")
+                    return text, "backup", video_title
+    except breaker.CircuitOpenError as e:
+        print(f"⛔ 백업 Actor 건너뜀: {e}")
+    except Exception as e:
+        print(f"❌ 백업 Actor 실행 중 오류 발생: {e}")
+    
+    print("❌ 백업 Actor도 실패")
     return None, None, None
 
 def get_video_title(url: str) -> str:
@@ -127,11 +466,13 @@ def get_video_title(url: str) -> str:
             "maxRequestRetries": 2,
         }
         
-        client = ApifyClient(os.environ.get("APIFY_API_TOKEN"))
-        run = client.actor("topaz_sharingan/youtube-transcript-scraper-1").call(run_input=run_input)
+        client = get_apify_client(os.environ.get("APIFY_API_TOKEN"))
+        started_at = time.monotonic()
+        run = run_actor(client, "topaz_sharingan/youtube-transcript-scraper-1", run_input)
 
         if run and run.get('status') == 'SUCCEEDED':
-            for item in client.dataset(run["defaultDatasetId"]).iterate_items():
+            items = wait_for_items(client, run["defaultDatasetId"], started_at, limit=len(run.get("videos") or [url]))
+            for item in _video_items(items, url, run.get("videos")):
                 title = item.get("title")
                 if title:
                     print(f"✅ 영상 제목: {title}")
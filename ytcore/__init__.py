@@ -0,0 +1 @@
+"""api/youtube.py 와 python_bot 이 함께 사용하는 공용 모듈 모음."""
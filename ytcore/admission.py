@@ -0,0 +1,222 @@
+"""
+요청 입장 관리(admission control).
+
+동시에 실행할 수 있는 요청 수를 제한하되, 슬롯이 없다고 바로 거절하지 않고
+방(room)별 FIFO 대기열에서 잠시 기다리게 합니다. 슬롯이 비면 방 사이를 라운드로빈으로
+돌며 배분하므로 한 방이 요청을 몰아 보내도 다른 방이 굶지 않습니다.
+
+대기열이 가득 찼거나 max_wait 안에 슬롯을 얻지 못하면 QueueFull을 발생시키며,
+관측된 평균 처리 시간으로 계산한 retry_after(초)를 함께 전달합니다.
+asyncio 서버는 같은 규칙의 AsyncAdmissionController를 사용합니다.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+
+from ytcore import metrics
+
+queue_depth = metrics.gauge("admission_queue_depth", "슬롯을 기다리는 요청 수")
+active_requests = metrics.gauge("admission_active_requests", "실행 중인 요청 수")
+wait_seconds = metrics.histogram("admission_wait_seconds", "슬롯을 얻기까지 기다린 시간")
+rejected_total = metrics.counter("admission_rejected_total", "대기열 초과/대기 시간 초과로 거절된 요청 수")
+
+
+class QueueFull(Exception):
+    """대기열이 가득 찼거나 대기 시간이 초과되었습니다."""
+
+    def __init__(self, retry_after, reason="queue_full"):
+        super().__init__(f"{reason} (retry after {retry_after}s)")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class _Ticket:
+    """대기 중인 요청 하나 (동일성으로 비교)."""
+
+    __slots__ = ("granted",)
+
+    def __init__(self):
+        self.granted = False
+
+    def grant(self):
+        self.granted = True
+
+
+class _AsyncTicket(_Ticket):
+    """asyncio 대기 요청. 슬롯을 받으면 future가 완료됩니다."""
+
+    __slots__ = ("future",)
+
+    def __init__(self, loop):
+        super().__init__()
+        self.future = loop.create_future()
+
+    def grant(self):
+        super().grant()
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class AdmissionController:
+    """방별 공정 대기열을 가진 동시 처리 제한기."""
+
+    def __init__(self, concurrency=5, max_queue=20, max_wait=30.0, initial_service_time=30.0):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._rooms = OrderedDict()  # room -> deque[대기 표식]
+        self._service_time = initial_service_time  # 처리 시간 지수 이동 평균(초)
+
+    @contextmanager
+    def slot(self, room=None):
+        """슬롯을 얻은 동안 블록을 실행합니다. 얻지 못하면 QueueFull."""
+        self.acquire(room)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def acquire(self, room=None):
+        waited_from = time.monotonic()
+        with self._cond:
+            if self._active < self.concurrency and not self._waiting:
+                self._active += 1
+                self._publish()
+                wait_seconds.observe(0.0)
+                return
+
+            if self._waiting >= self.max_queue:
+                rejected_total.inc(reason="queue_full")
+                raise QueueFull(self.retry_after(), "queue_full")
+
+            ticket = _Ticket()
+            self._rooms.setdefault(room, deque()).append(ticket)
+            self._waiting += 1
+            self._publish()
+
+            deadline = waited_from + self.max_wait
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._remove(room, ticket)
+                    self._publish()
+                    rejected_total.inc(reason="timeout")
+                    raise QueueFull(self.retry_after(), "timeout")
+                self._cond.wait(remaining)
+
+        wait_seconds.observe(time.monotonic() - waited_from)
+
+    def release(self, service_time=None):
+        with self._cond:
+            if service_time is not None:
+                self._service_time = 0.8 * self._service_time + 0.2 * service_time
+            self._active -= 1
+            self._grant_next()
+            self._publish()
+
+    def retry_after(self):
+        """지금 대기열이 빠지기까지 예상되는 시간(초, 최소 1)."""
+        backlog = self._waiting + 1
+        return max(1, math.ceil(self._service_time * backlog / self.concurrency))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "active": self._active,
+                "waiting": self._waiting,
+                "rooms_waiting": len(self._rooms),
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "max_wait": self.max_wait,
+                "avg_service_time": round(self._service_time, 3),
+            }
+
+    def _grant_next(self):
+        """가장 오래 차례를 기다린 방의 첫 요청에 슬롯을 넘기고, 그 방은 맨 뒤로 보냅니다."""
+        while self._active < self.concurrency and self._rooms:
+            room, waiters = next(iter(self._rooms.items()))
+            ticket = waiters.popleft()
+            del self._rooms[room]
+            if waiters:
+                self._rooms[room] = waiters
+            self._waiting -= 1
+            self._active += 1
+            ticket.grant()
+            self._cond.notify_all()
+
+    def _remove(self, room, ticket):
+        waiters = self._rooms.get(room)
+        if waiters and ticket in waiters:
+            waiters.remove(ticket)
+            self._waiting -= 1
+            if not waiters:
+                del self._rooms[room]
+
+    def _publish(self):
+        queue_depth.set(self._waiting)
+        active_requests.set(self._active)
+
+
+class AsyncAdmissionController(AdmissionController):
+    """
+    asyncio 서버용 입장 관리자. 대기 규칙(방별 라운드로빈, 대기열 한도, max_wait)은 같고,
+    슬롯을 기다리는 동안 스레드 대신 future를 await 합니다. 이벤트 루프 하나에서만 사용합니다.
+    """
+
+    @asynccontextmanager
+    async def slot(self, room=None):
+        """슬롯을 얻은 동안 블록을 실행합니다. 얻지 못하면 QueueFull."""
+        await self.acquire(room)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    async def acquire(self, room=None):
+        waited_from = time.monotonic()
+        with self._cond:
+            if self._active < self.concurrency and not self._waiting:
+                self._active += 1
+                self._publish()
+                wait_seconds.observe(0.0)
+                return
+
+            if self._waiting >= self.max_queue:
+                rejected_total.inc(reason="queue_full")
+                raise QueueFull(self.retry_after(), "queue_full")
+
+            ticket = _AsyncTicket(asyncio.get_running_loop())
+            self._rooms.setdefault(room, deque()).append(ticket)
+            self._waiting += 1
+            self._publish()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.future), self.max_wait)
+        except asyncio.TimeoutError:
+            with self._cond:
+                if not ticket.granted:
+                    self._remove(room, ticket)
+                    self._publish()
+                    rejected_total.inc(reason="timeout")
+                    raise QueueFull(self.retry_after(), "timeout")
+        except asyncio.CancelledError:
+            # 기다리던 요청이 취소되면 대기열에서 빼거나, 이미 받은 슬롯을 돌려줌
+            with self._cond:
+                if not ticket.granted:
+                    self._remove(room, ticket)
+                    self._publish()
+                    raise
+            self.release()
+            raise
+
+        wait_seconds.observe(time.monotonic() - waited_from)
+
@@ -0,0 +1,213 @@
+"""Apify Actor 실행 보조 함수."""
+
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+
+from ytcore import journal, metrics
+from ytcore.youtube_url import extract_video_id
+
+# 더 이상 진행되지 않는 Actor 실행 상태
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT")
+
+time_to_first_item = metrics.histogram(
+    "apify_time_to_first_item_seconds",
+    "Actor 시작부터 데이터셋 첫 항목을 받기까지 걸린 시간",
+)
+
+
+# 다시 쓸 수 있는 실행 상태 (끝났거나 아직 진행 중)
+_REUSABLE_STATUSES = ("SUCCEEDED", "READY", "RUNNING")
+
+run_reuse_total = metrics.counter(
+    "apify_run_reuse_total",
+    "실행 색인 조회 결과 (finished: 끝난 실행 재사용, running: 진행 중인 실행에 합류, miss: 새로 시작)",
+)
+
+# 같은 입력의 최근 실행을 다시 쓰기 위한 색인 (cache.RunIndex, 설정하지 않으면 항상 새로 시작)
+_run_index = None
+
+
+def set_run_index(index):
+    """run_actor가 같은 입력의 최근 실행을 다시 쓰도록 실행 색인(cache.RunIndex)을 설정합니다. None이면 끕니다."""
+    global _run_index
+    _run_index = index
+
+
+def run_keys(actor_id, run_input):
+    """
+    실행 색인 키 목록: 영상마다 (Actor, 영상 ID, 언어) + 나머지 입력의 지문. {video_id: key} 순서는 startUrls 순서.
+    startUrls에서 영상 ID를 하나라도 알 수 없으면 None. (다시 쓰지 않음)
+    """
+    urls = [url.get("url") if isinstance(url, dict) else url for url in run_input.get("startUrls") or []]
+    video_ids = [extract_video_id(url or "") for url in urls]
+    if not video_ids or not all(video_ids):
+        return None
+    rest = {name: value for name, value in run_input.items() if name not in ("startUrls", "language")}
+    fingerprint = hashlib.sha256(json.dumps(rest, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    language = run_input.get("language")
+    return {video_id: _run_index.make_key(actor_id, video_id, language, fingerprint) for video_id in video_ids}
+
+
+def _reusable_run(client, keys):
+    """
+    요청한 영상이 모두 들어 있는 색인된 실행이 아직 쓸 수 있으면(성공했거나 진행 중) (최신 실행 정보, 그 실행의 영상 ID 목록)을,
+    아니면 (None, None)을 반환합니다. (여러 영상을 한 번에 실행한 데이터셋을 그중 한 영상 요청이 다시 쓸 수 있음)
+    """
+    first_key = next(iter(keys.values()))
+    entry = _run_index.get(first_key)
+    if entry is None or not set(keys) <= set(entry.get("videos") or ()):
+        return None, None
+    try:
+        run = client.run(entry["run_id"]).get()
+    except Exception as e:
+        logging.warning(f"이전 Actor 실행 조회 실패 ({entry['run_id']}): {e}")
+        run = None
+    if not run or run.get("status") not in _REUSABLE_STATUSES:
+        _forget_run(keys, entry["run_id"])
+        return None, None
+    return run, entry["videos"]
+
+
+def _forget_run(keys, run_id):
+    """색인에서 이 실행을 가리키는 영상 키만 지웁니다. (그사이 다른 실행으로 바뀐 키는 그대로 둠)"""
+    for key in keys.values():
+        entry = _run_index.get(key)
+        if entry is not None and entry["run_id"] == run_id:
+            _run_index.delete(key)
+
+
+def run_actor(client, actor_id, run_input, cancel_event=None, wait_secs=None):
+    """
+    Actor를 시작하고 끝날 때까지 기다린 뒤 실행 정보(dict)를 반환합니다.
+
+    고정 간격 폴링 대신 Apify의 wait_for_finish(서버 측 대기)를 사용합니다.
+    cancel_event가 설정되면 진행 중인 실행을 중단(abort)하고 None을 반환합니다.
+    처리 중인 작업이 있으면 실행 ID를 작업 기록(journal)에 남겨 재시작 후 다시 붙을 수 있게 합니다.
+
+    실행 색인이 설정되어 있으면 요청한 영상이 모두 들어 있는 같은 입력의 실행이 끝났거나 진행 중일 때 새로 시작하지 않고 그 실행을 씁니다.
+    이때 반환하는 실행 정보에는 reused("finished" 또는 "running")와 그 실행의 영상 ID 목록(videos)이 붙습니다.
+    데이터셋에 다른 영상의 항목이 섞여 있을 수 있으므로 호출하는 쪽은 match_items_to_videos로 영상별 항목을 고릅니다.
+    다시 쓴 실행은 다른 요청의 것일 수 있으므로 취소되어도 중단하지 않고 기다리기만 멈춥니다.
+    """
+    if wait_secs is None:
+        # 중단 신호를 확인해야 할 때는 짧게, 아니면 길게 기다림
+        wait_secs = 5 if cancel_event is not None else 60
+    keys = run_keys(actor_id, run_input) if _run_index is not None else None
+    run, run_videos = _reusable_run(client, keys) if keys else (None, None)
+    reused = None
+    if run is not None:
+        reused = "finished" if run.get("status") == "SUCCEEDED" else "running"
+        run_reuse_total.inc(outcome=reused)
+        logging.info(f"♻️ 같은 입력의 Actor 실행을 다시 씁니다: {run['id']} ({run.get('status')}, 영상 {len(run_videos)}개)")
+    else:
+        if keys:
+            run_reuse_total.inc(outcome="miss")
+        run = client.actor(actor_id).start(run_input=run_input)
+        run_videos = list(keys) if keys else None
+        if keys:
+            for key in keys.values():
+                _run_index.set(key, run, run_videos)
+    journal.note_run(actor_id, run, run_input, run_videos)
+
+    run_client = client.run(run["id"])
+    while run.get("status") not in TERMINAL_STATUSES:
+        if cancel_event is not None and cancel_event.is_set():
+            if reused:
+                logging.info(f"🛑 다시 쓰던 Actor 실행 기다리기 중단: {run['id']}")
+                return None
+            try:
+                run_client.abort()
+                logging.info(f"🛑 Actor 실행 중단: {run['id']}")
+            except Exception as e:
+                logging.warning(f"Actor 실행 중단 실패 ({run['id']}): {e}")
+            return None
+        run = run_client.wait_for_finish(wait_secs=wait_secs) or run
+
+    if keys:
+        if run.get("status") == "SUCCEEDED":
+            for key in keys.values():
+                _run_index.set(key, run, run_videos)
+        else:
+            _forget_run(keys, run["id"])
+            if reused:
+                # 합류한 실행이 실패/중단되었으면 직접 새로 실행
+                logging.info(f"↩️ 다시 쓰던 실행이 {run.get('status')} 상태로 끝나 새로 실행합니다.")
+                return run_actor(client, actor_id, run_input, cancel_event, wait_secs)
+    return dict(run, reused=reused, videos=run_videos) if reused else run
+
+
+def wait_for_run(client, run_id, wait_secs=60):
+    """
+    이미 시작된 실행이 끝날 때까지 기다려 실행 정보(dict)를 반환합니다. 실행이 없으면 None.
+    (재시작 후 이전 프로세스가 시작한 실행에 다시 붙을 때 사용)
+    """
+    run_client = client.run(run_id)
+    run = run_client.get()
+    while run is not None and run.get("status") not in TERMINAL_STATUSES:
+        run = run_client.wait_for_finish(wait_secs=wait_secs) or run
+    return run
+
+
+def wait_for_items(client, dataset_id, started_at, cancel_event=None, limit=1,
+                   timeout=20, base_delay=0.25, max_delay=4):
+    """
+    데이터셋 앞쪽 항목을 최대 limit개만 가져옵니다. 아직 비어 있으면 지수 백오프(+지터)로 재시도합니다.
+
+    started_at(time.monotonic 값)부터 첫 항목을 받기까지의 시간을 메트릭으로 기록합니다.
+    timeout 안에 항목이 없거나 cancel_event가 설정되면 빈 목록을 반환합니다.
+    """
+    cancel_event = cancel_event or threading.Event()
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        try:
+            items = client.dataset(dataset_id).list_items(limit=limit).items
+            if items:
+                elapsed = time.monotonic() - started_at
+                time_to_first_item.observe(elapsed)
+                logging.info(f"⏱️ 첫 데이터 항목까지 {elapsed:.2f}초")
+                return items
+        except Exception as e:
+            logging.error(f"데이터 가져오기 오류 (시도 {attempt + 1}): {e}")
+
+        delay = min(max_delay, base_delay * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)
+        if time.monotonic() + delay > deadline:
+            return []
+        logging.info(f"⏳ 시도 {attempt + 1}: 아직 데이터가 없습니다. {delay:.2f}초 후 재시도...")
+        if cancel_event.wait(delay):
+            return []
+        attempt += 1
+
+
+def item_video_id(item, video_ids=()):
+    """데이터셋 항목이 가리키는 영상 ID (videoId 또는 URL 필드). 알 수 없으면 None."""
+    source = item.get("videoId") or item.get("url") or item.get("videoUrl") or item.get("inputUrl") or ""
+    return source if source in video_ids else extract_video_id(str(source))
+
+
+def match_items_to_videos(video_ids, items, run_videos=None):
+    """
+    데이터셋 항목을 요청한 영상 ID와 짝지어 {video_id: item}으로 반환합니다.
+
+    run_videos: 그 실행에 넣은 영상 ID 목록(startUrls 순서). 다시 쓴 실행처럼 데이터셋에 다른 영상의 항목이
+    섞여 있을 때 넘기며, 생략하면 video_ids와 같다고 봅니다.
+    """
+    run_videos = list(run_videos or video_ids)
+    matched = {}
+    for item in items:
+        video_id = item_video_id(item, run_videos)
+        if video_id in run_videos and video_id not in matched:
+            matched[video_id] = item
+
+    # URL 정보가 없는 항목은 실행에 넣은 순서대로 짝지음
+    if not matched and items:
+        if len(run_videos) == 1:
+            matched = {run_videos[0]: items[0]}
+        elif len(items) == len(run_videos):
+            matched = dict(zip(run_videos, items))
+    return {video_id: item for video_id, item in matched.items() if video_id in video_ids}
@@ -0,0 +1,163 @@
+"""
+ASGI 앱 보조 함수와 의존성 없는 최소 HTTP/1.1 서버.
+
+운영에서는 uvicorn 같은 ASGI 서버를 쓰는 것이 좋지만, 설치되어 있지 않아도 serve()로 바로 실행할 수 있습니다.
+serve()는 asyncio.start_server 위에서 요청 줄, 헤더, Content-Length 본문만 해석하는 단순한 구현입니다.
+keep-alive와 lifespan(startup/shutdown)을 지원하고, 청크 전송 요청 본문과 응답 스트리밍은 지원하지 않습니다.
+"""
+
+import asyncio
+import json
+import logging
+from http import HTTPStatus
+from urllib.parse import unquote
+
+
+def header(scope, name):
+    """요청 헤더 값(str). 없으면 None."""
+    name = name.lower().encode("latin-1")
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def read_body(receive):
+    """요청 본문 전체를 읽습니다."""
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return body
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def send_body(send, status, body, content_type, headers=None):
+    raw_headers = [(b"content-type", content_type.encode("latin-1")),
+                   (b"content-length", str(len(body)).encode("latin-1"))]
+    raw_headers += [(name.lower().encode("latin-1"), str(value).encode("latin-1"))
+                    for name, value in (headers or {}).items()]
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_json(send, status, payload, headers=None):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await send_body(send, status, body, "application/json", headers)
+
+
+async def _lifespan(app, phase, queue, done):
+    """lifespan 이벤트 하나(startup/shutdown)를 보내고 앱의 응답을 기다립니다."""
+    await queue.put({"type": f"lifespan.{phase}"})
+    message = await done.get()
+    if message["type"].endswith(".failed"):
+        raise RuntimeError(f"ASGI lifespan {phase} 실패: {message.get('message', '')}")
+
+
+async def serve(app, host="0.0.0.0", port=8080, backlog=2048):
+    """ASGI 앱을 HTTP로 제공합니다. (Ctrl+C 또는 취소될 때까지 실행)"""
+    queue, done = asyncio.Queue(), asyncio.Queue()
+    lifespan = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, queue.get, done.put))
+    await _lifespan(app, "startup", queue, done)
+
+    async def on_connect(reader, writer):
+        await _handle_connection(app, reader, writer, (host, port))
+
+    server = await asyncio.start_server(on_connect, host, port, backlog=backlog)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await _lifespan(app, "shutdown", queue, done)
+        lifespan.cancel()
+
+
+async def _read_request(reader):
+    """(method, target, version, headers, body)를 읽습니다. 연결이 닫혔으면 None."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, version = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    headers = []
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = raw.decode("latin-1").partition(":")
+        headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+    length = int(dict(headers).get(b"content-length", b"0") or 0)
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+async def _handle_connection(app, reader, writer, server):
+    try:
+        while True:
+            request = await _read_request(reader)
+            if request is None:
+                return
+            method, target, version, headers, body = request
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": version.partition("/")[2] or "1.1",
+                "method": method.upper(),
+                "scheme": "http",
+                "path": unquote(path),
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "client": writer.get_extra_info("peername"),
+                "server": server,
+            }
+
+            messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+            async def receive():
+                return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+            response = {"status": 500, "headers": [], "body": b""}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    response["status"] = message["status"]
+                    response["headers"] = list(message.get("headers", []))
+                elif message["type"] == "http.response.body":
+                    response["body"] += message.get("body", b"")
+
+            try:
+                await app(scope, receive, send)
+            except Exception as e:
+                logging.error(f"ASGI 앱 오류: {e}", exc_info=True)
+                response = {"status": 500, "headers": [(b"content-type", b"text/plain")], "body": b"Internal Server Error"}
+
+            keep_alive = version == "HTTP/1.1" and dict(headers).get(b"connection", b"").lower() != b"close"
+            writer.write(_format_response(response, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                return
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+def _format_response(response, keep_alive):
+    status = response["status"]
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    lines = [f"HTTP/1.1 {status} {reason}".encode("latin-1")]
+    names = set()
+    for name, value in response["headers"]:
+        names.add(name.lower())
+        lines.append(name + b": " + value)
+    if b"content-length" not in names:
+        lines.append(b"content-length: " + str(len(response["body"])).encode("latin-1"))
+    lines.append(b"connection: " + (b"keep-alive" if keep_alive else b"close"))
+    return b"\r\n".join(lines) + b"\r\n\r\n" + response["body"]
@@ -0,0 +1,169 @@
+"""
+asyncio 서버(python_bot/asgi_server.py)에서 쓰는 Apify / Gemini 비동기 클라이언트 (httpx 사용).
+
+rest_clients 와 같은 REST 호출을 await 로 합니다. 실행 완료 대기와 재시도 대기가 모두
+이벤트 루프 위에서 이루어지므로, 요청 하나가 OS 스레드 하나를 붙잡고 있지 않습니다.
+
+Actor 실행 완료는 서버 측 대기(waitForFinish) 대신 짧은 상태 조회 + asyncio.sleep 백오프로 기다립니다.
+긴 대기 요청은 끝날 때까지 연결을 붙잡아 동시 작업 수만큼 연결이 필요하지만,
+조회 사이에는 연결을 풀에 돌려주므로 작은 연결 풀(max_connections)로 수백 개의 실행을 함께 기다릴 수 있습니다.
+
+- AsyncApifyClient: start_run / get_run / abort_run / list_items / all_items, run_actor
+- AsyncGeminiModel: await generate_content(prompt) → .text 속성을 가진 응답
+
+클라이언트는 이벤트 루프 하나에 묶이므로 서버 시작 시 만들고 종료 시 aclose() 합니다.
+"""
+
+import asyncio
+import logging
+import random
+
+import httpx
+
+from ytcore.apify_runs import TERMINAL_STATUSES
+from ytcore.rest_clients import (
+    DEFAULT_APIFY_API_URL,
+    DEFAULT_GEMINI_API_URL,
+    GeminiResponse,
+    ListPage,
+    _RETRY_STATUSES,
+    gemini_request_body,
+)
+
+
+class _Http:
+    """
+    httpx.AsyncClient와 동시 요청 수 제한.
+
+    httpx 연결 풀은 요청이 들어오고 나갈 때마다 대기 중인 요청 × 연결을 모두 훑으므로,
+    풀 안에서 요청이 줄을 서면 동시 작업이 수백 개일 때 CPU를 크게 씁니다.
+    세마포어로 연결 수만큼만 풀에 넘겨 줄 서기는 asyncio에서 하고, 쉬는 연결도 조금만 남깁니다.
+    """
+
+    def __init__(self, headers, timeout, max_connections):
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=min(10, max_connections)),
+        )
+        self.slots = asyncio.Semaphore(max_connections)
+
+    async def request(self, method, url, **kwargs):
+        async with self.slots:
+            return await self.client.request(method, url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+async def _request(http, method, url, max_attempts=None, **kwargs):
+    """일시적 오류(연결 실패, 429, 5xx)는 짧게 기다렸다가 다시 시도합니다. (rest_clients._request 와 같이 기본은 GET만)"""
+    if max_attempts is None:
+        max_attempts = 3 if method == "GET" else 1
+    for attempt in range(1, max_attempts + 1):
+        try:
+            response = await http.request(method, url, **kwargs)
+            if response.status_code not in _RETRY_STATUSES or attempt == max_attempts:
+                response.raise_for_status()
+                return response
+            logging.warning(f"HTTP {response.status_code} 응답, 다시 시도합니다. ({attempt}/{max_attempts})")
+        except httpx.TransportError:
+            if attempt == max_attempts:
+                raise
+            logging.warning(f"연결 실패, 다시 시도합니다. ({attempt}/{max_attempts})")
+        await asyncio.sleep(0.5 * (2 ** (attempt - 1)))
+
+
+class AsyncApifyClient:
+    """Apify REST API 비동기 클라이언트. poll_max_delay: 실행 상태 조회 간격의 상한(초)"""
+
+    def __init__(self, token, api_url=None, timeout=30, max_connections=50, poll_max_delay=2.0):
+        self.api_url = (api_url or DEFAULT_APIFY_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.poll_max_delay = poll_max_delay
+        self.http = _Http({"Authorization": f"Bearer {token}"}, timeout, max_connections)
+
+    async def _call(self, method, path, timeout=None, **kwargs):
+        return await _request(self.http, method, f"{self.api_url}/v2{path}",
+                              timeout=timeout or self.timeout, **kwargs)
+
+    async def start_run(self, actor_id, run_input=None):
+        """Actor를 시작하고 실행 정보(dict)를 바로 반환합니다."""
+        # "사용자/이름" 형태의 Actor ID는 URL에서 "사용자~이름"으로 씀
+        response = await self._call("POST", f"/acts/{actor_id.replace('/', '~')}/runs", json=run_input or {},
+                                    max_attempts=1)
+        return response.json()["data"]
+
+    async def get_run(self, run_id):
+        response = await self._call("GET", f"/actor-runs/{run_id}")
+        return response.json()["data"]
+
+    async def abort_run(self, run_id):
+        response = await self._call("POST", f"/actor-runs/{run_id}/abort", max_attempts=1)
+        return response.json()["data"]
+
+    async def list_items(self, dataset_id, offset=0, limit=None):
+        params = {"format": "json", "offset": offset}
+        if limit is not None:
+            params["limit"] = limit
+        response = await self._call("GET", f"/datasets/{dataset_id}/items", params=params)
+        items = response.json()
+        total = int(response.headers.get("X-Apify-Pagination-Total", len(items)))
+        return ListPage(items, offset, limit, total)
+
+    async def all_items(self, dataset_id, page_size=1000):
+        """데이터셋 항목을 모두 가져옵니다."""
+        items, offset = [], 0
+        while True:
+            page = await self.list_items(dataset_id, offset=offset, limit=page_size)
+            items.extend(page.items)
+            offset += page.count
+            if page.count < page_size or offset >= page.total:
+                return items
+
+    async def run_actor(self, actor_id, run_input, base_delay=0.25):
+        """
+        Actor를 시작하고 끝날 때까지 기다린 뒤 실행 정보(dict)를 반환합니다. (apify_runs.run_actor 의 비동기판)
+        상태 조회 간격은 base_delay부터 poll_max_delay까지 두 배씩 늘어납니다. (지터 포함)
+        요청이 취소(CancelledError)되면 진행 중인 실행을 중단(abort)하고 취소를 그대로 전달합니다.
+        """
+        run = await self.start_run(actor_id, run_input)
+        delay = base_delay
+        try:
+            while run.get("status") not in TERMINAL_STATUSES:
+                await asyncio.sleep(random.uniform(delay / 2, delay))
+                run = await self.get_run(run["id"]) or run
+                delay = min(self.poll_max_delay, delay * 2)
+        except asyncio.CancelledError:
+            try:
+                await asyncio.shield(self.abort_run(run["id"]))
+                logging.info(f"🛑 Actor 실행 중단: {run['id']}")
+            except Exception as e:
+                logging.warning(f"Actor 실행 중단 실패 ({run['id']}): {e}")
+            raise
+        return run
+
+    async def aclose(self):
+        await self.http.aclose()
+
+
+class AsyncGeminiModel:
+    """Gemini generateContent 비동기 모델."""
+
+    def __init__(self, api_key, model_name, generation_config=None, system_instruction=None,
+                 api_url=None, timeout=120, max_connections=50):
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+        self.system_instruction = system_instruction
+        self.api_url = (api_url or DEFAULT_GEMINI_API_URL).rstrip("/")
+        self.http = _Http({"x-goog-api-key": api_key}, timeout, max_connections)
+
+    async def generate_content(self, prompt):
+        body = gemini_request_body(prompt, self.generation_config, self.system_instruction)
+        response = await _request(self.http, "POST", f"{self.api_url}/v1beta/models/{self.model_name}:generateContent",
+                                  max_attempts=3, json=body)
+        return GeminiResponse(response.json())
+
+    async def aclose(self):
+        await self.http.aclose()
@@ -0,0 +1,212 @@
+"""
+외부 서비스(Apify Actor 등)별 회로 차단기.
+
+최근 호출 결과를 창(window)으로 모아 두고, 실패율이나 느린 호출 비율이 기준을 넘으면 회로를 엽니다(open).
+열린 동안에는 호출을 바로 거절해 다른 경로(백업 Actor 등)로 넘어가게 하고,
+cooldown이 지나면 시험 호출 하나만 허용(half_open)해 성공하면 다시 닫습니다(closed).
+
+최근 성공 호출의 지연 시간 p95도 계산하므로 헤지 요청(백업을 언제 함께 보낼지)의 기준으로 쓸 수 있습니다.
+상태는 circuit_breaker_state{breaker} 게이지(0 닫힘, 1 시험 중, 2 열림)로 노출합니다.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from ytcore import metrics
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+state_gauge = metrics.gauge(
+    "circuit_breaker_state",
+    "회로 차단기 상태 (0: 닫힘, 1: 시험 호출 중, 2: 열림)",
+)
+transitions_total = metrics.counter(
+    "circuit_breaker_transitions_total",
+    "회로 차단기 상태 변경 횟수 (바뀐 상태별)",
+)
+rejected_total = metrics.counter(
+    "circuit_breaker_rejected_total",
+    "회로가 열려 있어 바로 거절한 호출 수",
+)
+call_duration = metrics.histogram(
+    "circuit_breaker_call_seconds",
+    "회로 차단기를 거친 호출의 소요 시간 (결과별)",
+)
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 호출하지 않았음을 알립니다."""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"'{name}' 회로가 열려 있습니다. ({retry_in:.0f}초 후 다시 시도)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    실패율/지연 기반 회로 차단기.
+
+    window: 판단에 쓰는 최근 호출 수
+    min_calls: 이만큼 호출이 쌓여야 회로를 열 수 있음
+    failure_rate: 실패 비율이 이 값 이상이면 열림
+    slow_seconds / slow_rate: slow_seconds보다 오래 걸린 호출 비율이 slow_rate 이상이면 열림 (None이면 검사 안 함)
+    cooldown: 열린 뒤 시험 호출을 허용하기까지 기다리는 시간(초)
+    """
+
+    def __init__(self, name, window=20, min_calls=5, failure_rate=0.5, slow_seconds=None, slow_rate=0.5,
+                 cooldown=60.0):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=window)  # (성공 여부, 소요 시간)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+        state_gauge.set(0, breaker=name)
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _set_state(self, state):
+        if state == self._state:
+            return
+        logging.warning(f"🔌 회로 차단기 '{self.name}': {self._state} → {state}")
+        self._state = state
+        state_gauge.set(_STATE_VALUES[state], breaker=self.name)
+        transitions_total.inc(breaker=self.name, state=state)
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._set_state(HALF_OPEN)
+
+    def allow(self):
+        """호출해도 되면 True. 시험 중(half_open)에는 한 번에 하나의 호출만 허용합니다."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            rejected_total.inc(breaker=self.name)
+            return False
+
+    def retry_in(self):
+        """회로가 열려 있으면 시험 호출까지 남은 시간(초), 아니면 0."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def record(self, success, duration):
+        """
+        호출 결과를 기록합니다. success가 None이면(취소 등) 판단에서 제외하고 시험 호출 자리만 돌려줍니다.
+        """
+        with self._lock:
+            trial = self._trial_running
+            self._trial_running = False
+            if success is None:
+                return
+            call_duration.observe(duration, breaker=self.name, result="success" if success else "failure")
+            slow = self.slow_seconds is not None and duration > self.slow_seconds
+
+            if trial:
+                # 시험 호출 결과로 바로 닫거나 다시 엶
+                if success and not slow:
+                    self._calls.clear()
+                    self._set_state(CLOSED)
+                else:
+                    self._open()
+                return
+
+            self._calls.append((success, duration))
+            if self._state == CLOSED and self._should_open():
+                self._open()
+
+    def _should_open(self):
+        count = len(self._calls)
+        if count < self.min_calls:
+            return False
+        failures = sum(1 for success, _ in self._calls if not success)
+        if failures / count >= self.failure_rate:
+            return True
+        if self.slow_seconds is None:
+            return False
+        slow = sum(1 for _, duration in self._calls if duration > self.slow_seconds)
+        return slow / count >= self.slow_rate
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._set_state(OPEN)
+
+    def call(self, func, *args, classify=None, **kwargs):
+        """
+        회로가 허용하면 func를 호출하고 결과를 기록합니다. 열려 있으면 CircuitOpenError.
+        classify(결과)가 있으면 True(성공)/False(실패)/None(기록 안 함)으로 결과를 판정하고,
+        없으면 예외 없이 끝난 호출을 성공으로 봅니다.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            self.record(False, time.monotonic() - started)
+            raise
+        self.record(classify(result) if classify else True, time.monotonic() - started)
+        return result
+
+    def latency_percentile(self, fraction=0.95, min_samples=5):
+        """최근 성공 호출 지연 시간의 백분위수(초). 표본이 부족하면 None."""
+        with self._lock:
+            durations = sorted(duration for success, duration in self._calls if success)
+        if len(durations) < min_samples:
+            return None
+        index = min(len(durations) - 1, int(fraction * len(durations)))
+        return durations[index]
+
+    def snapshot(self):
+        with self._lock:
+            self._maybe_half_open()
+            count = len(self._calls)
+            failures = sum(1 for success, _ in self._calls if not success)
+            return {
+                "state": self._state,
+                "calls": count,
+                "failure_rate": round(failures / count, 4) if count else 0.0,
+            }
+
+
+_registry_lock = threading.Lock()
+_registry = {}
+
+
+def get(name, **options):
+    """이름별로 하나의 회로 차단기를 만들어 재사용합니다. (옵션은 처음 만들 때만 적용)"""
+    with _registry_lock:
+        breaker = _registry.get(name)
+        if breaker is None:
+            breaker = _registry[name] = CircuitBreaker(name, **options)
+        return breaker
+
+
+def snapshot():
+    """등록된 모든 회로 차단기의 상태."""
+    with _registry_lock:
+        breakers = list(_registry.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,472 @@
+"""
+요약 결과 / 자막 캐시.
+
+같은 영상 링크가 단톡방에 반복해서 올라오는 경우가 많기 때문에,
+(video_id, language, model, prompt_version) 조합으로 요약 결과를 저장해 두고
+Apify + Gemini 호출 없이 바로 응답합니다. 그 아래 단계에서는 (video_id, language)
+기준으로 자막(및 "자막 없음" 결과)을 따로 저장합니다.
+
+저장소(backend)는 교체 가능하며 기본값은 로컬 SQLite 파일입니다.
+CACHE_URL 환경변수가 redis:// 로 시작하면 Redis 프로토콜(RESP) 백엔드를 사용합니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse, unquote
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "ytchoi_cache.sqlite3")
+
+
+class SQLiteBackend:
+    """SQLite 파일 기반 캐시 저장소 (기본값)."""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache (namespace, accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, namespace, key):
+        """값을 반환합니다. 없거나 만료되었으면 None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+            self._conn.commit()
+            return value
+
+    def set(self, namespace, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, value, now + ttl, now),
+            )
+            self._conn.commit()
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+            self._conn.commit()
+
+    def evict(self, namespace, max_entries):
+        """만료 항목과 LRU 초과분을 삭제하고 삭제된 개수를 반환합니다."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at < ?", (namespace, now)
+            )
+            removed = cur.rowcount
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+            overflow = count - max_entries
+            if overflow > 0:
+                cur = self._conn.execute(
+                    "DELETE FROM cache WHERE rowid IN ("
+                    "SELECT rowid FROM cache WHERE namespace = ? "
+                    "ORDER BY accessed_at ASC LIMIT ?)",
+                    (namespace, overflow),
+                )
+                removed += cur.rowcount
+            self._conn.commit()
+            return removed
+
+    def count(self, namespace):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+
+
+class RedisBackend:
+    """
+    Redis 프로토콜(RESP) 캐시 저장소.
+
+    redis 패키지 없이 소켓으로 직접 통신하므로 Redis 호환 서버라면 어디든 연결할 수 있습니다.
+    LRU 순서는 네임스페이스별 sorted set(접근 시각 점수)으로 관리합니다.
+    TTL이 지나 Redis가 지운 키도 이 목록에 남으므로, 만료 시각을 점수로 둔 sorted set을 함께 두고
+    개수를 세거나 내보내기 전에 만료된 키를 두 목록에서 먼저 지웁니다.
+    """
+
+    def __init__(self, url, prefix="ytchoi"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._sock = None
+        self._file = None
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=5)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _close(self):
+        try:
+            if self._sock:
+                self._sock.close()
+        finally:
+            self._sock = None
+            self._file = None
+
+    def _send(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis 연결이 끊어졌습니다.")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise RuntimeError(f"Redis 오류: {payload.decode('utf-8')}")
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RuntimeError(f"알 수 없는 Redis 응답: {line!r}")
+
+    def _command(self, *args):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _lru_key(self, namespace):
+        return f"{self.prefix}:{namespace}:__lru__"
+
+    def _expiry_key(self, namespace):
+        return f"{self.prefix}:{namespace}:__expiry__"
+
+    def _prune(self, namespace):
+        """TTL이 지나 사라진 키를 LRU 목록과 만료 목록에서 지웁니다."""
+        now = time.time()
+        expired = self._command("ZRANGEBYSCORE", self._expiry_key(namespace), "-inf", now)
+        if expired:
+            self._command("ZREM", self._lru_key(namespace), *expired)
+            self._command("ZREM", self._expiry_key(namespace), *expired)
+
+    def get(self, namespace, key):
+        value = self._command("GET", self._key(namespace, key))
+        if value is None:
+            self._command("ZREM", self._lru_key(namespace), key)
+            self._command("ZREM", self._expiry_key(namespace), key)
+            return None
+        self._command("ZADD", self._lru_key(namespace), time.time(), key)
+        return value
+
+    def set(self, namespace, key, value, ttl):
+        now = time.time()
+        self._command("SET", self._key(namespace, key), value, "PX", max(1, int(ttl * 1000)))
+        self._command("ZADD", self._lru_key(namespace), now, key)
+        self._command("ZADD", self._expiry_key(namespace), now + ttl, key)
+
+    def delete(self, namespace, key):
+        self._command("DEL", self._key(namespace, key))
+        self._command("ZREM", self._lru_key(namespace), key)
+        self._command("ZREM", self._expiry_key(namespace), key)
+
+    def evict(self, namespace, max_entries):
+        self._prune(namespace)
+        overflow = self._command("ZCARD", self._lru_key(namespace)) - max_entries
+        if overflow <= 0:
+            return 0
+        oldest = self._command("ZRANGE", self._lru_key(namespace), 0, overflow - 1)
+        for key in oldest:
+            self.delete(namespace, key)
+        return len(oldest)
+
+    def count(self, namespace):
+        self._prune(namespace)
+        return self._command("ZCARD", self._lru_key(namespace))
+
+
+def create_backend(url=None):
+    """CACHE_URL 환경변수(또는 인자)에 맞는 캐시 저장소를 생성합니다."""
+    url = url or os.environ.get("CACHE_URL", "")
+    if url.startswith(("redis://", "rediss://")):
+        logging.info(f"🗄️ Redis 캐시 사용: {urlparse(url).hostname}")
+        return RedisBackend(url)
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else (url or DEFAULT_SQLITE_PATH)
+    logging.info(f"🗄️ SQLite 캐시 사용: {path}")
+    return SQLiteBackend(path)
+
+
+class _NamespaceCache:
+    """네임스페이스 하나를 사용하는 캐시의 공통 부분 (직렬화, 통계, 오류 격리)."""
+
+    namespace = None
+
+    def __init__(self, backend, ttl, max_entries):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _count(self, field, amount=1):
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def _load(self, key):
+        """저장된 값을 역직렬화하여 반환합니다. 조회 실패는 미스로 취급합니다."""
+        try:
+            raw = self.backend.get(self.namespace, key)
+        except Exception as e:
+            logging.warning(f"캐시 조회 실패: {e}")
+            self._count("errors")
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def _store(self, key, value, ttl):
+        """값을 저장하고, 크기 한도를 넘으면 오래된 항목을 제거합니다."""
+        try:
+            self.backend.set(self.namespace, key, json.dumps(value, ensure_ascii=False), ttl)
+            evicted = self.backend.evict(self.namespace, self.max_entries)
+        except Exception as e:
+            logging.warning(f"캐시 저장 실패: {e}")
+            self._count("errors")
+            return
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _delete(self, key):
+        try:
+            self.backend.delete(self.namespace, key)
+        except Exception as e:
+            logging.warning(f"캐시 삭제 실패: {e}")
+            self._count("errors")
+
+    def _extra_stats(self):
+        return {}
+
+    def stats(self):
+        """적중/미스/제거 횟수와 현재 항목 수를 반환합니다."""
+        try:
+            size = self.backend.count(self.namespace)
+        except Exception:
+            size = None
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+            stats.update(self._extra_stats())
+            return stats
+
+
+class SummaryCache(_NamespaceCache):
+    """(video_id, language, model, prompt_version) 기준 요약 결과 캐시."""
+
+    namespace = "summary"
+
+    def __init__(self, backend, ttl=7 * 24 * 3600, max_entries=1000):
+        super().__init__(backend, ttl, max_entries)
+
+    @staticmethod
+    def make_key(video_id, language, model, prompt_version):
+        """조합을 해시하여 내용 주소 기반 키를 만듭니다."""
+        raw = "\x1f".join([video_id, language, model, prompt_version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, video_id, language, model, prompt_version):
+        """저장된 요약 결과(dict)를 반환합니다. 없으면 None."""
+        value = self._load(self.make_key(video_id, language, model, prompt_version))
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, video_id, language, model, prompt_version, value):
+        """요약 결과(dict)를 저장합니다."""
+        self._store(self.make_key(video_id, language, model, prompt_version), value, self.ttl)
+
+
+# TranscriptCache.get 이 "이 언어 자막은 없음"으로 기록된 항목에 대해 반환하는 값
+MISSING = "missing"
+
+
+class TranscriptCache(_NamespaceCache):
+    """
+    (video_id, language) 기준 자막 캐시.
+
+    요약 캐시 아래 단계에서 동작하므로 프롬프트나 모델이 바뀌어도 자막을 다시 긁어오지 않습니다.
+    "이 언어 자막 없음"도 더 짧은 TTL로 기록해 다음 요청에서 해당 언어를 바로 건너뜁니다.
+    """
+
+    namespace = "transcript"
+
+    def __init__(self, backend, ttl=30 * 24 * 3600, negative_ttl=6 * 3600, max_entries=2000):
+        super().__init__(backend, ttl, max_entries)
+        self.negative_ttl = negative_ttl
+        self.negative_hits = 0
+
+    @staticmethod
+    def make_key(video_id, language):
+        return f"{video_id}:{language}"
+
+    def get(self, video_id, language):
+        """자막 dict({transcript, video_title}), MISSING, 또는 None(기록 없음)을 반환합니다."""
+        value = self._load(self.make_key(video_id, language))
+        if value is None:
+            self._count("misses")
+            return None
+        if value.get("missing"):
+            self._count("hits")
+            self._count("negative_hits")
+            return MISSING
+        self._count("hits")
+        return value
+
+    def set(self, video_id, language, transcript, video_title):
+        self._store(
+            self.make_key(video_id, language),
+            {"transcript": transcript, "video_title": video_title},
+            self.ttl,
+        )
+
+    def set_missing(self, video_id, language):
+        """해당 언어 자막이 없다는 사실을 짧은 TTL로 기록합니다."""
+        self._store(self.make_key(video_id, language), {"missing": True}, self.negative_ttl)
+
+    def _extra_stats(self):
+        return {"negative_hits": self.negative_hits, "negative_ttl": self.negative_ttl}
+
+
+class PreflightCache(_NamespaceCache):
+    """
+    video_id 기준 영상 메타데이터(길이, 라이브 상태, 자막 언어 목록) 캐시.
+
+    라이브/예정 영상은 상태가 곧 바뀌므로 호출하는 쪽에서 더 짧은 TTL을 넘깁니다.
+    """
+
+    namespace = "preflight"
+
+    def __init__(self, backend, ttl=6 * 3600, max_entries=2000):
+        super().__init__(backend, ttl, max_entries)
+
+    def get(self, video_id):
+        """저장된 메타데이터 dict를 반환합니다. 없으면 None."""
+        value = self._load(video_id)
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, video_id, value, ttl=None):
+        self._store(video_id, value, ttl or self.ttl)
+
+
+class RunIndex(_NamespaceCache):
+    """
+    (Actor, video_id, 언어) 기준 최근 Apify 실행 색인.
+
+    같은 입력의 실행이 얼마 전에 끝났거나 아직 돌고 있으면, 새로 시작하지 않고 그 실행(데이터셋)을 다시 씁니다.
+    여러 영상을 한 번에 실행했으면 영상마다 같은 실행을 가리키는 항목이 생기므로, 나중에 그중 한 영상만 요청해도 다시 쓸 수 있습니다.
+    값은 {run_id, dataset_id, status, videos(그 실행의 영상 ID 목록)} 이며, 실패한 실행은 지워서 다음 요청이 새로 시작하게 합니다.
+    (apify_runs.set_run_index로 설정)
+    """
+
+    namespace = "apify_run"
+
+    def __init__(self, backend, ttl=24 * 3600, max_entries=5000):
+        super().__init__(backend, ttl, max_entries)
+
+    @staticmethod
+    def make_key(actor_id, video_id, language, fingerprint=""):
+        return "|".join([actor_id, video_id, language or "-", fingerprint])
+
+    def get(self, key):
+        """기록된 실행 dict를 반환합니다. 없으면 None."""
+        value = self._load(key)
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, run, video_ids):
+        self._store(
+            key,
+            {"run_id": run["id"], "dataset_id": run.get("defaultDatasetId"), "status": run.get("status"),
+             "videos": list(video_ids)},
+            self.ttl,
+        )
+
+    def delete(self, key):
+        self._delete(key)
@@ -0,0 +1,106 @@
+"""
+긴 자막을 나눠서 요약하기 위한 도구 (map-reduce).
+
+1. split: 자막을 문장 경계로 자르고, 토큰 예산 안에 들어가도록 문장을 묶어 청크를 만듭니다.
+2. map: 청크별 부분 요약을 제한된 동시성으로 병렬 생성합니다.
+3. reduce: 부분 요약들을 모아 최종 보고서를 한 번 더 생성합니다.
+
+토큰 수는 API 호출 없이 대략 추정합니다. (영문 약 4자당 1토큰, 한글 등은 1자당 약 1토큰)
+"""
+
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 문장 끝(마침표/물음표/느낌표 + 공백) 또는 줄바꿈에서 자름
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def estimate_tokens(text):
+    """텍스트의 토큰 수를 대략 추정합니다."""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def split_sentences(text):
+    """문장 경계로 잘라 빈 문장을 제외한 목록을 반환합니다."""
+    return [sentence.strip() for sentence in _SENTENCE_END_RE.split(text or "") if sentence.strip()]
+
+
+def _split_long_sentence(sentence, max_tokens):
+    """문장부호 없이 길게 이어진 자막은 단어 단위로 잘라 예산에 맞춥니다."""
+    pieces, current, current_tokens = [], [], 0
+    words = []
+    for word in _WHITESPACE_RE.split(sentence):
+        # 공백도 없는 아주 긴 덩어리는 글자 수로 자름 (글자당 최대 1토큰)
+        words.extend(word[i:i + max_tokens] for i in range(0, len(word), max_tokens))
+    for word in words:
+        word_tokens = estimate_tokens(word)
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_text(text, max_tokens):
+    """
+    문장을 순서대로 묶어 청크 하나가 max_tokens를 넘지 않도록 나눕니다.
+    문장 하나가 예산보다 크면 단어 단위로 더 잘게 자릅니다.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for sentence in split_sentences(text):
+        sentence_tokens = estimate_tokens(sentence)
+        pieces = [sentence] if sentence_tokens <= max_tokens else _split_long_sentence(sentence, max_tokens)
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def map_reduce(text, map_fn, reduce_fn, max_tokens=4000, max_workers=4):
+    """
+    긴 텍스트를 청크로 나눠 map_fn(청크, 번호, 전체 수)으로 병렬 요약한 뒤
+    reduce_fn(부분 요약 목록)으로 최종 결과를 만듭니다.
+
+    (결과, 메타 정보 dict)를 반환합니다. 메타 정보에는 청크 수와 단계별 소요 시간(초)이 들어갑니다.
+    부분 요약이 하나도 만들어지지 않으면 결과는 None입니다.
+    """
+    timings = {}
+
+    started = time.monotonic()
+    chunks = chunk_text(text, max_tokens)
+    timings["split"] = round(time.monotonic() - started, 3)
+    logging.info(f"✂️ 자막을 {len(chunks)}개 청크로 나눔 (청크당 최대 약 {max_tokens}토큰)")
+
+    started = time.monotonic()
+    total = len(chunks)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        partials = list(executor.map(lambda args: map_fn(args[1], args[0] + 1, total), enumerate(chunks)))
+    timings["map"] = round(time.monotonic() - started, 3)
+
+    failed = sum(1 for partial in partials if not partial)
+    partials = [partial for partial in partials if partial]
+    meta = {"chunks": total, "failed_chunks": failed, "timings": timings}
+    if failed:
+        logging.warning(f"⚠️ 부분 요약 {failed}/{total}개 실패")
+    if not partials:
+        return None, meta
+
+    started = time.monotonic()
+    result = reduce_fn(partials)
+    timings["reduce"] = round(time.monotonic() - started, 3)
+    return result, meta
@@ -0,0 +1,159 @@
+"""
+프로세스 전체에서 공유하는 외부 API 클라이언트 모음.
+
+요청마다 ApifyClient / GenerativeModel 을 새로 만들면 HTTP 연결 풀과 설정을 매번 다시 준비하게 됩니다.
+여기서 한 번 만든 객체를 키(토큰, 모델 설정)별로 보관해 두고 모든 요청이 재사용하므로
+keep-alive 연결이 유지되고 요청당 준비 비용이 사라집니다.
+
+CLIENT_BACKEND 환경변수로 구현을 고릅니다.
+- rest (기본값): ytcore.rest_clients 의 가벼운 REST 클라이언트 (requests 만 사용, SDK import 없음)
+- sdk: apify_client / google.generativeai SDK (처음 필요할 때 가져옴)
+
+APIFY_API_BASE_URL, GEMINI_API_BASE_URL 로 API 주소를 바꿀 수 있습니다. (벤치마크용 가짜 서버 등)
+warm_up()을 모듈 로드 시점에 호출하면 서버리스 컨테이너당 한 번만 준비합니다.
+"""
+
+import logging
+import os
+import threading
+
+_lock = threading.Lock()
+_apify_clients = {}
+_gemini_models = {}
+_gemini_key = None
+
+
+def backend():
+    """사용할 클라이언트 구현 이름 (.env 를 나중에 읽는 경우를 위해 호출할 때마다 확인)."""
+    return os.environ.get("CLIENT_BACKEND", "rest")
+
+
+def get_apify_client(token):
+    """토큰별로 하나의 Apify 클라이언트를 만들어 재사용합니다. (내부 HTTP 연결 풀 공유)"""
+    key = (backend(), token)
+    client = _apify_clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _apify_clients.get(key)
+        if client is None:
+            client = _apify_clients[key] = _create_apify_client(token)
+        return client
+
+
+def _create_apify_client(token):
+    api_url = os.environ.get("APIFY_API_BASE_URL")
+    if backend() == "sdk":
+        from apify_client import ApifyClient
+        return ApifyClient(token, api_url=api_url) if api_url else ApifyClient(token)
+    from ytcore.rest_clients import ApifyRestClient
+    return ApifyRestClient(token, api_url=api_url)
+
+
+def configure_gemini(api_key):
+    """sdk 백엔드에서 API 키가 바뀐 경우에만 genai.configure를 호출합니다. (rest 백엔드는 할 일 없음)"""
+    global _gemini_key
+    if backend() != "sdk":
+        return None
+    import google.generativeai as genai
+    if _gemini_key == api_key:
+        return genai
+    with _lock:
+        if _gemini_key != api_key:
+            genai.configure(api_key=api_key)
+            _gemini_key = api_key
+    return genai
+
+
+def get_gemini_model(api_key, model_name, max_output_tokens=2048, temperature=0.7, **model_kwargs):
+    """
+    (모델, 생성 설정)별로 하나의 Gemini 모델 객체를 만들어 재사용합니다.
+    model_kwargs로 system_instruction(고정 지시문)이나 cached_content(지시문을 담은 캐시 이름)를 넘길 수 있습니다.
+    """
+    genai = configure_gemini(api_key)
+    key = (backend(), api_key, model_name, max_output_tokens, temperature, tuple(sorted(model_kwargs.items())))
+    model = _gemini_models.get(key)
+    if model is not None:
+        return model
+    with _lock:
+        model = _gemini_models.get(key)
+        if model is None:
+            # None인 설정은 모델 기본값을 사용
+            generation_config = {
+                name: value
+                for name, value in (("max_output_tokens", max_output_tokens), ("temperature", temperature))
+                if value is not None
+            }
+            if genai is not None and model_kwargs.get("cached_content"):
+                # 캐시를 만든 모델과 지시문을 그대로 사용
+                model = genai.GenerativeModel.from_cached_content(
+                    model_kwargs["cached_content"],
+                    generation_config=genai.types.GenerationConfig(**generation_config),
+                )
+            elif genai is not None:
+                model = genai.GenerativeModel(
+                    model_name=model_name,
+                    generation_config=genai.types.GenerationConfig(**generation_config),
+                    **model_kwargs
+                )
+            else:
+                from ytcore.rest_clients import GeminiRestModel
+                model = GeminiRestModel(
+                    api_key,
+                    model_name,
+                    generation_config=generation_config,
+                    api_url=os.environ.get("GEMINI_API_BASE_URL"),
+                    **model_kwargs
+                )
+            _gemini_models[key] = model
+        return model
+
+
+def forget_gemini_models(cached_content):
+    """더 이상 쓰지 않는 캐시(cached_content)를 참조하던 모델 객체를 버립니다."""
+    with _lock:
+        for key in [key for key in _gemini_models if ("cached_content", cached_content) in key[-1]]:
+            del _gemini_models[key]
+
+
+def create_cached_content(api_key, model_name, system_instruction, ttl):
+    """고정 지시문을 담은 Gemini 캐시(cachedContents)를 ttl초 동안 만들고 캐시 이름을 반환합니다."""
+    genai = configure_gemini(api_key)
+    if genai is not None:
+        import datetime
+        cached = genai.caching.CachedContent.create(
+            model=model_name,
+            system_instruction=system_instruction,
+            ttl=datetime.timedelta(seconds=ttl),
+        )
+        return cached.name
+    from ytcore.rest_clients import create_cached_content as create_rest_cached_content
+    return create_rest_cached_content(
+        api_key, model_name, system_instruction, ttl, api_url=os.environ.get("GEMINI_API_BASE_URL"),
+    )["name"]
+
+
+def warm_up(apify_token=None, gemini_key=None, gemini_models=()):
+    """
+    클라이언트를 미리 만들어 둡니다. 키가 없거나 준비에 실패해도 요청 처리 중에 다시 시도하므로 무시합니다.
+    gemini_models는 get_gemini_model에 넘길 (모델 이름, 최대 출력 토큰 수[, temperature][, 모델 인자 dict]) 목록입니다.
+    """
+    try:
+        if apify_token:
+            get_apify_client(apify_token)
+        if gemini_key:
+            for spec in gemini_models:
+                if spec and isinstance(spec[-1], dict):
+                    get_gemini_model(gemini_key, *spec[:-1], **spec[-1])
+                else:
+                    get_gemini_model(gemini_key, *spec)
+    except Exception as e:
+        logging.warning(f"클라이언트 준비 실패 (요청 시 다시 시도): {e}")
+
+
+def stats():
+    return {
+        "backend": backend(),
+        "apify_clients": len(_apify_clients),
+        "gemini_models": len(_gemini_models),
+    }
@@ -0,0 +1,153 @@
+"""
+비동기 작업(job) 관리.
+
+요청을 받으면 작업 ID만 바로 돌려주고 실제 처리는 백그라운드 워커에서 진행합니다.
+작업 상태는 캐시 저장소(backend)에 저장하므로, Redis 백엔드를 쓰면 여러 인스턴스에서
+같은 작업을 조회할 수 있습니다.
+
+상태 흐름: queued → running → done | failed
+
+백그라운드 워커는 요청을 받은 프로세스 안의 스레드이므로, 응답 뒤에도 프로세스가 계속 도는 서버에서만 씁니다.
+(응답을 보낸 뒤 인스턴스를 멈추거나 회수하는 서버리스 환경에서는 작업이 끝나지 않을 수 있음)
+콜백 URL은 허용한 호스트(callback_hosts)로만 보내며, 그 밖의 URL은 작업을 등록할 때 거절합니다. (SSRF 방지)
+"""
+
+import json
+import logging
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+class CallbackNotAllowed(ValueError):
+    """허용 목록에 없는 콜백 URL로 작업을 등록하려 할 때 발생합니다."""
+
+
+def parse_callback_hosts(value):
+    """쉼표로 구분한 호스트 목록(JOB_CALLBACK_HOSTS)을 소문자 집합으로 바꿉니다."""
+    return frozenset(host.strip().lower() for host in (value or "").split(",") if host.strip())
+
+
+def callback_allowed(callback_url, hosts):
+    """콜백 URL이 http(s)이고 호스트가 허용 목록에 있으면 True"""
+    parsed = urlparse(callback_url or "")
+    return parsed.scheme in ("http", "https") and (parsed.hostname or "").lower() in hosts
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """콜백이 리디렉션으로 허용하지 않은 주소에 닿지 않도록 리디렉션을 따라가지 않음"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+class JobStore:
+    """작업 상태 저장소."""
+
+    namespace = "job"
+
+    def __init__(self, backend, ttl=24 * 3600, max_entries=5000):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def create(self, request):
+        """새 작업을 queued 상태로 만들고 작업 ID를 반환합니다."""
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "request": request,
+            "created_at": time.time(),
+        }
+        self._save(job)
+        self.backend.evict(self.namespace, self.max_entries)
+        return job_id
+
+    def get(self, job_id):
+        """작업 정보(dict)를 반환합니다. 없으면 None."""
+        raw = self.backend.get(self.namespace, job_id)
+        return json.loads(raw) if raw else None
+
+    def update(self, job_id, **fields):
+        """작업 정보 일부를 갱신하고 갱신된 작업을 반환합니다."""
+        with self._lock:
+            job = self.get(job_id) or {"job_id": job_id}
+            job.update(fields)
+            self._save(job)
+            return job
+
+    def _save(self, job):
+        self.backend.set(self.namespace, job["job_id"], json.dumps(job, ensure_ascii=False), self.ttl)
+
+
+class JobRunner:
+    """작업을 백그라운드 스레드에서 실행하고 결과를 저장소에 기록합니다."""
+
+    def __init__(self, store, max_workers=2, callback_hosts=frozenset()):
+        self.store = store
+        self.callback_hosts = frozenset(callback_hosts)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+    def submit(self, func, request, callback_url=None):
+        """
+        func()를 백그라운드에서 실행하도록 등록하고 작업 ID를 반환합니다.
+
+        func는 (HTTP 상태 코드, 응답 dict)를 반환해야 합니다.
+        callback_url이 있으면 작업이 끝난 뒤 작업 정보를 JSON으로 POST 합니다.
+        콜백 호스트가 허용 목록(callback_hosts)에 없으면 등록하지 않고 CallbackNotAllowed를 발생시킵니다.
+        """
+        if callback_url and not callback_allowed(callback_url, self.callback_hosts):
+            raise CallbackNotAllowed(f"허용되지 않은 콜백 URL입니다: {callback_url}")
+        job_id = self.store.create(request)
+        self._executor.submit(self._run, job_id, func, callback_url)
+        return job_id
+
+    def _run(self, job_id, func, callback_url):
+        self.store.update(job_id, status="running", started_at=time.time())
+        try:
+            http_status, result = func()
+            job = self.store.update(
+                job_id,
+                status="done",
+                http_status=http_status,
+                result=result,
+                finished_at=time.time(),
+            )
+            logging.info(f"✅ 작업 완료: {job_id}")
+        except Exception as e:
+            logging.error(f"작업 처리 중 오류 발생 ({job_id}): {e}", exc_info=True)
+            job = self.store.update(
+                job_id,
+                status="failed",
+                http_status=500,
+                result={"error": "An internal error occurred"},
+                finished_at=time.time(),
+            )
+        if callback_url:
+            notify_callback(callback_url, job, self.callback_hosts)
+
+
+def notify_callback(callback_url, job, hosts, timeout=10):
+    """작업 결과를 콜백 URL로 전송합니다. 실패해도 작업 결과에는 영향이 없습니다."""
+    if not callback_allowed(callback_url, hosts):
+        logging.warning(f"허용되지 않은 콜백 URL: {callback_url}")
+        return
+    try:
+        request = urllib.request.Request(
+            callback_url,
+            data=json.dumps(job).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with _callback_opener.open(request, timeout=timeout) as response:
+            logging.info(f"📨 콜백 전송 완료 ({response.status}): {job['job_id']}")
+    except Exception as e:
+        logging.warning(f"콜백 전송 실패 ({job['job_id']}): {e}")
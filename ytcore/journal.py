@@ -0,0 +1,308 @@
+"""
+처리 중인 작업 기록(journal): 서버가 재시작되어도 진행 중이던 요약을 이어서 끝냅니다.
+
+요청 하나를 처리하는 동안 단계(stage), 시작한 Apify 실행 ID, 중간 결과(자막, 언어, 제목)를
+SQLite(WAL) 파일에 기록합니다. 프로세스가 처리 도중 죽으면 Apify 실행은 계속 돌아가고 비용도 나가므로,
+다음에 시작한 프로세스가 기록을 보고 실행에 다시 붙어(데이터셋 읽기) 요약까지 마칩니다.
+이어서 끝낸 결과는 같은 영상을 다시 요청할 때 바로 돌려줍니다.
+
+- track(): 작업을 기록하고 현재 작업으로 설정 (contextvar, 스레드 풀에는 tracing.propagate로 전달)
+- note_run() / checkpoint(): 현재 작업에 Apify 실행과 중간 결과를 기록 (현재 작업이 없으면 아무것도 안 함)
+- watch(): 프로세스 생존 신호(heartbeat)를 남기고, 주인 프로세스가 죽은 작업을 가져와 넘김
+
+여러 프로세스(prefork 워커, 재시작 중인 이전/새 워커)가 같은 파일을 함께 쓰므로,
+작업은 주인 프로세스의 생존 신호가 lease초 동안 없을 때만 다른 프로세스가 가져갑니다.
+
+상태 흐름: preflight → transcript → summarize → done | failed
+"""
+
+import contextvars
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from ytcore import metrics
+
+DEFAULT_JOURNAL_PATH = os.path.join(tempfile.gettempdir(), "ytchoi_journal.sqlite3")
+
+# 끝나지 않은 단계
+PENDING_STAGES = ("preflight", "transcript", "summarize")
+
+recovered_total = metrics.counter(
+    "journal_recovered_total",
+    "재시작 후 이어서 처리한 작업 수 (outcome: claimed 가져옴, gave_up 시도 횟수 초과)",
+)
+
+_current = contextvars.ContextVar("journal_job", default=None)
+
+
+class JobJournal:
+    """SQLite 파일 기반 작업 기록."""
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, lease=30, max_attempts=3, retention=24 * 3600):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                room TEXT,
+                stage TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                recovered INTEGER NOT NULL DEFAULT 0,
+                delivered INTEGER NOT NULL DEFAULT 0,
+                runs TEXT NOT NULL DEFAULT '[]',
+                outputs TEXT NOT NULL DEFAULT '{}',
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_stage ON jobs (stage, owner)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_video ON jobs (video_id, stage)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self.heartbeat()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _update(self, job_id, build):
+        """
+        JSON 열(runs/outputs)을 읽고 고쳐 쓰는 갱신. 다른 프로세스와 겹치지 않도록 한 트랜잭션에서 합니다.
+        build(runs, outputs)는 (SQL, 매개변수)를 반환합니다.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT runs, outputs FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                if row is not None:
+                    self._conn.execute(*build(json.loads(row[0]), json.loads(row[1])))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def start(self, video_id, url, room=None):
+        """새 작업을 기록하고 작업 ID를 반환합니다."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (job_id, video_id, url, room, stage, owner, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'preflight', ?, ?, ?)",
+            (job_id, video_id, url, room, self.owner, now, now),
+        )
+        return job_id
+
+    def get(self, job_id):
+        """작업 정보(dict)를 반환합니다. 없으면 None."""
+        row = self._execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def checkpoint(self, job_id, stage, **outputs):
+        """단계를 갱신하고 중간 결과를 덧붙입니다."""
+        def build(runs, saved):
+            saved.update(outputs)
+            return ("UPDATE jobs SET stage = ?, outputs = ?, updated_at = ? WHERE job_id = ?",
+                    (stage, json.dumps(saved, ensure_ascii=False), time.time(), job_id))
+
+        self._update(job_id, build)
+
+    def add_run(self, job_id, actor_id, run_id, dataset_id=None, language=None, videos=None):
+        """작업에서 시작한 Apify 실행을 기록합니다. videos는 그 실행의 영상 ID 목록 (여러 영상을 한 번에 돌린 실행일 때)"""
+        run = {"actor_id": actor_id, "run_id": run_id, "dataset_id": dataset_id, "language": language}
+        if videos:
+            run["videos"] = list(videos)
+
+        def build(runs, saved):
+            return ("UPDATE jobs SET stage = 'transcript', runs = ?, updated_at = ? WHERE job_id = ?",
+                    (json.dumps(runs + [run], ensure_ascii=False), time.time(), job_id))
+
+        self._update(job_id, build)
+
+    def finish(self, job_id, status, payload, delivered=False):
+        """작업을 끝내고 (HTTP 상태 코드, 응답 dict) 결과를 기록합니다. delivered: 이미 사용자에게 전달한 결과"""
+        stage = "done" if status == 200 else "failed"
+        self._execute(
+            "UPDATE jobs SET stage = ?, result = ?, outputs = '{}', delivered = ?, updated_at = ? WHERE job_id = ?",
+            (stage, json.dumps([status, payload], ensure_ascii=False), int(delivered), time.time(), job_id),
+        )
+
+    def fail(self, job_id, error):
+        self.finish(job_id, 500, {"error": error})
+
+    def take_recovered(self, video_id):
+        """
+        이어서 끝냈지만 아직 아무도 받아 가지 않은 이 영상의 결과 (HTTP 상태 코드, 응답 dict).
+        한 번만 돌려주며, 없으면 None.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id, result FROM jobs WHERE video_id = ? AND recovered = 1 AND delivered = 0 "
+                    "AND stage = 'done' ORDER BY updated_at DESC LIMIT 1",
+                    (video_id,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE jobs SET delivered = 1 WHERE job_id = ?", (row[0],))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        status, payload = json.loads(row[1])
+        return status, payload
+
+    def heartbeat(self):
+        """이 프로세스가 살아 있음을 기록합니다."""
+        self._execute(
+            "INSERT OR REPLACE INTO owners (owner, seen_at) VALUES (?, ?)", (self.owner, time.time())
+        )
+
+    def claim_orphans(self):
+        """
+        주인 프로세스가 lease초 넘게 생존 신호를 남기지 않은 미완료 작업을 이 프로세스로 가져와 반환합니다.
+        max_attempts번 넘게 이어받은 작업은 실패로 끝냅니다. (매번 프로세스를 죽게 하는 작업이 반복되지 않도록)
+        """
+        now = time.time()
+        claimed = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT job_id, attempts FROM jobs WHERE stage IN ({','.join('?' * len(PENDING_STAGES))}) "
+                    "AND owner != ? AND owner NOT IN (SELECT owner FROM owners WHERE seen_at >= ?)",
+                    (*PENDING_STAGES, self.owner, now - self.lease),
+                ).fetchall()
+                for job_id, attempts in rows:
+                    if attempts >= self.max_attempts:
+                        self._conn.execute(
+                            "UPDATE jobs SET stage = 'failed', result = ?, updated_at = ? WHERE job_id = ?",
+                            (json.dumps([500, {"error": "재시작 후 이어서 처리하지 못했습니다."}], ensure_ascii=False), now, job_id),
+                        )
+                        recovered_total.inc(outcome="gave_up")
+                        continue
+                    self._conn.execute(
+                        "UPDATE jobs SET owner = ?, attempts = attempts + 1, recovered = 1, updated_at = ? WHERE job_id = ?",
+                        (self.owner, now, job_id),
+                    )
+                    claimed.append(job_id)
+                    recovered_total.inc(outcome="claimed")
+                # 오래된 기록과 사라진 프로세스 정리
+                self._conn.execute(
+                    f"DELETE FROM jobs WHERE stage NOT IN ({','.join('?' * len(PENDING_STAGES))}) AND updated_at < ?",
+                    (*PENDING_STAGES, now - self.retention),
+                )
+                self._conn.execute("DELETE FROM owners WHERE seen_at < ?", (now - self.retention,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [self.get(job_id) for job_id in claimed]
+
+    def watch(self, on_orphan, interval=None):
+        """
+        백그라운드 스레드에서 interval초(기본 lease/3)마다 생존 신호를 남기고,
+        주인을 잃은 작업을 가져와 on_orphan(job)으로 넘깁니다. (on_orphan은 오래 걸리지 않아야 함)
+        """
+        interval = interval or self.lease / 3
+
+        def loop():
+            while True:
+                try:
+                    self.heartbeat()
+                    for job in self.claim_orphans():
+                        on_orphan(job)
+                except Exception as e:
+                    logging.warning(f"작업 기록 확인 실패: {e}")
+                if self._stop.wait(interval):
+                    return
+
+        threading.Thread(target=loop, name="journal", daemon=True).start()
+
+    def close(self):
+        self._stop.set()
+
+    @contextmanager
+    def track(self, video_id, url, room=None, job_id=None):
+        """
+        작업을 기록하고(job_id가 있으면 이어받은 작업을 다시 사용) 현재 작업으로 설정합니다.
+        감싼 구간에서 예외가 나면 실패로 기록합니다. 프로세스가 죽으면 기록이 남아 다른 프로세스가 이어받습니다.
+        """
+        if job_id is None:
+            job_id = self.start(video_id, url, room)
+        token = _current.set((self, job_id))
+        try:
+            yield job_id
+        except Exception as e:
+            self.fail(job_id, f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current.reset(token)
+
+    @staticmethod
+    def _to_dict(row):
+        keys = ("job_id", "video_id", "url", "room", "stage", "owner", "attempts", "recovered",
+                "delivered", "runs", "outputs", "result", "created_at", "updated_at")
+        job = dict(zip(keys, row))
+        job["runs"] = json.loads(job["runs"])
+        job["outputs"] = json.loads(job["outputs"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+def current_job_id():
+    """현재 작업 ID (작업 밖이면 None)"""
+    current = _current.get()
+    return current[1] if current else None
+
+
+def note_run(actor_id, run, run_input=None, videos=None):
+    """
+    현재 작업에 막 시작한(또는 다시 쓰는) Apify 실행을 기록합니다. (apify_runs.run_actor에서 호출)
+    videos: 그 실행의 영상 ID 목록 (다시 붙을 때 공유 데이터셋에서 이 작업의 영상 항목을 고르는 데 사용)
+    """
+    current = _current.get()
+    if current is None or not run:
+        return
+    journal, job_id = current
+    try:
+        journal.add_run(job_id, actor_id, run.get("id"), run.get("defaultDatasetId"),
+                        (run_input or {}).get("language"), videos)
+    except sqlite3.Error as e:
+        logging.warning(f"Apify 실행 기록 실패: {e}")
+
+
+def checkpoint(stage, **outputs):
+    """현재 작업의 단계와 중간 결과를 기록합니다."""
+    current = _current.get()
+    if current is None:
+        return
+    journal, job_id = current
+    try:
+        journal.checkpoint(job_id, stage, **outputs)
+    except sqlite3.Error as e:
+        logging.warning(f"작업 단계 기록 실패: {e}")
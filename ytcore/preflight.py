@@ -0,0 +1,315 @@
+"""
+Apify를 실행하기 전에 영상 메타데이터를 가볍게 확인하는 사전 점검.
+
+자막 추출 Actor는 한 번 실행할 때마다 수십 초와 비용이 들지만, 다음 영상은 어떤 언어로 시도해도 실패합니다.
+- 지금 진행 중이거나 예정된 라이브 (자막이 아직 없음)
+- 멤버십 전용/비공개/삭제된 영상 (재생 불가)
+- 아주 긴 영상 (Actor 시간 초과)
+- 자막 트랙이 하나도 없는 영상
+
+YouTube 시청 페이지의 ytInitialPlayerResponse(재생 가능 여부, 길이, 라이브 상태, captionTracks)를 한 번 읽어
+이런 영상은 1초 안에 거절하고, 나머지 영상은 실제로 있는 자막 언어만 Actor로 시도하게 합니다.
+시청 페이지를 읽지 못하면 oEmbed로 존재 여부와 제목만 확인합니다.
+
+판단할 수 없는 경우(네트워크 오류, 봇 확인 페이지 등)에는 항상 기존처럼 모든 언어를 시도합니다. (fail open)
+결과는 영상 ID별로 캐시하며, 라이브/예정 영상은 상태가 곧 바뀌므로 짧게 저장합니다.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from ytcore import metrics, tracing
+from ytcore.youtube_url import watch_url
+
+DEFAULT_YOUTUBE_URL = "https://www.youtube.com"
+
+# Actor 언어 이름 → YouTube 자막 트랙 언어 코드 (en-US, en-GB 처럼 지역이 붙은 코드도 같은 언어로 봄)
+LANGUAGE_CODES = {"Korean": "ko", "English": "en", "Japanese": "ja"}
+
+# 거절 사유
+LIVE = "live"
+UPCOMING = "upcoming"
+UNPLAYABLE = "unplayable"
+TOO_LONG = "too_long"
+NO_CAPTIONS = "no_captions"
+
+REJECT_MESSAGES = {
+    LIVE: "라이브 방송이 진행 중인 영상은 방송이 끝난 뒤에 요약할 수 있어요.",
+    UPCOMING: "아직 시작하지 않은 예정된 방송이에요.",
+    UNPLAYABLE: "비공개, 멤버십 전용 또는 삭제된 영상이라 자막을 가져올 수 없어요.",
+    TOO_LONG: "영상이 너무 길어서 요약할 수 없어요.",
+    NO_CAPTIONS: "이 영상은 자막이 없어서 요약할 수 없어요.",
+}
+
+# 시청 페이지 JSON 앞에 붙는 변수 이름
+_PLAYER_RESPONSE_MARKER = "ytInitialPlayerResponse"
+# 확실히 재생할 수 없는 상태 (LOGIN_REQUIRED는 봇 확인일 수도 있어 oEmbed로 한 번 더 확인)
+_UNPLAYABLE_STATUSES = ("ERROR", "UNPLAYABLE")
+
+preflight_total = metrics.counter(
+    "preflight_total",
+    "영상 사전 점검 결과 수 (ok: 통과, rejected: 거절, unknown: 판단 불가로 통과)",
+)
+
+
+def youtube_session():
+    """YouTube 페이지 요청용 세션 (브라우저 User-Agent, 쿠키 동의 페이지 건너뜀)"""
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    # 유럽 지역의 쿠키 동의 페이지를 건너뜀
+    session.cookies.set("CONSENT", "YES+", domain=".youtube.com")
+    return session
+
+
+class VideoInfo:
+    """사전 점검으로 알아낸 영상 정보. 모르는 값은 None."""
+
+    def __init__(self, video_id, title=None, duration=None, live_status=None, playable=None,
+                 caption_languages=None, source=None):
+        self.video_id = video_id
+        self.title = title
+        self.duration = duration              # 초
+        self.live_status = live_status        # "none" / "live" / "upcoming"
+        self.playable = playable
+        self.caption_languages = caption_languages  # 자막 트랙 언어 코드 목록 (None이면 모름)
+        self.source = source                  # "watch" / "oembed" / None(확인 실패)
+
+    def to_dict(self):
+        return {
+            "video_id": self.video_id,
+            "title": self.title,
+            "duration": self.duration,
+            "live_status": self.live_status,
+            "playable": self.playable,
+            "caption_languages": self.caption_languages,
+            "source": self.source,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class Verdict:
+    """점검 결과: 거절 사유(없으면 통과)와 시도할 자막 언어 목록."""
+
+    def __init__(self, info, reason=None, languages=None):
+        self.info = info
+        self.reason = reason
+        self.languages = languages or []
+
+    @property
+    def rejected(self):
+        return self.reason is not None
+
+    @property
+    def message(self):
+        return REJECT_MESSAGES.get(self.reason)
+
+
+def parse_player_response(html):
+    """시청 페이지 HTML에서 ytInitialPlayerResponse JSON을 꺼냅니다. 없으면 None."""
+    index = html.find(_PLAYER_RESPONSE_MARKER)
+    while index != -1:
+        start = html.find("{", index)
+        # "ytInitialPlayerResponse = {" 형태만 인정 (스크립트 안의 다른 언급은 건너뜀)
+        if start != -1 and html[index + len(_PLAYER_RESPONSE_MARKER):start].strip() == "=":
+            try:
+                data, _ = json.JSONDecoder().raw_decode(html, start)
+                return data
+            except ValueError:
+                return None
+        index = html.find(_PLAYER_RESPONSE_MARKER, index + 1)
+    return None
+
+
+def info_from_player_response(video_id, player):
+    """playerResponse dict에서 VideoInfo를 만듭니다."""
+    details = player.get("videoDetails") or {}
+    playability = player.get("playabilityStatus") or {}
+    status = playability.get("status")
+    microformat = (player.get("microformat") or {}).get("playerMicroformatRenderer") or {}
+    broadcast = microformat.get("liveBroadcastDetails") or {}
+
+    if details.get("isLive") or broadcast.get("isLiveNow"):
+        live_status = "live"
+    elif details.get("isUpcoming") or status == "LIVE_STREAM_OFFLINE":
+        live_status = "upcoming"
+    else:
+        live_status = "none"
+
+    try:
+        duration = int(details.get("lengthSeconds") or microformat.get("lengthSeconds") or 0) or None
+    except ValueError:
+        duration = None
+
+    tracks = ((player.get("captions") or {}).get("playerCaptionsTracklistRenderer") or {}).get("captionTracks")
+    caption_languages = None
+    if status == "OK":
+        # 재생 가능한 영상에서 captions가 없으면 자막 트랙이 없는 것
+        caption_languages = sorted({track.get("languageCode", "") for track in tracks or [] if track.get("languageCode")})
+
+    if status == "OK" or live_status != "none":
+        playable = True
+    elif status in _UNPLAYABLE_STATUSES:
+        playable = False
+    else:
+        playable = None
+
+    return VideoInfo(
+        video_id,
+        title=details.get("title"),
+        duration=duration,
+        live_status=live_status,
+        playable=playable,
+        caption_languages=caption_languages,
+        source="watch",
+    )
+
+
+def languages_to_try(languages, caption_languages):
+    """
+    Actor 언어 목록에서 실제로 자막 트랙이 있는 언어만 남깁니다.
+    "Default"처럼 코드가 정해지지 않은 언어는 트랙이 하나라도 있으면 유지합니다.
+    """
+    if caption_languages is None:
+        return list(languages)
+    bases = {code.split("-")[0].lower() for code in caption_languages}
+    kept = []
+    for language in languages:
+        code = LANGUAGE_CODES.get(language)
+        if (code is None and bases) or code in bases:
+            kept.append(language)
+    return kept
+
+
+class Preflight:
+    """
+    영상 사전 점검기.
+
+    cache: ytcore.cache.PreflightCache (없으면 캐시하지 않음)
+    max_duration: 이보다 긴 영상(초)은 거절, 0이면 길이 제한 없음
+    """
+
+    def __init__(self, cache=None, base_url=None, timeout=3.0, max_duration=0, live_ttl=300, max_workers=5):
+        self.cache = cache
+        self.base_url = (base_url or DEFAULT_YOUTUBE_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_duration = max_duration
+        self.live_ttl = live_ttl
+        self.max_workers = max_workers
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def session(self):
+        """keep-alive 연결을 재사용하도록 세션을 한 번만 만듭니다."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = youtube_session()
+        return self._session
+
+    def fetch(self, video_id):
+        """시청 페이지(실패하면 oEmbed)에서 VideoInfo를 가져옵니다. 확인하지 못하면 source=None."""
+        try:
+            response = self.session().get(f"{self.base_url}/watch", params={"v": video_id, "hl": "en"},
+                                          timeout=self.timeout)
+            if response.ok:
+                player = parse_player_response(response.text)
+                if player:
+                    info = info_from_player_response(video_id, player)
+                    # LOGIN_REQUIRED 등 애매한 상태는 oEmbed 결과로 보완
+                    if info.playable is not None:
+                        return info
+        except requests.RequestException as e:
+            logging.warning(f"⚠️ [{video_id}] 시청 페이지 확인 실패: {e}")
+        return self.fetch_oembed(video_id)
+
+    def fetch_oembed(self, video_id):
+        """oEmbed로 영상 존재 여부와 제목만 확인합니다. (401/403/404는 재생 불가)"""
+        try:
+            response = self.session().get(
+                f"{self.base_url}/oembed",
+                params={"url": watch_url(video_id), "format": "json"},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            logging.warning(f"⚠️ [{video_id}] oEmbed 확인 실패: {e}")
+            return VideoInfo(video_id)
+        if response.status_code in (401, 403, 404):
+            return VideoInfo(video_id, playable=False, source="oembed")
+        if not response.ok:
+            return VideoInfo(video_id)
+        try:
+            title = response.json().get("title")
+        except ValueError:
+            title = None
+        return VideoInfo(video_id, title=title, source="oembed")
+
+    def inspect(self, video_id):
+        """캐시된 정보가 있으면 사용하고, 없으면 가져와서 저장합니다."""
+        if self.cache is not None:
+            cached = self.cache.get(video_id)
+            if cached is not None:
+                return VideoInfo.from_dict(cached)
+        info = self.fetch(video_id)
+        # 확인하지 못한 결과는 다음 요청에서 다시 시도하도록 저장하지 않음
+        if self.cache is not None and info.source is not None:
+            ttl = self.live_ttl if info.live_status in ("live", "upcoming") else None
+            self.cache.set(video_id, info.to_dict(), ttl)
+        return info
+
+    def judge(self, info, languages):
+        """VideoInfo를 보고 Verdict를 만듭니다."""
+        if info.live_status == "live":
+            return Verdict(info, LIVE)
+        if info.live_status == "upcoming":
+            return Verdict(info, UPCOMING)
+        if info.playable is False:
+            return Verdict(info, UNPLAYABLE)
+        if self.max_duration and info.duration and info.duration > self.max_duration:
+            return Verdict(info, TOO_LONG)
+        kept = languages_to_try(languages, info.caption_languages)
+        if not kept:
+            return Verdict(info, NO_CAPTIONS)
+        return Verdict(info, languages=kept)
+
+    def check(self, video_id, languages):
+        """영상 하나를 점검해 Verdict를 반환합니다. 점검 중 오류가 나면 모든 언어로 통과시킵니다."""
+        started = time.monotonic()
+        try:
+            with tracing.span("preflight"):
+                verdict = self.judge(self.inspect(video_id), languages)
+        except Exception as e:
+            logging.warning(f"⚠️ [{video_id}] 사전 점검 실패, 모든 언어로 시도합니다: {e}")
+            verdict = Verdict(VideoInfo(video_id), languages=list(languages))
+
+        elapsed = time.monotonic() - started
+        if verdict.rejected:
+            preflight_total.inc(result="rejected")
+            logging.info(f"🚫 [{video_id}] 사전 점검에서 거절 ({verdict.reason}, {elapsed:.2f}초)")
+        elif verdict.info.source is None:
+            preflight_total.inc(result="unknown")
+        else:
+            preflight_total.inc(result="ok")
+            if verdict.languages != list(languages):
+                logging.info(f"🔎 [{video_id}] 자막 트랙 {verdict.info.caption_languages} → {verdict.languages} 언어만 시도")
+        return verdict
+
+    def check_many(self, video_ids, languages):
+        """여러 영상을 동시에 점검해 {video_id: Verdict}를 반환합니다."""
+        if len(video_ids) <= 1:
+            return {video_id: self.check(video_id, languages) for video_id in video_ids}
+        with ThreadPoolExecutor(max_workers=min(len(video_ids), self.max_workers),
+                                thread_name_prefix="preflight") as executor:
+            verdicts = executor.map(tracing.propagate(lambda video_id: self.check(video_id, languages)), video_ids)
+            return dict(zip(video_ids, verdicts))
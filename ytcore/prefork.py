@@ -0,0 +1,175 @@
+"""
+미리 띄운(pre-fork) 워커 프로세스 풀.
+
+주 프로세스가 듣기 소켓을 한 번만 열어 워커 N개에 나눠 주고, 워커들은 같은 소켓에서 연결을 받습니다.
+(어느 워커가 받을지는 커널이 정함) 요청 JSON 처리, 자막 정리, 로그 기록이 코어 여러 개에 퍼집니다.
+
+- 워커가 비정상 종료하면 다시 띄웁니다. (시작하자마자 연달아 죽으면 점점 늦게)
+- SIGHUP: 새 워커를 모두 띄워 준비되면 이전 워커를 정상 종료합니다. (코드/설정 다시 읽기, 무중단)
+- SIGTERM / SIGINT(Ctrl+C): 모든 워커를 정상 종료하고 끝냅니다.
+  정상 종료하는 워커는 새 연결을 받지 않고 처리 중인 요청을 끝낸 뒤 나가며, graceful_timeout을 넘기면 강제 종료합니다.
+
+워커는 spawn 방식(Windows와 같은 방식)으로 시작하므로 주 프로세스의 SQLite 연결, HTTP 클라이언트, 스레드를
+물려받지 않고 각자 새로 만듭니다. Windows에는 SIGHUP이 없어 재시작 신호를 쓸 수 없고, 종료는 강제 종료입니다.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+# 이 시간(초)보다 빨리 죽은 워커는 "시작 실패"로 보고 다시 띄우기 전에 점점 오래 기다림
+_MIN_HEALTHY_LIFETIME = 5
+
+
+def default_workers():
+    """SERVER_WORKERS 기본값: CPU 코어 수"""
+    return os.cpu_count() or 1
+
+
+def listen(host, port, backlog=2048):
+    """워커들이 함께 쓸 듣기 소켓을 엽니다."""
+    sock = socket.create_server((host, port), backlog=backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_wsgi(app, sock, ready=None):
+    """
+    워커 안에서 WSGI 앱을 공유 소켓으로 제공합니다. (werkzeug 스레드 서버)
+    SIGTERM을 받으면 새 연결 받기를 멈추고 처리 중인 요청 스레드가 끝날 때까지 기다린 뒤 반환합니다.
+    """
+    from werkzeug.serving import make_server
+
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+    # 정상 종료 시 server_close()가 요청 스레드를 기다리도록 (ThreadingMixIn은 데몬 스레드는 기다리지 않음)
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def stop(signum, frame):
+        # serve_forever가 도는 스레드에서 shutdown()을 부르면 멈추므로 다른 스레드에서 호출
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    # Ctrl+C는 주 프로세스가 받아 워커들을 정상 종료시킴
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    logging.info(f"👷 워커 {os.getpid()} 준비 완료")
+    if ready is not None:
+        ready.set()
+    server.serve_forever()
+    server.server_close()
+    logging.info(f"👋 워커 {os.getpid()} 종료 (처리 중인 요청 완료)")
+
+
+def _worker_main(target, sock, ready):
+    target(sock, ready)
+
+
+class _Worker:
+    def __init__(self, process, ready):
+        self.process = process
+        self.ready = ready
+        self.started_at = time.monotonic()
+
+
+class Arbiter:
+    """
+    워커 프로세스를 띄우고 지켜보는 주 프로세스.
+
+    target(sock, ready)은 워커에서 실행될 모듈 최상위 함수로, 서버를 준비한 뒤 ready.set()을 호출하고
+    SIGTERM을 받을 때까지 sock으로 요청을 처리해야 합니다. (보통 serve_wsgi를 호출)
+    """
+
+    def __init__(self, target, sock, workers, graceful_timeout=30, ready_timeout=60):
+        self.target = target
+        self.sock = sock
+        self.workers = max(1, workers)
+        self.graceful_timeout = graceful_timeout
+        self.ready_timeout = ready_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._pool = []
+        self._failures = 0
+        self._restart_at = 0.0
+        self._reload = threading.Event()
+        self._stop = threading.Event()
+
+    def _spawn(self):
+        ready = self._ctx.Event()
+        process = self._ctx.Process(target=_worker_main, args=(self.target, self.sock, ready), daemon=False)
+        process.start()
+        return _Worker(process, ready)
+
+    def _stop_workers(self, workers):
+        """워커들에 SIGTERM을 보내고 graceful_timeout까지 기다린 뒤, 남은 워커는 강제 종료합니다."""
+        for worker in workers:
+            if worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.monotonic() + self.graceful_timeout
+        for worker in workers:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                logging.warning(f"⏱️ 워커 {worker.process.pid}가 {self.graceful_timeout}초 안에 끝나지 않아 강제 종료합니다.")
+                worker.process.kill()
+                worker.process.join()
+
+    def _wait_ready(self, workers):
+        deadline = time.monotonic() + self.ready_timeout
+        for worker in workers:
+            while not worker.ready.wait(0.1):
+                if not worker.process.is_alive() or time.monotonic() > deadline or self._stop.is_set():
+                    return False
+        return True
+
+    def reload(self):
+        """새 워커를 모두 띄우고, 준비되면 이전 워커를 정상 종료합니다. 새 워커가 준비되지 않으면 이전 워커를 유지합니다."""
+        logging.info(f"🔄 워커 {self.workers}개를 새로 띄웁니다.")
+        fresh = [self._spawn() for _ in range(self.workers)]
+        if not self._wait_ready(fresh):
+            logging.error("❌ 새 워커가 준비되지 않아 재시작을 취소합니다. (이전 워커 유지)")
+            self._stop_workers(fresh)
+            return
+        old, self._pool = self._pool, fresh
+        self._stop_workers(old)
+        logging.info("✅ 재시작 완료")
+
+    def _reap(self):
+        """죽은 워커를 다시 띄웁니다. (시작하자마자 죽는 일이 반복되면 최대 30초까지 늦춤)"""
+        now = time.monotonic()
+        for worker in list(self._pool):
+            if worker.process.is_alive():
+                continue
+            self._pool.remove(worker)
+            lifetime = now - worker.started_at
+            logging.warning(f"⚠️ 워커 {worker.process.pid}가 종료되었습니다. (코드 {worker.process.exitcode}, {lifetime:.1f}초 동안 실행)")
+            if lifetime < _MIN_HEALTHY_LIFETIME:
+                self._failures += 1
+                self._restart_at = now + min(30.0, 0.5 * 2 ** self._failures)
+            else:
+                self._failures = 0
+        if len(self._pool) < self.workers and now >= self._restart_at:
+            self._pool.extend(self._spawn() for _ in range(self.workers - len(self._pool)))
+
+    def run(self):
+        """워커를 띄우고 종료 신호를 받을 때까지 지켜봅니다."""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stop.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: self._stop.set())
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self._reload.set())
+
+        logging.info(f"🧑‍🏭 워커 {self.workers}개로 시작합니다. (주 프로세스 {os.getpid()})")
+        self._pool = [self._spawn() for _ in range(self.workers)]
+        try:
+            while not self._stop.wait(0.5):
+                if self._reload.is_set():
+                    self._reload.clear()
+                    self.reload()
+                self._reap()
+        finally:
+            logging.info("🛑 워커를 모두 정상 종료합니다.")
+            self._stop_workers(self._pool)
+            self.sock.close()
@@ -0,0 +1,56 @@
+"""여러 자막 언어를 동시에 시도하는 병렬 탐색."""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def probe_languages_batch(languages, fetch, keys):
+    """
+    모든 후보 언어를 동시에 시도하고, 키(영상)마다 우선순위가 가장 높은 성공 결과를 고릅니다.
+
+    fetch(language, cancel_event)는 {key: result} dict를 반환해야 하며,
+    cancel_event가 설정되면 진행 중인 작업을 중단해야 합니다.
+    언어 결과를 우선순위 순서대로 기다리므로 각 키의 선택은 항상 결정적이며,
+    모든 키가 정해지면 나머지 실행은 중단됩니다.
+    반환값은 {key: (language, result)} 이며 실패한 키는 빠집니다.
+    """
+    found = {}
+    if not languages or not keys:
+        return found
+
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(languages), thread_name_prefix="probe")
+    futures = [executor.submit(fetch, language, cancel_event) for language in languages]
+    try:
+        for language, future in zip(languages, futures):
+            try:
+                results = future.result() or {}
+            except Exception as e:
+                logging.error(f"'{language}' 언어 처리 중 오류: {e}")
+                continue
+            for key in keys:
+                if key not in found and results.get(key):
+                    found[key] = (language, results[key])
+            if len(found) == len(keys):
+                break
+        return found
+    finally:
+        # 나머지 실행은 백그라운드에서 중단되도록 하고 기다리지 않음
+        cancel_event.set()
+        executor.shutdown(wait=False)
+
+
+def probe_languages(languages, fetch):
+    """
+    모든 후보 언어를 동시에 시도하고, 우선순위가 가장 높은 성공 결과를 반환합니다.
+
+    fetch(language, cancel_event)는 성공 시 결과, 실패 시 None을 반환해야 합니다.
+    반환값은 (language, result) 이며, 모두 실패하면 (None, None) 입니다.
+    """
+    def fetch_one(language, cancel_event):
+        result = fetch(language, cancel_event)
+        return {None: result} if result else {}
+
+    found = probe_languages_batch(languages, fetch_one, [None])
+    return found.get(None, (None, None))
@@ -0,0 +1,129 @@
+"""
+Gemini 프롬프트 앞부분(고정 지시문) 캐시.
+
+요약 지시문(요약 구조, 주의사항 등)은 모든 요청에서 같으므로 영상별 제목/자막과 분리해 system instruction으로 보내고,
+PromptCache를 쓰면 (모델, 지시문)별로 Gemini 캐시(cachedContents)를 한 번 만들어 모든 요청이 참조(cachedContent)합니다.
+캐시에 든 토큰은 요청마다 다시 처리하지 않으므로 할인된 단가(입력 토큰 단가의 약 1/4)로 계산되고 첫 응답도 빨라집니다.
+(대신 캐시가 유지되는 동안 토큰 × 시간만큼 보관 요금이 붙습니다.)
+
+- 캐시는 ttl초 동안 유지되며, 끝나기 refresh_margin초 전에 요청 하나가 새로 만듭니다. (그동안 다른 요청은 기존 캐시 사용)
+- Gemini는 모델별 최소 토큰 수(1,024~4,096) 이상만 캐시로 만들 수 있으므로 지시문이 min_tokens보다 짧으면 만들지 않습니다.
+- 캐시가 없거나(짧음, 만드는 중, 실패) 쓸 수 없으면 None을 반환하며, 호출하는 쪽은 지시문을 system instruction으로 직접 보냅니다.
+- 캐시 만들기에 실패하거나 캐시를 참조한 요청이 실패하면(invalidate) retry_after초 동안 다시 만들지 않습니다.
+
+gemini_input_tokens_total{kind}는 Gemini 응답의 사용량(usageMetadata)에서 읽은 입력 토큰 수입니다.
+(prompt: 전체 입력, cached: 그중 캐시에서 읽은 토큰)
+"""
+
+import hashlib
+import logging
+import threading
+import time
+
+from ytcore import clients, metrics
+from ytcore.chunking import estimate_tokens
+
+prompt_cache_total = metrics.counter(
+    "gemini_prompt_cache_total",
+    "고정 지시문 캐시 조회 결과 (hit: 캐시 참조, created: 새로 만듦, skipped: 캐시 없이 지시문을 직접 보냄)",
+)
+input_tokens_total = metrics.counter(
+    "gemini_input_tokens_total",
+    "Gemini 입력 토큰 수 (prompt: 전체 입력, cached: 그중 캐시에서 읽은 토큰)",
+)
+
+
+def record_usage(usage):
+    """Gemini 응답의 사용량(usage_metadata)에서 입력 토큰 수를 메트릭에 더합니다. (REST 응답은 dict, SDK 응답은 객체)"""
+    if not usage:
+        return
+    if isinstance(usage, dict):
+        prompt, cached = usage.get("promptTokenCount"), usage.get("cachedContentTokenCount")
+    else:
+        prompt, cached = getattr(usage, "prompt_token_count", 0), getattr(usage, "cached_content_token_count", 0)
+    if prompt:
+        input_tokens_total.inc(prompt, kind="prompt")
+    if cached:
+        input_tokens_total.inc(cached, kind="cached")
+
+
+class _Entry:
+    def __init__(self, name, expires_at):
+        self.name = name
+        self.expires_at = expires_at
+
+
+class PromptCache:
+    """
+    (API 키, 모델, 지시문)별 Gemini 캐시 이름을 관리합니다.
+
+    ttl: 캐시 유지 시간(초)
+    refresh_margin: 캐시가 끝나기 이만큼(초) 전에 새로 만듦
+    min_tokens: 지시문의 추정 토큰 수가 이보다 적으면 캐시를 만들지 않음 (Gemini 최소 캐시 크기)
+    retry_after: 만들기/참조에 실패한 뒤 다시 만들기까지 기다리는 시간(초)
+    """
+
+    def __init__(self, ttl=3600, refresh_margin=300, min_tokens=1024, retry_after=600):
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl / 2)
+        self.min_tokens = min_tokens
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._creating = set()
+        self._retry_at = {}
+        self._too_short = set()
+
+    @staticmethod
+    def _key(api_key, model_name, instruction):
+        return (api_key, model_name, hashlib.sha256(instruction.encode("utf-8")).hexdigest())
+
+    def get(self, api_key, model_name, instruction):
+        """지시문을 담은 캐시 이름을 반환합니다. 쓸 수 있는 캐시가 없으면 None"""
+        key = self._key(api_key, model_name, instruction)
+        if estimate_tokens(instruction) < self.min_tokens:
+            if key not in self._too_short:
+                self._too_short.add(key)
+                logging.info(f"ℹ️ 지시문이 짧아(약 {estimate_tokens(instruction)}토큰 < {self.min_tokens}) 캐시 없이 직접 보냅니다.")
+            prompt_cache_total.inc(result="skipped")
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            usable = entry.name if entry is not None and now < entry.expires_at else None
+            fresh = entry is not None and now < entry.expires_at - self.refresh_margin
+            if fresh or key in self._creating or now < self._retry_at.get(key, 0):
+                prompt_cache_total.inc(result="hit" if usable else "skipped")
+                return usable
+            self._creating.add(key)
+
+        try:
+            name = clients.create_cached_content(api_key, model_name, instruction, self.ttl)
+        except Exception as e:
+            logging.warning(f"⚠️ 지시문 캐시 만들기 실패, {self.retry_after}초 동안 지시문을 직접 보냅니다: {e}")
+            with self._lock:
+                self._creating.discard(key)
+                self._retry_at[key] = time.monotonic() + self.retry_after
+            prompt_cache_total.inc(result="hit" if usable else "skipped")
+            return usable
+
+        with self._lock:
+            self._creating.discard(key)
+            self._entries[key] = _Entry(name, now + self.ttl)
+        if entry is not None:
+            # 이전 캐시는 서버에서 만료될 때까지 진행 중인 요청이 쓰고, 새 요청은 새 캐시를 참조
+            clients.forget_gemini_models(entry.name)
+        logging.info(f"🗃️ 지시문 캐시 생성: {name} ({model_name}, {self.ttl}초)")
+        prompt_cache_total.inc(result="created")
+        return name
+
+    def invalidate(self, api_key, model_name, instruction, name):
+        """캐시를 참조한 요청이 실패했을 때 호출합니다. (서버에서 지워졌거나 모델과 맞지 않음)"""
+        key = self._key(api_key, model_name, instruction)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.name == name:
+                del self._entries[key]
+            self._retry_at[key] = time.monotonic() + self.retry_after
+        clients.forget_gemini_models(name)
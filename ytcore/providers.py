@@ -0,0 +1,378 @@
+"""
+자막 공급자(provider) 체인.
+
+자막을 가져오는 방법은 여러 가지입니다.
+- apify: 기본 Apify Actor (언어별 실행)
+- apify_backup: 백업 Apify Actor (언어 지정 없음)
+- timedtext: YouTube 시청 페이지의 captionTracks 주소에서 자막을 직접 받음 (Actor 실행 없이 1초 안팎)
+
+공급자는 모두 같은 형태로 호출합니다.
+    provider.fetch({video_id: [언어, ...]}, cancel_event) → {video_id: (자막, 언어, 제목)}
+
+ProviderChain은 공급자마다 지연 시간과 성공률(지수 이동 평균)을 기록하고,
+건강한 공급자 중 "지연 시간 / 성공률"이 가장 낮은 쪽부터 시도하도록 순서를 계속 바꿉니다.
+표본이 부족한 공급자는 몇 번에 한 번씩 맨 앞에서 시도해 실제 성능을 알아냅니다.
+
+자막 캐시는 체인 바깥(호출하는 쪽)에서 확인/저장하며, 공급자는 on_missing(video_id, 언어 목록)으로
+"이 영상에는 그 언어 자막이 없다"고 확인된 경우를 알려 줍니다. (일시적 오류는 알리지 않음)
+"""
+
+import logging
+import threading
+import time
+from urllib.parse import urljoin
+
+import requests
+
+from ytcore import breaker, metrics, tracing
+from ytcore.apify_runs import match_items_to_videos, run_actor
+from ytcore.preflight import DEFAULT_YOUTUBE_URL, LANGUAGE_CODES, parse_player_response, youtube_session
+from ytcore.youtube_url import watch_url
+
+provider_calls_total = metrics.counter(
+    "transcript_provider_calls_total",
+    "자막 공급자 호출 수 (결과별: success 하나 이상 성공, empty 결과 없음, error 예외)",
+)
+provider_seconds = metrics.histogram(
+    "transcript_provider_seconds",
+    "자막 공급자 호출 한 번의 소요 시간",
+)
+provider_success_rate = metrics.gauge(
+    "transcript_provider_success_rate",
+    "자막 공급자의 최근 성공률 (요청한 영상 중 자막을 돌려준 비율의 이동 평균)",
+)
+provider_rank = metrics.gauge(
+    "transcript_provider_rank",
+    "마지막으로 정한 자막 공급자 시도 순서 (0이 가장 먼저)",
+)
+
+
+class Provider:
+    """자막 공급자 기본 클래스."""
+
+    name = "provider"
+
+    def fetch(self, requests_by_video, cancel_event=None):
+        """{video_id: [언어]}를 받아 {video_id: (자막, 언어, 제목)}을 반환합니다. 못 찾은 영상은 빠집니다."""
+        raise NotImplementedError
+
+    def healthy(self):
+        """지금 시도해도 되는지 (회로 차단기가 열려 있으면 False)."""
+        return True
+
+
+class CallableProvider(Provider):
+    """함수 하나를 공급자로 감쌉니다. (기존 추출 함수를 체인에 넣을 때 사용)"""
+
+    def __init__(self, name, fetch, healthy=None):
+        self.name = name
+        self._fetch = fetch
+        self._healthy = healthy
+
+    def fetch(self, requests_by_video, cancel_event=None):
+        return self._fetch(requests_by_video, cancel_event)
+
+    def healthy(self):
+        return self._healthy() if self._healthy else True
+
+
+def parse_backup_item(item):
+    """백업 Actor 데이터셋 항목에서 (자막, 제목)을 꺼냅니다. 백업 Actor는 필드 이름이 다를 수 있음."""
+    text = item.get("transcript") or item.get("text") or item.get("content") or item.get("subtitle")
+    title = item.get("videoTitle") or item.get("title") or item.get("name")
+    if not isinstance(text, str) or not text.strip():
+        return None, title
+    return text.strip(), title
+
+
+# 백업 Actor 결과의 언어 이름 (백업 Actor는 언어를 지정하지 않음)
+BACKUP_LANGUAGE = "backup"
+
+
+class ApifyBackupProvider(Provider):
+    """언어를 지정하지 않는 백업 Actor로 여러 영상을 한 번에 추출합니다."""
+
+    name = "apify_backup"
+
+    def __init__(self, client_factory, actor_id="drobnikj/youtube-transcript-extractor", actor_breaker=None,
+                 on_missing=None):
+        self.client_factory = client_factory
+        self.actor_id = actor_id
+        self.breaker = actor_breaker
+        self.on_missing = on_missing
+
+    def healthy(self):
+        return self.breaker is None or self.breaker.state != breaker.OPEN
+
+    def _run(self, client, run_input, cancel_event):
+        if self.breaker is None:
+            return run_actor(client, self.actor_id, run_input, cancel_event)
+        return self.breaker.call(
+            run_actor, client, self.actor_id, run_input, cancel_event,
+            classify=lambda run: None if run is None or run.get("reused") == "finished" else run.get("status") == "SUCCEEDED",
+        )
+
+    def fetch(self, requests_by_video, cancel_event=None):
+        video_ids = list(requests_by_video)
+        client = self.client_factory()
+        run_input = {"startUrls": [watch_url(video_id) for video_id in video_ids], "maxRequestRetries": 2}
+        with tracing.span("apify_run", language="backup"):
+            run = self._run(client, run_input, cancel_event)
+        if not run or run.get("status") != "SUCCEEDED":
+            return {}
+        items = list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        if not items:
+            return {}
+        results = {}
+        for video_id, item in match_items_to_videos(video_ids, items, run.get("videos")).items():
+            text, title = parse_backup_item(item)
+            if text:
+                results[video_id] = (text, BACKUP_LANGUAGE, title)
+            elif self.on_missing is not None:
+                # 성공한 실행이 이 영상 항목을 돌려줬는데 자막이 비어 있음
+                self.on_missing(video_id, [BACKUP_LANGUAGE])
+        return results
+
+
+class TimedTextBlocked(Exception):
+    """시청 페이지에 플레이어 정보가 없거나 자막 트랙이 빈 응답을 줌 (YouTube가 서버 요청을 막은 경우)"""
+
+
+class TimedTextProvider(Provider):
+    """
+    YouTube 시청 페이지의 captionTracks에서 자막 주소를 찾아 직접 받습니다. (fmt=json3)
+
+    Actor를 실행하지 않으므로 성공하면 가장 빠르지만, YouTube가 서버 요청을 막으면 자막을 받을 수 없습니다.
+    그런 경우(HTTP 오류, 플레이어 정보 없음, 빈 자막 응답) 회로 차단기가 열려 체인의 뒤로 밀립니다.
+    요청한 언어의 자막 트랙이 없는 영상은 정상 응답이므로 차단기에 실패로 기록하지 않습니다.
+    """
+
+    name = "timedtext"
+
+    def __init__(self, base_url=None, timeout=5.0, on_missing=None):
+        self.base_url = (base_url or DEFAULT_YOUTUBE_URL).rstrip("/")
+        self.timeout = timeout
+        self.on_missing = on_missing
+        self.breaker = breaker.get("timedtext")
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = youtube_session()
+        return self._session
+
+    def healthy(self):
+        return self.breaker.state != breaker.OPEN
+
+    @staticmethod
+    def pick_track(tracks, languages):
+        """언어 우선순위에 맞는 자막 트랙과 그 언어 이름. 같은 언어면 직접 올린 자막을 자동 자막(asr)보다 우선."""
+        def by_quality(candidates):
+            return sorted(candidates, key=lambda track: track.get("kind") == "asr")
+
+        for language in languages:
+            code = LANGUAGE_CODES.get(language)
+            if code is None:
+                candidates = by_quality(tracks)
+            else:
+                candidates = by_quality(
+                    track for track in tracks
+                    if track.get("languageCode", "").split("-")[0].lower() == code
+                )
+            if candidates:
+                return candidates[0], language
+        return None, None
+
+    @staticmethod
+    def parse_json3(data):
+        """json3 자막({"events": [{"segs": [{"utf8": ...}]}]})을 한 줄 텍스트로 합칩니다."""
+        lines = []
+        for event in data.get("events") or []:
+            text = "".join(seg.get("utf8", "") for seg in event.get("segs") or []).replace("\n", " ").strip()
+            if text:
+                lines.append(text)
+        return " ".join(lines)
+
+    def fetch_one(self, video_id, languages):
+        session = self.session()
+        response = session.get(f"{self.base_url}/watch", params={"v": video_id, "hl": "en"}, timeout=self.timeout)
+        response.raise_for_status()
+        player = parse_player_response(response.text)
+        if player is None:
+            raise TimedTextBlocked(f"시청 페이지에서 플레이어 정보를 찾지 못했습니다. ({video_id})")
+        tracks = ((player.get("captions") or {}).get("playerCaptionsTracklistRenderer") or {}).get("captionTracks") or []
+        track, language = self.pick_track(tracks, languages)
+        if track is None or not track.get("baseUrl"):
+            return None
+        url = urljoin(self.base_url + "/", track["baseUrl"])
+        caption = session.get(url, params={"fmt": "json3"}, timeout=self.timeout)
+        caption.raise_for_status()
+        text = self.parse_json3(caption.json()) if caption.content else ""
+        if not text:
+            raise TimedTextBlocked(f"자막 트랙이 빈 응답을 주었습니다. ({video_id}, {language})")
+        title = (player.get("videoDetails") or {}).get("title")
+        return text, language, title
+
+    def fetch(self, requests_by_video, cancel_event=None):
+        results = {}
+        for video_id, languages in requests_by_video.items():
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if not languages:
+                continue
+            try:
+                with tracing.span("timedtext"):
+                    # 예외(HTTP 오류, 차단)만 실패로 기록, 자막 트랙이 없는 영상(None)은 성공한 호출
+                    result = self.breaker.call(self.fetch_one, video_id, languages)
+            except breaker.CircuitOpenError:
+                break
+            except (requests.RequestException, ValueError, TimedTextBlocked) as e:
+                logging.warning(f"⚠️ [{video_id}] timedtext 자막 받기 실패: {e}")
+                continue
+            if result:
+                results[video_id] = result
+            elif self.on_missing is not None:
+                self.on_missing(video_id, languages)
+        return results
+
+
+class ProviderStats:
+    """공급자 하나의 지연 시간/성공률 이동 평균."""
+
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.samples = 0
+        self.latency = None
+        self.success_rate = None
+
+    def record(self, duration, success_rate):
+        if self.samples == 0:
+            self.latency, self.success_rate = duration, success_rate
+        else:
+            self.latency += self.alpha * (duration - self.latency)
+            self.success_rate += self.alpha * (success_rate - self.success_rate)
+        self.samples += 1
+
+    def score(self):
+        """낮을수록 먼저 시도: 성공 한 번을 얻는 데 드는 예상 시간."""
+        return self.latency / max(0.05, self.success_rate)
+
+    def to_dict(self):
+        return {
+            "samples": self.samples,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "success_rate": round(self.success_rate, 3) if self.success_rate is not None else None,
+        }
+
+
+class ProviderChain:
+    """
+    공급자를 순서대로 시도해 영상마다 처음 성공한 결과를 사용합니다.
+
+    min_samples: 이만큼 기록이 쌓인 공급자만 점수로 정렬 (나머지는 설정한 순서 유지)
+    explore_every: 이 횟수마다 표본이 가장 적은 건강한 공급자를 맨 앞에서 한 번 시도 (0이면 안 함)
+    """
+
+    def __init__(self, providers, min_samples=1, explore_every=10, alpha=0.2):
+        self.providers = list(providers)
+        self.min_samples = min_samples
+        self.explore_every = explore_every
+        self._lock = threading.Lock()
+        self._stats = {provider.name: ProviderStats(alpha) for provider in self.providers}
+        self._calls = 0
+        self._order = [provider.name for provider in self.providers]
+
+    def ordered(self):
+        """이번 호출에서 시도할 공급자 순서."""
+        with self._lock:
+            self._calls += 1
+            explore = self.explore_every and self._calls % self.explore_every == 0
+            stats = {name: (s.samples, s.score() if s.samples >= self.min_samples else None)
+                     for name, s in self._stats.items()}
+
+        healthy = [provider for provider in self.providers if provider.healthy()]
+        unhealthy = [provider for provider in self.providers if provider not in healthy]
+
+        # 점수가 있는 공급자끼리는 점수 순으로, 점수가 없는 공급자는 설정한 자리를 유지
+        scored = sorted((p for p in healthy if stats[p.name][1] is not None), key=lambda p: stats[p.name][1])
+        order = [scored.pop(0) if stats[p.name][1] is not None else p for p in healthy]
+
+        if explore and len(order) > 1:
+            newcomer = min(order, key=lambda p: stats[p.name][0])
+            order.remove(newcomer)
+            order.insert(0, newcomer)
+
+        order += unhealthy
+        self._order = [provider.name for provider in order]
+        for rank, provider in enumerate(order):
+            provider_rank.set(rank, provider=provider.name)
+        return order
+
+    def record(self, provider, duration, requested, found):
+        success_rate = found / requested if requested else 0.0
+        with self._lock:
+            stats = self._stats[provider.name]
+            stats.record(duration, success_rate)
+            provider_success_rate.set(round(stats.success_rate, 4), provider=provider.name)
+        provider_seconds.observe(duration, provider=provider.name)
+        provider_calls_total.inc(provider=provider.name, result="success" if found else "empty")
+
+    def fetch(self, requests_by_video, cancel_event=None):
+        """
+        {video_id: [언어]}에 대해 공급자를 차례로 시도합니다.
+        반환값은 {video_id: (자막, 언어, 제목, 공급자 이름)} 이며 모든 공급자가 실패한 영상은 빠집니다.
+        """
+        found = {}
+        for provider in self.ordered():
+            pending = {video_id: languages for video_id, languages in requests_by_video.items() if video_id not in found}
+            if not pending or (cancel_event is not None and cancel_event.is_set()):
+                break
+            if not provider.healthy():
+                logging.info(f"⛔ '{provider.name}' 공급자는 회로가 열려 있어 건너뜁니다.")
+                continue
+            started = time.monotonic()
+            try:
+                results = provider.fetch(pending, cancel_event) or {}
+            except Exception as e:
+                logging.error(f"'{provider.name}' 공급자 오류: {e}")
+                provider_calls_total.inc(provider=provider.name, result="error")
+                with self._lock:
+                    self._stats[provider.name].record(time.monotonic() - started, 0.0)
+                continue
+            duration = time.monotonic() - started
+            results = {video_id: result for video_id, result in results.items() if video_id in pending and result}
+            self.record(provider, duration, len(pending), len(results))
+            if results:
+                logging.info(f"📦 '{provider.name}' 공급자로 {len(results)}/{len(pending)}개 영상 자막 확보 ({duration:.2f}초)")
+            for video_id, (transcript, language, title) in results.items():
+                found[video_id] = (transcript, language, title, provider.name)
+        return found
+
+    def stats(self):
+        """공급자별 기록과 현재 시도 순서."""
+        with self._lock:
+            data = {name: stats.to_dict() for name, stats in self._stats.items()}
+            order = list(self._order)
+        for provider in self.providers:
+            data[provider.name]["healthy"] = provider.healthy()
+            data[provider.name]["rank"] = order.index(provider.name)
+        return data
+
+
+def build_chain(names, available, **options):
+    """
+    쉼표로 구분한 공급자 이름 목록(예: "apify,apify_backup,timedtext")으로 체인을 만듭니다.
+    available은 {이름: Provider} 이며, 알 수 없는 이름은 경고 후 무시합니다.
+    """
+    providers = []
+    for name in (part.strip() for part in names.split(",")):
+        if not name:
+            continue
+        if name not in available:
+            logging.warning(f"⚠️ 알 수 없는 자막 공급자: {name}")
+            continue
+        providers.append(available[name])
+    return ProviderChain(providers, **options)
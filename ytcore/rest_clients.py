@@ -0,0 +1,256 @@
+"""
+Apify / Gemini REST API를 requests 로 직접 호출하는 가벼운 클라이언트.
+
+apify_client, google.generativeai SDK는 import 만으로 수백 ms가 걸려 서버리스 콜드 스타트를 늘립니다.
+이 모듈은 실제로 사용하는 기능만 같은 이름의 메서드로 제공하므로 SDK 객체 자리에 그대로 쓸 수 있습니다.
+
+- ApifyRestClient: actor(id).start/call, run(id).get/wait_for_finish/abort,
+  dataset(id).list_items/iterate_items (apify-client 1.x 인터페이스)
+- GeminiRestModel: generate_content(prompt, stream=False) → .text 속성을 가진 응답
+- create_cached_content: 고정 지시문을 Gemini 캐시(cachedContents)로 만들기 (ytcore.prompt_cache 에서 사용)
+
+클라이언트마다 requests.Session 하나로 keep-alive 연결을 재사용합니다.
+"""
+
+import json
+import logging
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_APIFY_API_URL = "https://api.apify.com"
+DEFAULT_GEMINI_API_URL = "https://generativelanguage.googleapis.com"
+
+# 재시도할 HTTP 상태 코드 (요청 한도 초과, 일시적 서버 오류)
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _session(pool_size=16):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _request(session, method, url, max_attempts=None, **kwargs):
+    """
+    일시적 오류(연결 실패, 429, 5xx)는 짧게 기다렸다가 다시 시도합니다.
+    기본값은 GET만 3번까지 시도합니다. POST는 서버가 이미 처리했을 수 있으므로(예: Actor 실행이 두 번 시작됨)
+    다시 보내도 안전한 호출만 max_attempts를 직접 지정합니다.
+    """
+    if max_attempts is None:
+        max_attempts = 3 if method == "GET" else 1
+    for attempt in range(1, max_attempts + 1):
+        try:
+            response = session.request(method, url, **kwargs)
+            if response.status_code not in _RETRY_STATUSES or attempt == max_attempts:
+                response.raise_for_status()
+                return response
+            logging.warning(f"HTTP {response.status_code} 응답, 다시 시도합니다. ({attempt}/{max_attempts})")
+        except requests.ConnectionError:
+            if attempt == max_attempts:
+                raise
+            logging.warning(f"연결 실패, 다시 시도합니다. ({attempt}/{max_attempts})")
+        time.sleep(0.5 * (2 ** (attempt - 1)))
+
+
+class ListPage:
+    """데이터셋 항목 한 페이지. (apify-client의 ListPage와 같은 속성)"""
+
+    def __init__(self, items, offset, limit, total):
+        self.items = items
+        self.count = len(items)
+        self.offset = offset
+        self.limit = limit
+        self.total = total
+
+
+class ApifyRestClient:
+    """apify-client 1.x 대신 쓸 수 있는 최소 REST 클라이언트."""
+
+    def __init__(self, token, api_url=None, timeout=30):
+        self.token = token
+        self.api_url = (api_url or DEFAULT_APIFY_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = _session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def actor(self, actor_id):
+        return _ActorClient(self, actor_id)
+
+    def run(self, run_id):
+        return _RunClient(self, run_id)
+
+    def dataset(self, dataset_id):
+        return _DatasetClient(self, dataset_id)
+
+    def _call(self, method, path, timeout=None, **kwargs):
+        return _request(self.session, method, f"{self.api_url}/v2{path}",
+                        timeout=timeout or self.timeout, **kwargs)
+
+
+class _ActorClient:
+    def __init__(self, client, actor_id):
+        self.client = client
+        # "사용자/이름" 형태의 Actor ID는 URL에서 "사용자~이름"으로 씀
+        self.actor_id = actor_id.replace("/", "~")
+
+    def start(self, run_input=None):
+        """Actor를 시작하고 실행 정보(dict)를 바로 반환합니다."""
+        # 응답을 못 받아도 실행은 시작되었을 수 있으므로 다시 시도하지 않음 (유료 실행 중복 방지)
+        response = self.client._call("POST", f"/acts/{self.actor_id}/runs", json=run_input or {}, max_attempts=1)
+        return response.json()["data"]
+
+    def call(self, run_input=None, wait_secs=None):
+        """Actor를 시작하고 끝날 때까지(또는 wait_secs까지) 기다린 실행 정보를 반환합니다."""
+        run = self.start(run_input=run_input)
+        return self.client.run(run["id"]).wait_for_finish(wait_secs=wait_secs)
+
+
+class _RunClient:
+    # 서버 측 대기(waitForFinish)는 한 번에 최대 60초
+    MAX_SERVER_WAIT = 60
+
+    def __init__(self, client, run_id):
+        self.client = client
+        self.run_id = run_id
+
+    def get(self):
+        return self.client._call("GET", f"/actor-runs/{self.run_id}").json()["data"]
+
+    def wait_for_finish(self, wait_secs=None):
+        """실행이 끝나거나 wait_secs가 지날 때까지 서버 측에서 기다린 뒤 실행 정보를 반환합니다."""
+        deadline = None if wait_secs is None else time.monotonic() + wait_secs
+        while True:
+            remaining = self.MAX_SERVER_WAIT if deadline is None else max(0, deadline - time.monotonic())
+            wait = int(min(self.MAX_SERVER_WAIT, remaining))
+            run = self.client._call(
+                "GET",
+                f"/actor-runs/{self.run_id}",
+                params={"waitForFinish": wait},
+                timeout=wait + self.client.timeout,
+            ).json()["data"]
+            if run.get("status") in ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"):
+                return run
+            if deadline is not None and time.monotonic() >= deadline:
+                return run
+
+    def abort(self):
+        return self.client._call("POST", f"/actor-runs/{self.run_id}/abort", max_attempts=1).json()["data"]
+
+
+class _DatasetClient:
+    def __init__(self, client, dataset_id):
+        self.client = client
+        self.dataset_id = dataset_id
+
+    def list_items(self, offset=0, limit=None):
+        params = {"format": "json", "offset": offset}
+        if limit is not None:
+            params["limit"] = limit
+        response = self.client._call("GET", f"/datasets/{self.dataset_id}/items", params=params)
+        items = response.json()
+        total = int(response.headers.get("X-Apify-Pagination-Total", len(items)))
+        return ListPage(items, offset, limit, total)
+
+    def iterate_items(self, page_size=1000):
+        offset = 0
+        while True:
+            page = self.list_items(offset=offset, limit=page_size)
+            yield from page.items
+            offset += page.count
+            if page.count < page_size or offset >= page.total:
+                return
+
+
+class GeminiResponse:
+    """generate_content 응답. SDK처럼 .text 로 전체 텍스트를 읽습니다."""
+
+    def __init__(self, data):
+        self.data = data
+        self.usage_metadata = data.get("usageMetadata", {})
+
+    @property
+    def text(self):
+        candidates = self.data.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+
+def gemini_request_body(prompt, generation_config=None, system_instruction=None, cached_content=None):
+    """
+    generateContent 요청 본문을 만듭니다. (async_clients 와 함께 사용)
+    cached_content(cachedContents/...)를 참조하면 지시문은 캐시에 들어 있으므로 system_instruction을 함께 보내지 않습니다.
+    """
+    generation_config = generation_config or {}
+    body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    config = {}
+    if generation_config.get("max_output_tokens") is not None:
+        config["maxOutputTokens"] = generation_config["max_output_tokens"]
+    if generation_config.get("temperature") is not None:
+        config["temperature"] = generation_config["temperature"]
+    if config:
+        body["generationConfig"] = config
+    if cached_content:
+        body["cachedContent"] = cached_content
+    elif system_instruction:
+        body["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+    return body
+
+
+def create_cached_content(api_key, model_name, system_instruction, ttl, api_url=None, timeout=30):
+    """지시문을 담은 Gemini 캐시(cachedContents)를 만들고 캐시 정보(dict, name 포함)를 반환합니다."""
+    api_url = (api_url or DEFAULT_GEMINI_API_URL).rstrip("/")
+    body = {
+        "model": model_name if model_name.startswith("models/") else f"models/{model_name}",
+        "systemInstruction": {"parts": [{"text": system_instruction}]},
+        "ttl": f"{int(ttl)}s",
+    }
+    with _session(1) as session:
+        session.headers["x-goog-api-key"] = api_key
+        response = _request(session, "POST", f"{api_url}/v1beta/cachedContents", json=body, timeout=timeout)
+        return response.json()
+
+
+class GeminiRestModel:
+    """google.generativeai.GenerativeModel 대신 쓸 수 있는 최소 REST 모델."""
+
+    def __init__(self, api_key, model_name, generation_config=None, system_instruction=None,
+                 cached_content=None, api_url=None, timeout=120):
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+        self.system_instruction = system_instruction
+        self.cached_content = cached_content
+        self.api_url = (api_url or DEFAULT_GEMINI_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = _session()
+        self.session.headers["x-goog-api-key"] = api_key
+
+    def _body(self, prompt):
+        return gemini_request_body(prompt, self.generation_config, self.system_instruction, self.cached_content)
+
+    def generate_content(self, prompt, stream=False):
+        """
+        프롬프트로 응답을 생성합니다.
+        stream=True 이면 조각별 GeminiResponse를 차례로 돌려주는 이터레이터를 반환합니다.
+        """
+        url = f"{self.api_url}/v1beta/models/{self.model_name}"
+        if not stream:
+            # 생성 요청은 서버 상태를 바꾸지 않으므로 과부하(429/503)일 때 다시 시도
+            response = _request(self.session, "POST", f"{url}:generateContent", max_attempts=3,
+                                json=self._body(prompt), timeout=self.timeout)
+            return GeminiResponse(response.json())
+        return self._stream(f"{url}:streamGenerateContent", prompt)
+
+    def _stream(self, url, prompt):
+        response = _request(self.session, "POST", url, params={"alt": "sse"}, max_attempts=3,
+                            json=self._body(prompt), timeout=self.timeout, stream=True)
+        response.encoding = "utf-8"
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data:"):
+                    yield GeminiResponse(json.loads(line[5:]))
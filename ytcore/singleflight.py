@@ -0,0 +1,290 @@
+"""
+진행 중인 요청 합치기(single-flight).
+
+같은 키(비디오 ID)로 동시에 들어온 요청 중 첫 요청(리더)만 실제로 처리하고,
+나머지(팔로워)는 리더의 결과를 기다렸다가 그대로 받습니다.
+결과는 처리 중에만 공유하며, 끝난 뒤의 재사용은 캐시가 담당합니다.
+asyncio 서버는 AsyncSingleFlight(코루틴 함수용)를 사용하고,
+워커 프로세스가 여러 개(prefork)일 때는 SharedSingleFlight가 SQLite 파일로 프로세스 사이에서도 합칩니다.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+from ytcore import metrics
+
+inflight_gauge = metrics.gauge("singleflight_inflight", "처리 중인 키 수")
+coalesced_total = metrics.counter("singleflight_coalesced_total", "진행 중인 처리에 합류한 요청 수")
+
+DEFAULT_SHARED_PATH = os.path.join(tempfile.gettempdir(), "ytchoi_singleflight.sqlite3")
+
+
+class Call:
+    """진행 중인 처리 하나. 리더가 finish 하면 팔로워의 wait가 풀립니다."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+        self.followers = 0
+
+    def wait(self, timeout=None):
+        """결과를 기다려 반환합니다. 리더가 예외로 끝났으면 같은 예외를 발생시킵니다."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("single-flight 결과 대기 시간 초과")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class SingleFlight:
+    """키별로 진행 중인 처리를 하나로 합칩니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def claim(self, key):
+        """
+        키에 대한 처리를 맡습니다. (Call, 리더 여부)를 반환합니다.
+        리더이면 반드시 finish()를 호출해야 하고, 아니면 Call.wait()로 결과를 받습니다.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                coalesced_total.inc()
+                return call, False
+            call = self._calls[key] = Call()
+            inflight_gauge.set(len(self._calls))
+            return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        """리더의 처리 결과를 기록하고 기다리던 팔로워를 깨웁니다."""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            inflight_gauge.set(len(self._calls))
+        call._result = result
+        call._error = error
+        call._done.set()
+
+    def do(self, key, fn):
+        """
+        fn()을 키별로 한 번만 실행합니다. (결과, 공유 여부)를 반환합니다.
+        이미 같은 키가 처리 중이면 fn을 실행하지 않고 그 결과를 기다립니다.
+        """
+        call, leader = self.claim(key)
+        if not leader:
+            return call.wait(), True
+        try:
+            result = fn()
+        except Exception as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result, False
+
+    def inflight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class _AsyncCall:
+    """AsyncSingleFlight의 진행 중인 처리 하나 (분리된 태스크와 결과를 기다리는 요청 수)"""
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight의 asyncio 판. (이벤트 루프 하나에서만 사용)
+
+    fn()은 리더와 분리된 태스크로 실행하고 리더와 팔로워 모두 asyncio.shield로 기다리므로,
+    리더 요청이 취소되어도(클라이언트 연결 끊김 등) 팔로워는 CancelledError 없이 결과를 받습니다.
+    기다리는 요청이 모두 취소되었을 때만 태스크를 취소합니다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, fn):
+        """
+        코루틴 함수 fn()을 키별로 한 번만 실행합니다. (결과, 공유 여부)를 반환합니다.
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            coalesced_total.inc()
+        else:
+            call = self._calls[key] = _AsyncCall(asyncio.get_running_loop().create_task(fn()))
+            call.task.add_done_callback(lambda task: self._finish(key, call, task))
+            inflight_gauge.set(len(self._calls))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # 결과를 기다리는 요청이 더 없으면 처리도 멈춤
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finish(self, key, call, task):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        inflight_gauge.set(len(self._calls))
+        if not task.cancelled():
+            # 기다리던 요청이 모두 취소된 뒤 예외로 끝나도 "처리되지 않은 예외" 경고가 나지 않도록 읽어 둠
+            task.exception()
+
+    def inflight(self):
+        return len(self._calls)
+
+
+class SharedCallError(RuntimeError):
+    """다른 프로세스의 리더가 예외로 끝났을 때 팔로워에서 발생합니다. (원래 예외는 전달할 수 없어 메시지만 담음)"""
+
+
+class SharedSingleFlight:
+    """
+    프로세스 사이에서 공유하는 single-flight (prefork 워커용).
+
+    같은 프로세스 안의 요청은 먼저 SingleFlight로 합치고, 프로세스마다 대표 하나만 SQLite 파일에서 리더를 정합니다.
+    리더는 결과를 JSON으로 기록하고, 다른 프로세스의 팔로워는 주기적으로 조회해 받습니다.
+    (결과는 JSON으로 바꿀 수 있어야 하며, 튜플은 리스트로 돌아옵니다)
+    리더는 처리하는 동안 임대(lease)를 갱신하므로, 리더 프로세스가 죽으면 임대가 끝난 뒤 팔로워 하나가 리더를 이어받습니다.
+    """
+
+    def __init__(self, path=DEFAULT_SHARED_PATH, lease=30, result_ttl=60, poll_interval=0.1, max_poll_interval=1.0):
+        self.path = path
+        self.lease = lease
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._local = SingleFlight()
+        self._lock = threading.Lock()
+        # 트랜잭션은 직접 제어 (BEGIN IMMEDIATE로 리더 정하기를 프로세스 사이에서 원자적으로)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS flights (
+                token TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_flights_key ON flights (key, done)")
+
+    def _claim(self, key):
+        """(토큰, 리더 여부). 임대가 끝난 처리와 오래된 결과는 여기서 정리합니다."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM flights WHERE expires_at < ?", (now,))
+                row = self._conn.execute(
+                    "SELECT token FROM flights WHERE key = ? AND done = 0", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("COMMIT")
+                    return row[0], False
+                token = uuid.uuid4().hex
+                self._conn.execute(
+                    "INSERT INTO flights (token, key, expires_at) VALUES (?, ?, ?)", (token, key, now + self.lease)
+                )
+                self._conn.execute("COMMIT")
+                return token, True
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _renew(self, token, stop):
+        """리더가 처리하는 동안 임대를 갱신합니다."""
+        while not stop.wait(self.lease / 3):
+            try:
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE flights SET expires_at = ? WHERE token = ? AND done = 0",
+                        (time.time() + self.lease, token),
+                    )
+            except sqlite3.Error as e:
+                logging.warning(f"single-flight 임대 갱신 실패: {e}")
+
+    def _finish(self, token, result=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE flights SET done = 1, result = ?, error = ?, expires_at = ? WHERE token = ?",
+                (result, error, time.time() + self.result_ttl, token),
+            )
+
+    def _wait(self, token):
+        """리더의 결과를 기다립니다. 리더의 임대가 끝났으면(리더 프로세스 종료) None."""
+        interval = self.poll_interval
+        while True:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT done, result, error, expires_at FROM flights WHERE token = ?", (token,)
+                ).fetchone()
+            if row is None:
+                return None
+            done, result, error, expires_at = row
+            if done:
+                if error is not None:
+                    raise SharedCallError(error)
+                return (json.loads(result),)
+            if expires_at < time.time():
+                return None
+            time.sleep(interval)
+            interval = min(self.max_poll_interval, interval * 2)
+
+    def _lead(self, token, fn):
+        stop = threading.Event()
+        threading.Thread(target=self._renew, args=(token, stop), daemon=True).start()
+        try:
+            result = fn()
+            encoded = json.dumps(result, ensure_ascii=False)
+        except Exception as e:
+            self._finish(token, error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            stop.set()
+        self._finish(token, result=encoded)
+        return result
+
+    def _do_shared(self, key, fn):
+        while True:
+            token, leader = self._claim(key)
+            if leader:
+                return self._lead(token, fn), False
+            waited = self._wait(token)
+            if waited is not None:
+                coalesced_total.inc()
+                return waited[0], True
+            logging.warning(f"⚠️ single-flight 리더가 응답 없이 사라져 다시 시도합니다: {key}")
+
+    def do(self, key, fn):
+        """
+        fn()을 모든 프로세스를 통틀어 키별로 한 번만 실행합니다. (결과, 공유 여부)를 반환합니다.
+        """
+        (result, shared), local_shared = self._local.do(key, lambda: self._do_shared(key, fn))
+        return result, shared or local_shared
+
+    def inflight(self):
+        return self._local.inflight()
@@ -0,0 +1,79 @@
+"""
+요약 스트리밍 보조 도구.
+
+- format_sse: server-sent events 형식의 메시지 한 개를 만듭니다.
+- SectionSplitter: 조각조각 도착하는 요약 텍스트에서 "• 개요 / • 내용 / • 결론" 단락이
+  끝나는 시점을 찾아냅니다. 다음 단락 제목이 나오면 앞 단락이 완성된 것으로 봅니다.
+"""
+
+import json
+
+SECTION_NAMES = ("개요", "내용", "결론")
+
+
+def format_sse(event, data):
+    """이벤트 이름과 JSON 데이터로 SSE 메시지(bytes)를 만듭니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def _parse_heading(line):
+    """
+    단락 제목 줄이면 (단락 이름, 같은 줄에 이어진 본문)을, 아니면 (None, None)을 반환합니다.
+    "• 개요", "개요:", "1. 개요: 본문..." 형태를 모두 인식합니다.
+    """
+    title = line.strip().lstrip("•·*#-0123456789. ")
+    for name in SECTION_NAMES:
+        if title.startswith(name):
+            rest = title[len(name):].strip()
+            if not rest:
+                return name, ""
+            if rest[0] in ":：":
+                return name, rest[1:].strip()
+    return None, None
+
+
+class SectionSplitter:
+    """스트리밍 텍스트를 받아 완성된 단락을 (이름, 본문) 목록으로 돌려줍니다."""
+
+    def __init__(self):
+        self._buffer = ""
+        self._name = None
+        self._lines = []
+
+    def feed(self, text):
+        """텍스트 조각을 추가하고, 이번 조각으로 완성된 단락 목록을 반환합니다."""
+        self._buffer += text
+        completed = []
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            completed.extend(self._add_line(line))
+        return completed
+
+    def close(self):
+        """남은 텍스트로 마지막 단락을 마무리해 반환합니다."""
+        completed = []
+        if self._buffer:
+            completed.extend(self._add_line(self._buffer))
+            self._buffer = ""
+        completed.extend(self._flush())
+        return completed
+
+    def _add_line(self, line):
+        name, rest = _parse_heading(line)
+        if name is None:
+            self._lines.append(line)
+            return []
+        completed = self._flush()
+        self._name = name
+        if rest:
+            self._lines.append(rest)
+        return completed
+
+    def _flush(self):
+        body = "\n".join(self._lines).strip()
+        name = self._name
+        self._lines = []
+        # 첫 제목 앞에 나온 머리말은 단락으로 보내지 않음
+        if name is None or not body:
+            return []
+        return [(name, body)]
@@ -0,0 +1,161 @@
+"""
+요약 요청 하나의 입력 토큰 예산을 지키기 위한 전략 선택.
+
+자막 길이(추정 토큰 수)를 예산과 비교해 다음 중 하나를 고릅니다.
+- pass_through: 예산 안이면 그대로 한 번에 요약
+- head_tail: 조금 넘으면 앞부분과 뒷부분을 남기고 가운데를 줄임 (도입과 결론 유지)
+- sample: 꽤 넘으면 처음부터 끝까지 고르게 문장을 뽑아 예산에 맞춤
+- map_reduce: 훨씬 길면 청크로 나눠 요약 (청크 수가 max_chunks를 넘으면 먼저 고르게 뽑아 줄임)
+
+예산은 자막 글자 수 상한(MAX_TRANSCRIPT_LENGTH, 기본 10000자)과 요청 하나의 입력 토큰 상한(SUMMARY_MAX_INPUT_TOKENS) 두 가지로 검사합니다.
+토큰 수는 chunking.estimate_tokens로 추정하므로 한국어(글자당 약 1토큰)와 영어(4자당 약 1토큰)를 함께 다룹니다.
+"""
+
+import logging
+
+from ytcore import metrics
+from ytcore.chunking import chunk_text, estimate_tokens
+
+PASS_THROUGH = "pass_through"
+HEAD_TAIL = "head_tail"
+SAMPLE = "sample"
+MAP_REDUCE = "map_reduce"
+
+# 입력 토큰 상한 기본값 (글자 수 상한과 별개로, 영어처럼 글자당 토큰이 적은 자막도 모델 입력을 넘지 않게)
+DEFAULT_MAX_INPUT_TOKENS = 32000
+
+# 잘라낸 자리에 넣는 표시 (모델이 내용이 이어지지 않음을 알 수 있게)
+GAP_MARKER = " … "
+
+strategy_total = metrics.counter(
+    "token_budget_strategy_total",
+    "입력 토큰 예산에 맞추기 위해 선택한 전략별 요약 수",
+)
+
+
+class Plan:
+    """선택한 전략과 모델에 넘길 텍스트."""
+
+    def __init__(self, strategy, text, original, sampled=False):
+        self.strategy = strategy
+        self.text = text
+        self.sampled = sampled
+        self.chars_before = len(original)
+        self.chars_after = len(text)
+        self.tokens_before = estimate_tokens(original)
+        self.tokens_after = estimate_tokens(text)
+
+    def to_meta(self):
+        """응답 메타 정보에 넣을 dict."""
+        meta = {
+            "strategy": self.strategy,
+            "chars_before": self.chars_before,
+            "chars_after": self.chars_after,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+        }
+        if self.sampled:
+            meta["sampled"] = True
+        return meta
+
+
+def _units(text, max_tokens):
+    """문장 단위(너무 긴 문장은 더 잘게)로 나눈 조각 목록. 조각 하나는 예산의 1/20 정도."""
+    return chunk_text(text, max(50, max_tokens // 20))
+
+
+def head_tail(text, max_tokens, head_share=0.6):
+    """앞부분(head_share)과 뒷부분을 문장 단위로 남겨 max_tokens 안에 맞춥니다."""
+    units = _units(text, max_tokens)
+    head_budget = int(max_tokens * head_share)
+    head, used = [], 0
+    for unit in units:
+        tokens = estimate_tokens(unit)
+        if used + tokens > head_budget:
+            break
+        head.append(unit)
+        used += tokens
+    tail = []
+    for unit in reversed(units[len(head):]):
+        tokens = estimate_tokens(unit)
+        if used + tokens > max_tokens:
+            break
+        tail.append(unit)
+        used += tokens
+    tail.reverse()
+    if len(head) + len(tail) == len(units):
+        return " ".join(units)
+    return " ".join(head) + GAP_MARKER + " ".join(tail)
+
+
+def sample_sentences(text, max_tokens):
+    """처음과 끝을 포함해 전체에서 고른 간격으로 문장 조각을 뽑아 max_tokens 안에 맞춥니다."""
+    units = _units(text, max_tokens)
+    sizes = [estimate_tokens(unit) for unit in units]
+    total = sum(sizes)
+    if total <= max_tokens:
+        return " ".join(units)
+
+    # 평균 조각 크기로 뽑을 개수를 정하고, 넘치면 하나씩 줄임
+    count = max(1, int(len(units) * max_tokens / total))
+    while count > 0:
+        if count == 1:
+            picks = [0]
+        else:
+            picks = sorted({round(i * (len(units) - 1) / (count - 1)) for i in range(count)})
+        if sum(sizes[i] for i in picks) <= max_tokens:
+            break
+        count -= 1
+    else:
+        return units[0][:max_tokens]
+
+    parts = []
+    for position, index in enumerate(picks):
+        if position and index != picks[position - 1] + 1:
+            parts.append(GAP_MARKER.strip())
+        parts.append(units[index])
+    return " ".join(parts)
+
+
+def plan(text, max_chars, max_tokens=DEFAULT_MAX_INPUT_TOKENS, overhead_tokens=0, chunk_tokens=4000, max_chunks=16,
+         head_tail_ratio=1.2, sample_ratio=2.0, allow_map_reduce=True):
+    """
+    입력 예산에 맞는 전략을 골라 Plan을 반환합니다.
+
+    max_chars: 자막 글자 수 상한 (MAX_TRANSCRIPT_LENGTH, 0/None이면 토큰 수만 검사)
+    max_tokens: 요청 하나의 입력 토큰 상한 (SUMMARY_MAX_INPUT_TOKENS)
+    overhead_tokens: 프롬프트 템플릿 등 자막 외 입력 토큰 (예산에서 뺌)
+    head_tail_ratio / sample_ratio: 예산 대비 길이 비율이 이 값 이하이면 head_tail / sample 사용
+    max_chunks: map_reduce 청크 수 상한 (넘으면 고르게 뽑아 줄인 뒤 나눔)
+    """
+    text = text or ""
+    budget = max(1, max_tokens - overhead_tokens)
+    tokens = estimate_tokens(text)
+    # 글자 수 상한이 있으면 글자 수와 토큰 수 중 더 많이 넘은 쪽 기준으로 비율 계산
+    ratio = tokens / budget
+    if max_chars:
+        ratio = max(ratio, len(text) / max_chars)
+    # 글자 수 상한을 토큰으로 환산한 값과 토큰 예산 중 작은 쪽에 맞춤
+    target = min(budget, int(tokens / ratio)) if ratio > 1 else budget
+
+    if ratio <= 1:
+        result = Plan(PASS_THROUGH, text, text)
+    elif ratio <= head_tail_ratio:
+        result = Plan(HEAD_TAIL, head_tail(text, target), text)
+    elif ratio <= sample_ratio or not allow_map_reduce:
+        result = Plan(SAMPLE, sample_sentences(text, target), text)
+    else:
+        chunk_budget = max_chunks * chunk_tokens
+        if tokens > chunk_budget:
+            result = Plan(MAP_REDUCE, sample_sentences(text, chunk_budget), text, sampled=True)
+        else:
+            result = Plan(MAP_REDUCE, text, text)
+
+    strategy_total.inc(strategy=result.strategy)
+    if result.strategy != PASS_THROUGH:
+        logging.info(
+            f"📏 입력 예산 초과({result.chars_before}자/{result.tokens_before}토큰, "
+            f"예산 {f'{max_chars}자/' if max_chars else ''}{budget}토큰): "
+            f"'{result.strategy}' 전략 사용 → {result.chars_after}자/{result.tokens_after}토큰"
+        )
+    return result
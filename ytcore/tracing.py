@@ -0,0 +1,143 @@
+"""
+요청 단위 추적: 요청 ID와 단계별 소요 시간(span).
+
+request_context()로 요청을 시작하면 contextvar에 요청 ID가 설정되고,
+span("단계")으로 감싼 구간의 소요 시간이 stage_duration_seconds{stage=...} 히스토그램에 기록됩니다.
+요청이 끝나면 단계별 소요 시간을 한 줄로 로그에 남깁니다.
+
+configure_logging()을 사용하면 모든 로그 줄에 [요청 ID]가 붙습니다.
+contextvar는 스레드 풀로 자동 전달되지 않으므로, 풀에 넘기는 함수는 propagate()로 감싸야 합니다.
+"""
+
+import contextvars
+import logging
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from ytcore import metrics
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+# 클라이언트가 X-Request-ID 헤더로 보낸 값은 이 형식일 때만 그대로 사용
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+stage_duration = metrics.histogram(
+    "stage_duration_seconds",
+    "요청 처리 단계(parse, preflight, transcript, apify_run, timedtext, poll_wait, clean, summarize, serialize)별 소요 시간",
+)
+request_duration = metrics.histogram(
+    "request_duration_seconds",
+    "요청 하나를 처리하는 데 걸린 전체 시간",
+)
+
+_request_id = contextvars.ContextVar("request_id", default="-")
+_trace = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    """요청 하나에서 기록된 span 목록. 여러 스레드에서 함께 기록할 수 있습니다."""
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.started = time.monotonic()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, stage, duration, labels):
+        with self._lock:
+            self.spans.append({"stage": stage, "duration": round(duration, 4), **labels})
+
+    def summary(self):
+        """'parse=0.001s transcript[Korean]=2.310s ...' 형태의 요약 문자열."""
+        with self._lock:
+            spans = list(self.spans)
+        parts = []
+        for span in spans:
+            labels = ",".join(str(value) for key, value in span.items() if key not in ("stage", "duration"))
+            name = f"{span['stage']}[{labels}]" if labels else span["stage"]
+            parts.append(f"{name}={span['duration']:.3f}s")
+        return " ".join(parts)
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+def current_trace():
+    return _trace.get()
+
+
+@contextmanager
+def request_context(request_id=None, endpoint=""):
+    """
+    요청 ID를 설정하고 Trace를 반환합니다. 끝나면 전체 시간을 기록하고 단계별 소요 시간을 로그로 남깁니다.
+    request_id가 없거나 형식에 맞지 않으면 새로 만듭니다.
+    """
+    if not request_id or not _REQUEST_ID_PATTERN.match(request_id):
+        request_id = new_request_id()
+    trace = Trace(request_id)
+    id_token = _request_id.set(trace.request_id)
+    trace_token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        elapsed = time.monotonic() - trace.started
+        request_duration.observe(elapsed, endpoint=endpoint)
+        if trace.spans:
+            logging.info(f"⏱️ 요청 처리 {elapsed:.3f}초: {trace.summary()}")
+        _trace.reset(trace_token)
+        _request_id.reset(id_token)
+
+
+def record(stage, duration, **labels):
+    """이미 측정한 소요 시간(초)을 단계 히스토그램과 현재 요청의 Trace에 기록합니다."""
+    stage_duration.observe(duration, stage=stage, **labels)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(stage, duration, labels)
+
+
+@contextmanager
+def span(stage, **labels):
+    """감싼 구간의 소요 시간을 기록합니다. 예외가 나도 기록합니다."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        record(stage, time.monotonic() - started, **labels)
+
+
+def propagate(func):
+    """
+    현재 요청 ID와 Trace를 이어받아 실행하도록 func를 감쌉니다. (스레드 풀에 넘기기 전에 호출)
+    호출마다 컨텍스트를 복사하므로 여러 스레드에서 동시에 실행해도 됩니다.
+    """
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+class RequestIdFilter(logging.Filter):
+    """로그 레코드에 request_id 속성을 채웁니다. (요청 밖에서는 '-')"""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+def configure_logging(level=logging.INFO, fmt=LOG_FORMAT):
+    """logging.basicConfig 대신 사용합니다. 루트 핸들러마다 RequestIdFilter를 붙입니다."""
+    logging.basicConfig(level=level, format=fmt)
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(f, RequestIdFilter) for f in handler.filters):
+            handler.addFilter(RequestIdFilter())
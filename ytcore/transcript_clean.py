@@ -0,0 +1,159 @@
+"""
+요약 전에 자막을 정리해 입력 토큰을 줄이는 전처리.
+
+자막에는 요약에 필요 없는 부분이 많습니다.
+1. 비음성 표시: [음악], [Music], (웃음), ♪ 같은 표기
+2. 롤링 자막/음성 인식 말더듬: 바로 앞 몇 단어가 글자 그대로 한 번 더 나옴 (MAX_REPEAT_WORDS 단어 이내)
+3. 같은 줄이 잠시 뒤 그대로 다시 나오는 중복
+4. 추임새(음, um, uh)와 불필요한 공백 (뜻이 있는 말로도 쓰이는 "어"는 남김)
+5. (선택) 맞장구만 있는 문장이나 앞에서 나온 문장과 똑같은 문장
+
+clean_transcript()는 이를 차례로 제거한 텍스트와 제거량 통계를 반환합니다.
+같은 입력에는 항상 같은 결과를 내므로(무작위성 없음) 요약 캐시와 함께 써도 안전합니다.
+"""
+
+import re
+
+from ytcore.chunking import estimate_tokens, split_sentences
+
+# 대괄호 표기는 자동 자막에서 거의 항상 비음성 표시 ([음악], [Applause], [웃음 소리] 등)
+_BRACKET_RE = re.compile(r"\[[^\[\]\n]{1,40}\]")
+# 소괄호는 알려진 표시만 제거 (설명용 괄호는 유지)
+_PAREN_RE = re.compile(
+    r"\((?:음악|박수|웃음|웃음소리|환호|함성|침묵|효과음|music|applause|laughs?|laughter|cheering|"
+    r"silence|inaudible|crosstalk|noise)\)",
+    re.IGNORECASE,
+)
+# 음표와 화자 전환 표시(>>)
+_SYMBOL_RE = re.compile(r"[♪♫♬♩]+|>>+")
+_WHITESPACE_RE = re.compile(r"\s+")
+# 단어 비교 시 무시하는 앞뒤 문장부호
+_PUNCT_STRIP = ".,!?;:…\"'“”‘’()[]「」"
+
+# 혼자 쓰일 때 의미가 없는 추임새 ("어"는 감탄사/대답으로도 쓰여 제외, 문장 전체가 "어"이면 drop_low_info에서 제거)
+# "mm"(밀리미터), "er"처럼 단위나 약어로도 쓰이는 말은 넣지 않음
+FILLERS = frozenset({
+    "음", "음음", "어어", "으", "으음", "흠",
+    "um", "umm", "uh", "uhh", "uh-huh", "erm", "hmm", "mmm", "mhm",
+})
+# 맞장구/연결어만으로 된 문장은 정보가 거의 없음 (drop_low_info=True 일 때만 제거)
+LOW_INFO_WORDS = FILLERS | frozenset({
+    "어", "네", "예", "아", "뭐", "그래서", "그러니까", "그죠", "그렇죠", "맞아요", "맞습니다", "좋아요", "자",
+    "ok", "okay", "yeah", "yes", "yep", "right", "so", "well", "alright", "like", "oh", "wow",
+})
+
+# 연속 반복을 찾을 최대 단어 수 (롤링 자막 한 줄의 겹침 정도, 더 긴 반복은 말한 그대로 둠)
+MAX_REPEAT_WORDS = 8
+# 같은 줄이 다시 나오는지 확인할 직전 줄 수
+RECENT_LINES = 3
+
+
+def _word_key(word):
+    return word.strip(_PUNCT_STRIP).lower()
+
+
+def _strip_annotations(text):
+    """비음성 표시를 지우고 지운 개수를 반환합니다."""
+    count = 0
+    for pattern in (_BRACKET_RE, _PAREN_RE, _SYMBOL_RE):
+        text, removed = pattern.subn(" ", text)
+        count += removed
+    return text, count
+
+
+def _dedupe_lines(lines):
+    """직전 몇 줄과 똑같은 줄을 버립니다. (줄 구분이 있는 자막에서만 의미 있음)"""
+    kept, recent, dropped = [], [], 0
+    for line in lines:
+        key = " ".join(_word_key(word) for word in line.split())
+        if not key:
+            continue
+        if key in recent:
+            dropped += 1
+            continue
+        kept.append(line)
+        recent.append(key)
+        if len(recent) > RECENT_LINES:
+            recent.pop(0)
+    return kept, dropped
+
+
+def _collapse_repeats(words, max_n=MAX_REPEAT_WORDS):
+    """
+    바로 이어서 글자 그대로 반복되는 짧은 단어 묶음(롤링 자막의 겹침, 음성 인식 말더듬 "그 그 그")을 하나만 남깁니다.
+    단어를 하나씩 붙이면서 끝부분의 n단어(max_n 이하)가 바로 앞 n단어와 똑같으면 뒤쪽을 지웁니다.
+    대소문자나 문장부호가 다르면 다른 말로 보고 그대로 둡니다.
+    """
+    out, removed = [], 0
+    for word in words:
+        out.append(word)
+        length = len(out)
+        for n in range(1, min(max_n, length // 2) + 1):
+            # 마지막 단어가 다르면 전체 비교를 건너뜀
+            if out[-1] != out[-1 - n]:
+                continue
+            if out[-n:] == out[-2 * n:-n]:
+                del out[-n:]
+                removed += n
+                break
+    return out, removed
+
+
+def _drop_low_info_sentences(text):
+    """맞장구만 있는 문장과 앞에서 나온 문장과 같은 문장을 버립니다."""
+    kept, seen, dropped = [], set(), 0
+    for sentence in split_sentences(text):
+        keys = [_word_key(word) for word in sentence.split()]
+        keys = [key for key in keys if key]
+        key = " ".join(keys)
+        if not keys or all(k in LOW_INFO_WORDS for k in keys) or key in seen:
+            dropped += 1
+            continue
+        seen.add(key)
+        kept.append(sentence)
+    return " ".join(kept), dropped
+
+
+def clean_transcript(text, drop_low_info=False):
+    """
+    자막을 정리해 (정리된 텍스트, 통계 dict)를 반환합니다.
+
+    통계에는 정리 전후 글자 수와 추정 토큰 수, 단계별 제거 개수가 들어갑니다.
+    drop_low_info=True 이면 맞장구만 있는 문장과 반복된 문장도 제거합니다.
+    """
+    text = text or ""
+    stats = {
+        "chars_before": len(text),
+        "tokens_before": estimate_tokens(text),
+        "annotations": 0,
+        "duplicate_lines": 0,
+        "fillers": 0,
+        "repeated_words": 0,
+        "low_info_sentences": 0,
+    }
+
+    cleaned, stats["annotations"] = _strip_annotations(text)
+    lines, stats["duplicate_lines"] = _dedupe_lines(cleaned.splitlines())
+
+    words = []
+    for word in _WHITESPACE_RE.split(" ".join(lines)):
+        if not word:
+            continue
+        if _word_key(word) in FILLERS:
+            stats["fillers"] += 1
+            # "음." 처럼 문장을 끝내는 추임새는 문장부호만 앞 단어로 옮겨 문장 경계를 유지
+            if word[-1] in ".?!" and words and words[-1][-1] not in ".?!":
+                words[-1] += word[-1]
+            continue
+        words.append(word)
+    words, stats["repeated_words"] = _collapse_repeats(words)
+    cleaned = " ".join(words)
+
+    if drop_low_info:
+        cleaned, stats["low_info_sentences"] = _drop_low_info_sentences(cleaned)
+
+    stats["chars_after"] = len(cleaned)
+    stats["tokens_after"] = estimate_tokens(cleaned)
+    stats["chars_removed"] = stats["chars_before"] - stats["chars_after"]
+    stats["tokens_removed"] = stats["tokens_before"] - stats["tokens_after"]
+    return cleaned, stats
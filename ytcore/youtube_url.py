@@ -0,0 +1,69 @@
+"""
+YouTube URL 감지 및 비디오 ID 추출.
+
+api/youtube.py, python_bot/server.py, python_bot/youtube_detector.py 가 함께 사용합니다.
+미리 컴파일한 정규식 하나(대안 묶음)로 메시지를 한 번만 훑어서 모든 비디오 ID를 찾습니다.
+
+지원 형태:
+- youtube.com/watch?v=ID (다른 파라미터가 앞뒤에 있어도 됨)
+- youtu.be/ID
+- youtube.com/live/ID, /shorts/ID, /embed/ID, /v/ID
+- www. / m. / music. 하위 도메인
+"""
+
+import re
+
+# "youtu"로 시작하도록 작성해 정규식 엔진이 후보 위치를 빠르게 찾게 함.
+# 채팅에서는 "YouTube.com/watch?v=", "YOUTU.BE/" 처럼 대문자로 쓰기도 하므로 호스트/경로 부분은 대소문자를 구분하지 않고,
+# 비디오 ID는 대소문자가 의미 있으므로 그대로 구분합니다.
+VIDEO_URL_RE = re.compile(
+    r"(?i:youtu(?:"
+    r"\.be/"
+    r"|be\.com/(?:watch\?(?:[^\s#]*?&)?v=|live/|shorts/|embed/|v/)"
+    r"))"
+    r"([A-Za-z0-9_-]+)"
+)
+
+
+def _iter_matches(text):
+    """notyoutube.com 처럼 다른 도메인에 붙은 경우를 제외하고 매치를 돌려줍니다."""
+    for match in VIDEO_URL_RE.finditer(text):
+        start = match.start()
+        if start and (text[start - 1].isalnum() or text[start - 1] in "_-"):
+            continue
+        yield match
+
+
+def find_video_urls(text):
+    """텍스트에서 (찾은 URL 문자열, 비디오 ID) 목록을 등장 순서대로 반환합니다."""
+    if not text:
+        return []
+    return [(match.group(0), match.group(1)) for match in _iter_matches(text)]
+
+
+def extract_video_ids(text):
+    """텍스트에 포함된 모든 비디오 ID를 중복 없이 등장 순서대로 반환합니다."""
+    if not text:
+        return []
+    seen = set()
+    video_ids = []
+    for match in _iter_matches(text):
+        video_id = match.group(1)
+        if video_id not in seen:
+            seen.add(video_id)
+            video_ids.append(video_id)
+    return video_ids
+
+
+def extract_video_id(text):
+    """텍스트에서 첫 번째 비디오 ID를 반환합니다. 없으면 None."""
+    if not text:
+        return None
+    for match in _iter_matches(text):
+        return match.group(1)
+    return None
+
+
+def watch_url(video_id):
+    """비디오 ID로 표준 watch?v=ID URL을 만듭니다."""
+    return f"https://www.youtube.com/watch?v={video_id}"